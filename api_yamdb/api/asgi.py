@@ -0,0 +1,206 @@
+import asyncio
+import io
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+
+# Запросы чтения каталога выполняются в отдельном пуле потоков.
+CATALOGUE_PATH = re.compile(r'^/api/v1/(titles|categories|genres)/')
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+Response = Tuple[int, list, bytes]
+
+
+def get_environ(scope: dict, body: bytes) -> dict:
+    """
+    WSGI environ (PEP 3333) по ASGI scope HTTP-запроса.
+    :param scope: ASGI scope.
+    :param body: Тело запроса целиком.
+    :return: environ.
+    """
+
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '')
+        .encode('utf-8')
+        .decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin-1')
+        if name in environ:
+            # Повторяющиеся заголовки объединяются, Cookie (HTTP/2
+            # передает каждую cookie отдельным заголовком) - через '; '.
+            separator = '; ' if name == 'HTTP_COOKIE' else ','
+            value = f'{environ[name]}{separator}{value}'
+        environ[name] = value
+    if body:
+        # Тело уже прочитано целиком, в том числе при chunked-передаче.
+        environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+class ASGIHandler:
+    """
+    ASGI-приложение поверх WSGI-обработчика Django (в Django 2.2 нет
+    ASGI, асинхронных view и ORM). Тело запроса читается и ответ
+    отправляется в цикле событий, поэтому медленный клиент не занимает
+    поток; view выполняются в пулах потоков. Пулы разделены: чтение
+    каталога не ждет записи и запросов авторизации с отправкой писем.
+    """
+
+    def __init__(self, wsgi_application: Callable) -> None:
+        self.wsgi_application = wsgi_application
+        self.executors = {
+            'catalogue': ThreadPoolExecutor(
+                settings.ASGI_CATALOGUE_THREADS,
+                thread_name_prefix='asgi-catalogue',
+            ),
+            'default': ThreadPoolExecutor(
+                settings.ASGI_DEFAULT_THREADS,
+                thread_name_prefix='asgi-default',
+            ),
+        }
+
+    async def __call__(
+        self, scope: dict, receive: Callable, send: Callable
+    ) -> None:
+        if scope['type'] == 'http':
+            await self.handle_http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self.handle_lifespan(receive, send)
+        else:
+            raise ValueError(f'Неподдерживаемый тип запроса {scope["type"]}')
+
+    async def handle_lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for executor in self.executors.values():
+                    executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    def get_executor_name(scope: dict) -> str:
+        if scope['method'] in READ_METHODS and CATALOGUE_PATH.match(
+            scope['path']
+        ):
+            return 'catalogue'
+        return 'default'
+
+    @staticmethod
+    async def read_body(receive: Callable) -> Optional[bytes]:
+        """
+        Чтение тела запроса.
+        :param receive: ASGI receive.
+        :return: Тело или None, если клиент отключился.
+        """
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def handle_http(
+        self, scope: dict, receive: Callable, send: Callable
+    ) -> None:
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+
+        def send_sync(message: dict) -> None:
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = await loop.run_in_executor(
+            self.executors[self.get_executor_name(scope)],
+            self.run_wsgi,
+            get_environ(scope, body),
+            send_sync,
+        )
+        if response is None:
+            return
+        status, headers, content = response
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': status,
+                'headers': headers,
+            }
+        )
+        await send({'type': 'http.response.body', 'body': content})
+
+    def run_wsgi(
+        self, environ: dict, send_sync: Callable[[dict], None]
+    ) -> Optional[Response]:
+        """
+        Вызов WSGI-обработчика в потоке пула. Обычный ответ собирается
+        целиком и отправляется клиенту после освобождения потока.
+        Потоковый ответ (StreamingHttpResponse) отправляется по частям из
+        этого же потока: курсор БД выгрузки принадлежит соединению потока.
+        :param environ: WSGI environ.
+        :param send_sync: Отправка ASGI-сообщения из потока.
+        :return: Статус, заголовки и тело или None, если ответ отправлен.
+        """
+
+        start = {}
+
+        def start_response(status: str, headers: list, exc_info=None):
+            start['status'] = int(status.split(' ', 1)[0])
+            start['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        iterable = self.wsgi_application(environ, start_response)
+        try:
+            if not getattr(iterable, 'streaming', False):
+                return start['status'], start['headers'], b''.join(iterable)
+            send_sync(
+                {
+                    'type': 'http.response.start',
+                    'status': start['status'],
+                    'headers': start['headers'],
+                }
+            )
+            for chunk in iterable:
+                if chunk:
+                    send_sync(
+                        {
+                            'type': 'http.response.body',
+                            'body': chunk,
+                            'more_body': True,
+                        }
+                    )
+            send_sync({'type': 'http.response.body', 'body': b''})
+            return None
+        finally:
+            # request_finished закрывает соединения с БД этого потока.
+            iterable.close()
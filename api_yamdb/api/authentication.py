@@ -0,0 +1,164 @@
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import ADMIN, MODERATOR, USER
+from .cache import get_cache
+
+User = get_user_model()
+
+USER_STATE_KEY = 'api:user-state:{pk}'
+USER_STATE_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
+
+def get_access_token(user) -> AccessToken:
+    """
+    Токен доступа с данными, нужными для проверки прав без загрузки
+    пользователя из БД.
+    :param user: Модель User.
+    :return: Токен доступа.
+    """
+
+    token = AccessToken.for_user(user)
+    for field in USER_STATE_FIELDS[:-1]:
+        token[field] = getattr(user, field)
+    return token
+
+
+def get_user_state(pk: int) -> Optional[Dict[str, Any]]:
+    """
+    Актуальные роль и статус пользователя. Хранятся в кэше
+    AUTH_USER_STATE_TIMEOUT секунд и сбрасываются при изменении
+    пользователя, поэтому смена роли и блокировка вступают в силу
+    до истечения срока действия токена.
+    :param pk: id пользователя.
+    :return: Словарь полей USER_STATE_FIELDS или None, если
+        пользователь удален.
+    """
+
+    cache = get_cache()
+    key = USER_STATE_KEY.format(pk=pk)
+    state = cache.get(key)
+    if state is None:
+        state = (
+            User.objects.filter(pk=pk).values(*USER_STATE_FIELDS).first() or {}
+        )
+        cache.set(key, state, timeout=settings.AUTH_USER_STATE_TIMEOUT)
+    return state or None
+
+
+def invalidate_user_state(pk: int) -> None:
+    get_cache().delete(USER_STATE_KEY.format(pk=pk))
+
+
+class ClaimsUser(TokenUser):
+    """
+    Пользователь, построенный по токену доступа, без обращения к БД.
+    Поддерживает проверки прав (role, is_admin, is_moderator,
+    is_superuser). Если view нужна полная модель, ее возвращает
+    get_full_user.
+    """
+
+    def __init__(self, token, state: Optional[Dict[str, Any]] = None):
+        super().__init__(token)
+        self.state = state or {}
+
+    def get_claim(self, name: str, default: Any = None) -> Any:
+        if name in self.state:
+            return self.state[name]
+        return self.token.get(name, default)
+
+    @cached_property
+    def username(self) -> str:
+        return self.get_claim('username', '')
+
+    @cached_property
+    def role(self) -> str:
+        return self.get_claim('role', USER)
+
+    @cached_property
+    def is_superuser(self) -> bool:
+        return self.get_claim('is_superuser', False)
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == ADMIN
+
+    @property
+    def is_moderator(self) -> bool:
+        return self.role == MODERATOR
+
+    def get_instance(self) -> User:
+        """
+        Модель User с загруженными полями из токена (остальные поля
+        отложены). Подходит для внешних ключей и сериализации автора;
+        save() обновит только загруженные поля.
+        :return: Модель User.
+        """
+
+        fields = ('id',) + USER_STATE_FIELDS[:-1]
+        values = (self.id, self.username, self.role, self.is_superuser)
+        return User.from_db('default', fields, values)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без загрузки пользователя из БД на каждый запрос.
+    Роль и статус берутся из кэша состояния пользователя (см.
+    get_user_state), при AUTH_USER_STATE_TIMEOUT = 0 - только из
+    токена.
+    """
+
+    def get_user(self, validated_token) -> ClaimsUser:
+        try:
+            pk = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Токен не содержит id пользователя.')
+
+        state = None
+        if settings.AUTH_USER_STATE_TIMEOUT:
+            state = get_user_state(pk)
+            if state is None:
+                raise AuthenticationFailed(
+                    'Пользователь не найден.', code='user_not_found'
+                )
+            if not state['is_active']:
+                raise AuthenticationFailed(
+                    'Пользователь заблокирован.', code='user_inactive'
+                )
+        return ClaimsUser(validated_token, state)
+
+
+def get_user_instance(user) -> User:
+    """
+    Модель User для внешнего ключа (автор отзыва, комментария).
+    :param user: request.user.
+    :return: Модель User.
+    """
+
+    if isinstance(user, ClaimsUser):
+        return user.get_instance()
+    return user
+
+
+def get_full_user(user) -> User:
+    """
+    Полная модель User из БД, если аутентификация вернула
+    пользователя по токену.
+    :param user: request.user.
+    :return: Модель User.
+    """
+
+    if isinstance(user, ClaimsUser):
+        return User.objects.get(pk=user.pk)
+    return user
@@ -0,0 +1,143 @@
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from rest_framework import serializers
+
+from reviews.models import Title
+from .serializers import TitlePostPatchSerializer
+from .signals import invalidate_after_commit
+
+CREATED = 'created'
+UPDATED = 'updated'
+INVALID = 'invalid'
+
+
+def is_title_id(value) -> bool:
+    # bool - подкласс int, и True совпал бы с произведением id=1.
+    return type(value) is int
+
+
+def validate_titles(
+    items: list, context: dict
+) -> Tuple[List[dict], List[Tuple[int, Title, dict]]]:
+    """
+    Проверка списка произведений для массовой загрузки.
+    Элемент с id изменяет существующее произведение (переданные поля),
+    без id - создает новое. Все элементы проверяются двумя экземплярами
+    TitlePostPatchSerializer, существующие произведения читаются одним
+    запросом, слаги - из кэша справочников.
+    :param items: Элементы запроса.
+    :param context: Контекст сериализатора.
+    :return: Результаты по элементам и список
+    (индекс, произведение или None, проверенные данные).
+    """
+
+    create_serializer = TitlePostPatchSerializer(context=context)
+    update_serializer = TitlePostPatchSerializer(context=context, partial=True)
+    ids = [
+        item['id']
+        for item in items
+        if isinstance(item, dict) and is_title_id(item.get('id'))
+    ]
+    titles = Title.objects.defer('search_vector').in_bulk(ids)
+    seen = set()
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise serializers.ValidationError(
+                    {'non_field_errors': ['Ожидается объект.']}
+                )
+            pk = item.get('id')
+            if pk is None:
+                title = None
+                attrs = create_serializer.run_validation(item)
+            elif not is_title_id(pk):
+                raise serializers.ValidationError(
+                    {'id': ['Ожидается целое число.']}
+                )
+            elif pk not in titles or pk in seen:
+                raise serializers.ValidationError(
+                    {'id': ['Произведение не найдено или повторяется.']}
+                )
+            else:
+                seen.add(pk)
+                title = titles[pk]
+                attrs = update_serializer.run_validation(item)
+        except serializers.ValidationError as exc:
+            results.append(
+                {
+                    'index': index,
+                    'status': INVALID,
+                    'errors': serializers.as_serializer_error(exc),
+                }
+            )
+            continue
+        results.append(
+            {'index': index, 'status': UPDATED if title else CREATED}
+        )
+        valid.append((index, title, attrs))
+    return results, valid
+
+
+def save_titles(valid: List[Tuple[int, Title, dict]]) -> Dict[int, int]:
+    """
+    Сохранение проверенных произведений в одной транзакции:
+    bulk_create новых, bulk_update измененных полей и вставка связей с
+    жанрами пачками в промежуточную таблицу. Сигналы моделей не
+    отправляются, кэш произведений сбрасывается после фиксации.
+    :param valid: Список (индекс, произведение или None, данные).
+    :return: Словарь {индекс элемента: id произведения}.
+    """
+
+    batch_size = settings.TITLES_BULK_BATCH_SIZE
+    through = Title.genre.through
+    connection = connections[router.db_for_write(Title)]
+    saved = {}
+    created = []
+    updated = []
+    fields = set()
+    genres = []
+    replaced = []
+    for index, title, attrs in valid:
+        genre = attrs.pop('genre', None)
+        if title is None:
+            title = Title(**attrs)
+            created.append(title)
+        else:
+            for name, value in attrs.items():
+                setattr(title, name, value)
+            fields.update(attrs)
+            updated.append(title)
+        saved[index] = title
+        if genre is None:
+            continue
+        if title.pk is not None:
+            replaced.append(title.pk)
+        genres.append((title, genre))
+
+    with transaction.atomic(using=connection.alias):
+        if connection.features.can_return_ids_from_bulk_insert:
+            Title.objects.bulk_create(created, batch_size=batch_size)
+        else:
+            # Без RETURNING id новых строк неизвестны.
+            for title in created:
+                title.save(force_insert=True)
+        if updated and fields:
+            Title.objects.bulk_update(
+                updated, sorted(fields), batch_size=batch_size
+            )
+        # Связи изменяемых произведений заменяются переданными жанрами.
+        through.objects.filter(title_id__in=replaced).delete()
+        through.objects.bulk_create(
+            [
+                through(title_id=title.pk, genre_id=genre_id)
+                for title, genre in genres
+                for genre_id in {item.pk for item in genre}
+            ],
+            batch_size=batch_size,
+        )
+        invalidate_after_commit('titles')
+    return {index: title.pk for index, title in saved.items()}
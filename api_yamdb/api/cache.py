@@ -0,0 +1,137 @@
+import hashlib
+import json
+import time
+from functools import wraps
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .replicas import get_replica
+
+GENERATION_KEY = 'api:generation:{scope}'
+RESPONSE_KEY = 'api:response:{generations}:{digest}'
+RECENT_WRITE_KEY = 'api:recent-write'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_generation(scope: str) -> int:
+    """
+    Текущее поколение данных области кэша (например, 'titles').
+    Если ключ поколения вытеснен из кэша, новое значение берется из
+    текущего времени, чтобы не совпасть с одним из прошлых поколений.
+    :param scope: Имя области.
+    :return: Номер поколения.
+    """
+
+    cache = get_cache()
+    key = GENERATION_KEY.format(scope=scope)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(*scopes: str) -> None:
+    """
+    Инвалидация областей кэша: ответы, сохраненные с прежним поколением,
+    больше не используются и вытесняются по таймауту.
+    :param scopes: Имена областей.
+    :return: None
+    """
+
+    cache = get_cache()
+    for scope in scopes:
+        key = GENERATION_KEY.format(scope=scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+    if settings.REPLICA_DATABASES:
+        cache.set(
+            RECENT_WRITE_KEY, True, timeout=settings.REPLICA_STICKY_SECONDS
+        )
+
+
+def is_cacheable() -> bool:
+    """
+    Ответ, прочитанный из реплики вскоре после изменения данных, может
+    быть устаревшим и не сохраняется под новым поколением.
+    :return: Можно ли сохранить ответ в кэш.
+    """
+
+    return get_replica() is None or not get_cache().get(RECENT_WRITE_KEY)
+
+
+def get_response_key(request, scopes: Iterable[str]) -> str:
+    """
+    Ключ кэша ответа: поколения областей, хост, путь и
+    отсортированные параметры запроса.
+    :param request: Экземпляр класса Request DRF.
+    :param scopes: Области, от которых зависит ответ.
+    :return: Ключ кэша.
+    """
+
+    query = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw_key = json.dumps([request.get_host(), request.path, query])
+    return RESPONSE_KEY.format(
+        generations='.'.join(str(get_generation(scope)) for scope in scopes),
+        digest=hashlib.md5(raw_key.encode()).hexdigest(),
+    )
+
+
+def get_etag(data) -> str:
+    content = json.dumps(data, cls=JSONEncoder, sort_keys=True)
+    return '"{}"'.format(hashlib.md5(content.encode()).hexdigest())
+
+
+def cache_response(*scopes: str) -> Callable:
+    """
+    Декоратор кэширования ответов read-only действий ViewSet.
+    Кэшируются данные успешного ответа и их ETag, при совпадении
+    If-None-Match возвращается 304 без сериализации. При
+    API_CACHE_ENABLED = False действие вызывается без кэша.
+    :param scopes: Области кэша, от которых зависит ответ.
+    :return: Декоратор.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs) -> Response:
+            if not settings.API_CACHE_ENABLED:
+                return method(view, request, *args, **kwargs)
+            cache = get_cache()
+            key = get_response_key(request, scopes)
+            cached = cache.get(key)
+            if cached is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cached = (response.data, get_etag(response.data))
+                if is_cacheable():
+                    cache.set(key, cached, timeout=settings.API_CACHE_TIMEOUT)
+
+            data, etag = cached
+            etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+            if etag in etags or '*' in etags:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = Response(data)
+            response['ETag'] = etag
+            return response
+
+        return wrapper
+
+    return decorator
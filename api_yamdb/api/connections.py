@@ -0,0 +1,57 @@
+import threading
+from typing import Dict
+
+from django.db import connections
+
+
+class ConnectionMetrics:
+    """
+    Счетчики соединений с БД процесса: открытые соединения и закрытые
+    проверкой работоспособности. При постоянных соединениях
+    (CONN_MAX_AGE) число открытых соединений не растет с каждым запросом.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.opened = 0
+            self.unusable = 0
+
+    def record_opened(self) -> None:
+        with self.lock:
+            self.opened += 1
+
+    def record_unusable(self) -> None:
+        with self.lock:
+            self.unusable += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return {'opened': self.opened, 'unusable': self.unusable}
+
+
+connection_metrics = ConnectionMetrics()
+
+
+def close_unusable_connections() -> None:
+    """
+    Проверка постоянных соединений перед запросом (CONN_HEALTH_CHECKS в
+    DATABASES, как в Django 4.1). Соединение, закрытое сервером БД или
+    pgbouncer за время простоя, закрывается и открывается заново при
+    первом запросе к БД, вместо ошибки 500.
+    :return: None
+    """
+
+    for connection in connections.all():
+        if (
+            connection.connection is None
+            or not connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            or connection.in_atomic_block
+        ):
+            continue
+        if not connection.is_usable():
+            connection_metrics.record_unusable()
+            connection.close()
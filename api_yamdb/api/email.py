@@ -1,5 +1,114 @@
-from django.core.mail import EmailMessage
-from django.template.loader import render_to_string
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template
+
+from .models import ConfirmationEmail
+
+CONFIRMATION_CODE_TEMPLATE = 'send_confirmation_code.html'
+
+
+class EmailMetrics:
+    """
+    Счетчики отправки писем процесса: отправленные и ошибочные письма,
+    открытые SMTP-соединения и суммарное время отправки.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.sent = 0
+            self.failed = 0
+            self.connections = 0
+            self.duration = 0.0
+
+    def record(
+        self,
+        sent: int,
+        failed: int,
+        connections: int,
+        duration: float,
+    ) -> None:
+        with self.lock:
+            self.sent += sent
+            self.failed += failed
+            self.connections += connections
+            self.duration += duration
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Текущие значения счетчиков.
+        :return: Словарь счетчиков и пропускная способность (писем/с).
+        """
+
+        with self.lock:
+            return {
+                'sent': self.sent,
+                'failed': self.failed,
+                'connections': self.connections,
+                'duration': self.duration,
+                'throughput': (
+                    self.sent / self.duration if self.duration else 0.0
+                ),
+            }
+
+
+email_metrics = EmailMetrics()
+
+
+@lru_cache(maxsize=None)
+def get_confirmation_code_template():
+    """
+    Скомпилированный шаблон письма. Загружается и разбирается один раз
+    на процесс, а не при каждом письме.
+    :return: Шаблон Django.
+    """
+
+    return get_template(CONFIRMATION_CODE_TEMPLATE)
+
+
+def send_messages(messages: Sequence[EmailMessage]) -> List[Optional[str]]:
+    """
+    Отправка писем через одно SMTP-соединение (одна TLS-сессия на все
+    письма). Письма отправляются по одному, чтобы знать результат
+    каждого; после ошибки соединение открывается заново.
+    :param messages: Сообщения.
+    :return: Тексты ошибок по сообщениям (None - отправлено).
+    """
+
+    errors = []
+    connections = 0
+    started = time.monotonic()
+    connection = get_connection()
+    try:
+        for message in messages:
+            try:
+                if connection.open():
+                    connections += 1
+                connection.send_messages([message])
+            except Exception as error:
+                errors.append(repr(error))
+                connection.close()
+            else:
+                errors.append(None)
+    finally:
+        connection.close()
+    failed = sum(error is not None for error in errors)
+    email_metrics.record(
+        sent=len(errors) - failed,
+        failed=failed,
+        connections=connections,
+        duration=time.monotonic() - started,
+    )
+    return errors
 
 
 class ConfirmationCodeEmailMessage:
@@ -7,18 +116,18 @@ class ConfirmationCodeEmailMessage:
     Класс формирования и отправки писем с кодом подтверждения.
     """
 
-    def send_confirmation_code_email(
+    def build_confirmation_code_email(
         self,
         username: str,
         email: str,
         confirmation_code: str,
-    ) -> None:
+    ) -> EmailMessage:
         """
-        Метод подготовки и отправки сообщения с кодом подтверждения.
+        Метод подготовки сообщения с кодом подтверждения.
         :param username: Имя пользователя.
         :param email: Эл.почта пользователя.
         :param confirmation_code: Сгенерированный код подтверждения.
-        :return: None
+        :return: Сообщение EmailMessage.
         """
 
         context = {
@@ -27,10 +136,7 @@ class ConfirmationCodeEmailMessage:
             'confirmation_code': confirmation_code,
         }
 
-        html_message = render_to_string(
-            template_name='send_confirmation_code.html',
-            context=context,
-        )
+        html_message = get_confirmation_code_template().render(context)
 
         message = EmailMessage(
             subject='API-yamdb: Код подтверждения.',
@@ -38,4 +144,31 @@ class ConfirmationCodeEmailMessage:
             to=[email],
         )
         message.content_subtype = 'html'
-        message.send()
+        return message
+
+    def build_user_email(self, user) -> EmailMessage:
+        """
+        Метод подготовки сообщения со свежим кодом подтверждения.
+        :param user: Модель User.
+        :return: Сообщение EmailMessage.
+        """
+
+        return self.build_confirmation_code_email(
+            username=user.username,
+            email=user.email,
+            confirmation_code=default_token_generator.make_token(user=user),
+        )
+
+    def send_confirmation_code_email(self, user) -> None:
+        """
+        Метод отправки письма с кодом подтверждения.
+        При EMAIL_QUEUE_ENABLED письмо ставится в очередь и отправляется
+        командой send_emails, не задерживая запрос.
+        :param user: Модель User.
+        :return: None
+        """
+
+        if settings.EMAIL_QUEUE_ENABLED:
+            ConfirmationEmail.objects.create(user=user)
+            return
+        self.build_user_email(user).send()
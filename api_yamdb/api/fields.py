@@ -0,0 +1,54 @@
+from contextlib import contextmanager
+
+from django.db import IntegrityError, router, transaction
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+
+from reviews.slugs import SlugCache, category_slugs, genre_slugs
+
+
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который находит запись по кэшу справочника
+    (reviews.slugs.SlugCache) без запроса к БД на каждый slug.
+    """
+
+    def __init__(self, slug_cache: SlugCache, **kwargs):
+        self.slug_cache = slug_cache
+        kwargs.setdefault('slug_field', 'slug')
+        kwargs.setdefault('queryset', slug_cache.model.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        value = smart_str(data)
+        instance = self.slug_cache.get_instance(value)
+        if instance is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=value)
+        return instance
+
+
+@contextmanager
+def stale_slugs_guard(model):
+    """
+    Транзакция записи произведений, найденных по кэшу слагов. Жанр или
+    категория могли быть удалены в другом процессе, пока кэш этого
+    процесса их еще содержит: вместо ошибки внешнего ключа (500)
+    справочники перечитываются и возвращается ошибка проверки (400).
+    :param model: Модель, определяющая БД для записи.
+    """
+
+    try:
+        with transaction.atomic(using=router.db_for_write(model)):
+            yield
+    except IntegrityError:
+        category_slugs.invalidate()
+        genre_slugs.invalidate()
+        raise serializers.ValidationError(
+            {
+                'non_field_errors': [
+                    'Жанр или категория были удалены, повторите запрос.'
+                ]
+            }
+        )
@@ -0,0 +1,134 @@
+import time
+from typing import Callable, Dict
+
+from django.core.management.base import BaseCommand
+from django.db.models import QuerySet
+
+from api.views import TitleModelViewSet
+from reviews.filters import TitleFilter
+from reviews.models import Comment, Review, Title
+
+
+class Command(BaseCommand):
+    """
+    Команда вывода планов выполнения запросов горячих путей API.
+    Позволяет сравнить планы до и после миграций с индексами:
+    python manage.py migrate reviews 0002 && python manage.py explain_queries
+    python manage.py migrate && python manage.py explain_queries
+    """
+
+    help = 'Вывод планов (EXPLAIN) запросов основных эндпоинтов API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Выполнить запросы (EXPLAIN ANALYZE, только PostgreSQL).',
+        )
+        parser.add_argument(
+            '--query',
+            action='append',
+            help='Имя запроса из списка, можно указать несколько раз.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=0,
+            help='Выполнить каждый запрос N раз и вывести среднее время.',
+        )
+
+    def handle(self, *args, **options):
+        queries = self.get_queries()
+        names = options['query'] or list(queries)
+        explain_options = {'analyze': True} if options['analyze'] else {}
+        for name in names:
+            queryset = queries[name]()
+            self.stdout.write(self.style.SUCCESS(f'== {name}'))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            if options['repeat']:
+                self.stdout.write(
+                    self.get_timing(queries[name], options['repeat'])
+                )
+
+    @staticmethod
+    def get_timing(build: Callable[[], QuerySet], repeat: int) -> str:
+        """
+        Среднее время выполнения запроса с загрузкой объектов.
+        :param build: Функция построения выборки.
+        :param repeat: Количество повторов.
+        :return: Строка с результатом.
+        """
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(build())
+        duration = (time.perf_counter() - started) / repeat * 1000
+        return f'-- {repeat} повторов, среднее время {duration:.2f} мс'
+
+    def get_queries(self) -> Dict[str, Callable[[], QuerySet]]:
+        """
+        Запросы в том виде, в котором их строят view и фильтры API.
+        Параметры берутся из первых записей БД.
+        :return: Словарь {имя запроса: функция построения выборки}.
+        """
+
+        title = Title.objects.order_by('id').first()
+        review = Review.objects.order_by('id').first()
+        category_slug = getattr(getattr(title, 'category', None), 'slug', '')
+        genre = title.genre.first() if title else None
+
+        return {
+            'titles_list': lambda: self.titles({}),
+            'titles_by_year': lambda: self.titles(
+                {'year': getattr(title, 'year', 0)}
+            ),
+            'titles_by_category': lambda: self.titles(
+                {'category': category_slug}
+            ),
+            'titles_by_genre': lambda: self.titles(
+                {'genre': getattr(genre, 'slug', '')}
+            ),
+            'titles_by_name': lambda: self.titles(
+                {'name': getattr(title, 'name', '')[:3]}
+            ),
+            'titles_by_year_range': lambda: self.titles(
+                {'year_min': 1990, 'year_max': 2000, 'ordering': 'year'}
+            ),
+            'titles_by_rating': lambda: self.titles(
+                {'rating_min': 7, 'ordering': '-rating'}
+            ),
+            'titles_order_rating': lambda: self.titles(
+                {'ordering': '-rating'}
+            ),
+            'titles_order_review_count': lambda: self.titles(
+                {'ordering': '-review_count'}
+            ),
+            'titles_order_name': lambda: self.titles({'ordering': 'name'}),
+            'titles_by_genres_all': lambda: self.titles(
+                {
+                    'genre': ','.join(
+                        title.genre.values_list('slug', flat=True)
+                        if title
+                        else ()
+                    ),
+                    'genre_mode': 'all',
+                }
+            ),
+            'titles_search': lambda: self.titles(
+                {'q': getattr(title, 'name', '').split(' ')[0]}
+            ),
+            'reviews_list': lambda: Review.objects.filter(
+                title_id=getattr(title, 'id', 0)
+            ).order_by('-pub_date')[:20],
+            'comments_list': lambda: Comment.objects.filter(
+                review_id=getattr(review, 'id', 0)
+            ).order_by('-pub_date')[:20],
+        }
+
+    @staticmethod
+    def titles(params: Dict[str, str]) -> QuerySet:
+        queryset = TitleFilter(
+            params, queryset=TitleModelViewSet.queryset.all()
+        ).qs
+        return queryset[:20]
@@ -0,0 +1,146 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import chain
+from typing import List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.email import (
+    ConfirmationCodeEmailMessage,
+    email_metrics,
+    send_messages,
+)
+from api.models import FAILED, PENDING, SENT, ConfirmationEmail
+
+
+class Command(BaseCommand):
+    """
+    Обработчик очереди писем с кодом подтверждения.
+    Выбирает пачку писем (SELECT ... FOR UPDATE SKIP LOCKED, поэтому
+    можно запускать несколько обработчиков), продлевает их аренду и
+    отправляет в пуле потоков: каждый поток отправляет свою часть пачки
+    через одно SMTP-соединение. Неудачные письма повторяются с
+    экспоненциальной задержкой до EMAIL_QUEUE_MAX_ATTEMPTS попыток.
+    """
+
+    help = 'Отправка писем из очереди'
+    LEASE = timedelta(minutes=5)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать одну пачку писем и завершиться.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Количество писем в пачке.',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Количество потоков отправки.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза между опросами пустой очереди, секунды.',
+        )
+
+    def handle(self, *args, **options):
+        email_sender = ConfirmationCodeEmailMessage()
+        self.threads = options['threads']
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            while True:
+                emails = self.claim_batch(options['batch_size'])
+                if emails:
+                    self.send_batch(emails, email_sender, executor)
+                if options['once']:
+                    break
+                if not emails:
+                    time.sleep(options['interval'])
+
+    def claim_batch(self, batch_size: int) -> List[ConfirmationEmail]:
+        """
+        Выбор писем, готовых к отправке, с продлением аренды: пока она
+        не истекла, другие обработчики эти письма не выбирают.
+        :param batch_size: Количество писем.
+        :return: Письма.
+        """
+
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                ConfirmationEmail.objects.select_for_update(skip_locked=True)
+                .select_related('user')
+                .filter(status=PENDING, next_attempt_at__lte=now)
+                .order_by('next_attempt_at')[:batch_size]
+            )
+            ConfirmationEmail.objects.filter(
+                pk__in=[email.pk for email in emails]
+            ).update(next_attempt_at=now + self.LEASE)
+        return emails
+
+    def send_batch(
+        self,
+        emails: List[ConfirmationEmail],
+        email_sender: ConfirmationCodeEmailMessage,
+        executor: ThreadPoolExecutor,
+    ) -> None:
+        """
+        Отправка пачки писем и сохранение результатов.
+        :param emails: Письма.
+        :param email_sender: Класс формирования писем.
+        :param executor: Пул потоков отправки.
+        :return: None
+        """
+
+        threads = self.threads
+        chunks = [emails[i::threads] for i in range(threads)]
+        emails = list(chain.from_iterable(chunks))
+        messages = [
+            [email_sender.build_user_email(email.user) for email in chunk]
+            for chunk in chunks
+        ]
+        errors = chain.from_iterable(executor.map(send_messages, messages))
+        now = timezone.now()
+        for email, error in zip(emails, errors):
+            email.attempts += 1
+            if error is None:
+                email.status = SENT
+                email.sent_at = now
+                continue
+            email.last_error = error
+            if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+                email.status = FAILED
+            else:
+                email.next_attempt_at = now + timedelta(
+                    seconds=settings.EMAIL_QUEUE_RETRY_DELAY
+                    * 2 ** (email.attempts - 1)
+                )
+        ConfirmationEmail.objects.bulk_update(
+            emails,
+            fields=(
+                'status',
+                'attempts',
+                'next_attempt_at',
+                'last_error',
+                'sent_at',
+            ),
+        )
+        sent = sum(email.status == SENT for email in emails)
+        metrics = email_metrics.snapshot()
+        self.stdout.write(
+            f'Отправлено писем: {sent}, с ошибкой: {len(emails) - sent}. '
+            f'Всего отправлено: {metrics["sent"]}, '
+            f'SMTP-соединений: {metrics["connections"]}, '
+            f'{metrics["throughput"]:.1f} писем/с'
+        )
@@ -0,0 +1,431 @@
+import fcntl
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from itertools import accumulate
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .connections import connection_metrics
+from .email import email_metrics
+from .throttling import throttle_metrics
+
+PREFIX = 'yamdb'
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Файл метрик завершившихся процессов в METRICS_DIR.
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = 'metrics.lock'
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Гистограммы запросов к API: имя, описание и границы интервалов.
+REQUEST_HISTOGRAMS = (
+    (
+        'request_duration_seconds',
+        'Время обработки запроса',
+        DURATION_BUCKETS,
+    ),
+    ('sql_queries', 'Количество SQL-запросов на запрос', QUERY_BUCKETS),
+    (
+        'sql_duration_seconds',
+        'Время SQL-запросов на запрос',
+        DURATION_BUCKETS,
+    ),
+    (
+        'serialization_duration_seconds',
+        'Время сериализации данных ответа (to_representation)',
+        DURATION_BUCKETS,
+    ),
+    (
+        'render_duration_seconds',
+        'Время рендеринга ответа DRF в JSON',
+        DURATION_BUCKETS,
+    ),
+    ('response_size_bytes', 'Размер тела ответа', SIZE_BUCKETS),
+)
+
+
+class Histogram:
+    """
+    Гистограмма в формате Prometheus: количество значений по интервалам
+    (le - верхняя граница), сумма и количество значений.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> Iterator[str]:
+        bounds = [format_value(bound) for bound in self.buckets] + ['+Inf']
+        for bound, count in zip(bounds, accumulate(self.counts)):
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+        yield f'{name}_sum{{{labels}}} {format_value(self.sum)}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'counts': self.counts, 'sum': self.sum, 'count': self.count}
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        self.counts = [a + b for a, b in zip(self.counts, state['counts'])]
+        self.sum += state['sum']
+        self.count += state['count']
+
+
+class RequestMetrics:
+    """
+    Метрики запросов процесса по view (ViewSet.действие): гистограммы
+    времени, количества и времени SQL-запросов, рендеринга и размера
+    ответа, счетчики ответов по статусам.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.histograms = defaultdict(dict)
+            self.responses = Counter()
+
+    def record(self, view: str, status: int, values: Dict[str, float]):
+        """
+        Учет запроса.
+        :param view: Имя view.
+        :param status: Статус ответа.
+        :param values: Значения по именам гистограмм REQUEST_HISTOGRAMS,
+        отсутствующие не учитываются.
+        :return: None
+        """
+
+        with self.lock:
+            self.responses[view, status] += 1
+            for name, _, buckets in REQUEST_HISTOGRAMS:
+                if name not in values:
+                    continue
+                histograms = self.histograms[name]
+                if view not in histograms:
+                    histograms[view] = Histogram(buckets)
+                histograms[view].observe(values[name])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Значения метрик для сохранения в JSON.
+        :return: Словарь с ключами responses и histograms.
+        """
+
+        with self.lock:
+            return {
+                'responses': [
+                    [view, status, count]
+                    for (view, status), count in self.responses.items()
+                ],
+                'histograms': {
+                    name: {
+                        view: histogram.snapshot()
+                        for view, histogram in histograms.items()
+                    }
+                    for name, histograms in self.histograms.items()
+                },
+            }
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        """
+        Добавление метрик другого процесса.
+        :param state: Результат snapshot().
+        :return: None
+        """
+
+        with self.lock:
+            for view, status, count in state['responses']:
+                self.responses[view, status] += count
+            for name, _, buckets in REQUEST_HISTOGRAMS:
+                histograms = self.histograms[name]
+                for view, histogram in (
+                    state['histograms'].get(name, {}).items()
+                ):
+                    if view not in histograms:
+                        histograms[view] = Histogram(buckets)
+                    histograms[view].merge(histogram)
+
+    def render(self) -> List[str]:
+        name = f'{PREFIX}_responses_total'
+        lines = [
+            f'# HELP {name} Количество ответов',
+            f'# TYPE {name} counter',
+        ]
+        with self.lock:
+            for (view, status), count in sorted(self.responses.items()):
+                labels = f'view="{escape(view)}",status="{status}"'
+                lines.append(f'{name}{{{labels}}} {count}')
+            for histogram_name, description, _ in REQUEST_HISTOGRAMS:
+                name = f'{PREFIX}_{histogram_name}'
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                histograms = self.histograms[histogram_name]
+                for view, histogram in sorted(histograms.items()):
+                    lines.extend(
+                        histogram.render(name, f'view="{escape(view)}"')
+                    )
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+
+def escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Счетчики процесса из collect_metrics(): имя и описание.
+COUNTERS = (
+    ('emails_sent_total', 'Отправленные письма'),
+    ('emails_failed_total', 'Письма с ошибкой отправки'),
+    ('smtp_connections_total', 'Открытые SMTP-соединения'),
+    ('email_duration_seconds_total', 'Время отправки писем'),
+    ('db_connections_total', 'Открытые соединения с БД'),
+    (
+        'db_connections_unusable_total',
+        'Соединения с БД, закрытые проверкой перед запросом',
+    ),
+)
+
+
+def render_counter(name: str, description: str, value: float) -> List[str]:
+    name = f'{PREFIX}_{name}'
+    return [
+        f'# HELP {name} {description}',
+        f'# TYPE {name} counter',
+        f'{name} {format_value(value)}',
+    ]
+
+
+def collect_metrics() -> Dict[str, Any]:
+    """
+    Метрики текущего процесса: запросы к API, соединения с БД, отправка
+    писем и ограничение частоты запросов.
+    :return: Словарь с ключами requests, counters и throttled.
+    """
+
+    emails = email_metrics.snapshot()
+    db_connections = connection_metrics.snapshot()
+    return {
+        'requests': request_metrics.snapshot(),
+        'counters': {
+            'emails_sent_total': emails['sent'],
+            'emails_failed_total': emails['failed'],
+            'smtp_connections_total': emails['connections'],
+            'email_duration_seconds_total': emails['duration'],
+            'db_connections_total': db_connections['opened'],
+            'db_connections_unusable_total': db_connections['unusable'],
+        },
+        'throttled': throttle_metrics.snapshot(),
+    }
+
+
+def merge_metrics(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Сумма метрик нескольких процессов.
+    :param snapshots: Результаты collect_metrics().
+    :return: Метрики в формате collect_metrics().
+    """
+
+    requests = RequestMetrics()
+    counters = Counter()
+    throttled = Counter()
+    for snapshot in snapshots:
+        requests.merge(snapshot['requests'])
+        counters.update(snapshot['counters'])
+        throttled.update(snapshot['throttled'])
+    return {
+        'requests': requests.snapshot(),
+        'counters': dict(counters),
+        'throttled': dict(throttled),
+    }
+
+
+def render_metrics(snapshot: Dict[str, Any]) -> str:
+    """
+    Метрики в текстовом формате Prometheus.
+    :param snapshot: Метрики в формате collect_metrics().
+    :return: Текст метрик.
+    """
+
+    requests = RequestMetrics()
+    requests.merge(snapshot['requests'])
+    lines = requests.render()
+    for name, description in COUNTERS:
+        lines += render_counter(
+            name, description, snapshot['counters'].get(name, 0)
+        )
+    name = f'{PREFIX}_throttled_requests_total'
+    lines += [
+        f'# HELP {name} Запросы, отклоненные ограничением частоты',
+        f'# TYPE {name} counter',
+    ]
+    for scope, count in sorted(snapshot['throttled'].items()):
+        lines.append(f'{name}{{scope="{escape(scope)}"}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def lock_metrics_dir(operation: int) -> Iterator[str]:
+    """
+    Блокировка каталога METRICS_DIR: чтение файлов процессов не
+    пересекается с переносом метрик завершившегося процесса в архив.
+    :param operation: fcntl.LOCK_SH или fcntl.LOCK_EX.
+    :return: Путь к каталогу.
+    """
+
+    directory = settings.METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, operation)
+        yield directory
+
+
+def write_json(path: str, data: Dict[str, Any]) -> None:
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    os.replace(temporary_path, path)
+
+
+def get_process_file(directory: str) -> str:
+    return os.path.join(directory, f'{os.getpid()}.json')
+
+
+class ProcessMetricsWriter:
+    """
+    Сохранение метрик процесса в METRICS_DIR/<pid>.json, чтобы /metrics,
+    обработанный любым воркером gunicorn, возвращал сумму по всем
+    воркерам. Файл перезаписывает фоновый поток процесса раз в
+    METRICS_SAVE_INTERVAL секунд, если метрики изменились.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.changed = False
+        self.stopped = False
+
+    def mark_changed(self) -> None:
+        if not settings.METRICS_DIR:
+            return
+        self.changed = True
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            # После fork поток родителя в процессе не существует.
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                threading.Thread(
+                    target=self.run, name='metrics-writer', daemon=True
+                ).start()
+
+    def run(self) -> None:
+        while not self.stopped:
+            time.sleep(settings.METRICS_SAVE_INTERVAL)
+            if self.changed:
+                self.changed = False
+                self.save()
+
+    def save(self) -> None:
+        with self.lock:
+            if self.stopped or not settings.METRICS_DIR:
+                return
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            write_json(
+                get_process_file(settings.METRICS_DIR), collect_metrics()
+            )
+
+    def archive(self) -> None:
+        """
+        Перенос метрик завершающегося процесса в METRICS_DIR/archive.json,
+        чтобы счетчики не уменьшались при перезапуске воркеров
+        (max_requests gunicorn). Файл процесса удаляется.
+        :return: None
+        """
+
+        if not settings.METRICS_DIR:
+            return
+        with self.lock, lock_metrics_dir(fcntl.LOCK_EX) as directory:
+            self.stopped = True
+            archive_path = os.path.join(directory, ARCHIVE_FILE)
+            snapshots = [collect_metrics()]
+            if os.path.exists(archive_path):
+                with open(archive_path, encoding='utf-8') as file:
+                    snapshots.append(json.load(file))
+            write_json(archive_path, merge_metrics(snapshots))
+            process_file = get_process_file(directory)
+            if os.path.exists(process_file):
+                os.remove(process_file)
+
+
+process_metrics_writer = ProcessMetricsWriter()
+
+
+def load_metrics() -> Dict[str, Any]:
+    """
+    Метрики всех процессов: текущего - из памяти, остальных и
+    завершившихся - из файлов METRICS_DIR. Без METRICS_DIR - только
+    текущего процесса.
+    :return: Метрики в формате collect_metrics().
+    """
+
+    snapshots = [collect_metrics()]
+    if not settings.METRICS_DIR:
+        return snapshots[0]
+    with lock_metrics_dir(fcntl.LOCK_SH) as directory:
+        own_file = get_process_file(directory)
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.endswith('.json') or path == own_file:
+                continue
+            try:
+                with open(path, encoding='utf-8') as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+    return merge_metrics(snapshots)
+
+
+def metrics_view(request) -> HttpResponse:
+    """
+    Эндпоинт /metrics для Prometheus. С METRICS_DIR возвращает сумму
+    метрик всех воркеров, без него - метрики обработавшего процесса;
+    снаружи эндпоинт закрыт в nginx.
+    """
+
+    return HttpResponse(
+        render_metrics(load_metrics()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,181 @@
+import logging
+import time
+from typing import Optional
+
+from django.conf import settings
+
+from .metrics import process_metrics_writer, request_metrics
+from .queries import QueryCounter
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Превышен лимит SQL-запросов на один запрос к API.
+    """
+
+
+class QueryBudgetMiddleware:
+    """
+    Контроль количества SQL-запросов на один запрос к API.
+    Лимит берется из атрибута query_budget класса view: число или словарь
+    {действие ViewSet: число}. Для view без лимита используется
+    QUERY_BUDGET_DEFAULT (None - без ограничения).
+    При превышении пишет предупреждение в лог, а при QUERY_BUDGET_STRICT
+    выбрасывает QueryBudgetExceeded, чтобы N+1 ломал тесты.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and counter.count > budget:
+            message = (
+                f'{request.method} {request.path}: {counter.count} '
+                f'SQL-запросов при лимите {budget}'
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = self.get_view_budget(request, view_func)
+
+    @staticmethod
+    def get_view_budget(request, view_func) -> Optional[int]:
+        """
+        Получение лимита запросов для view.
+        :param request: Экземпляр класса HttpRequest.
+        :param view_func: Функция view, для DRF - результат as_view().
+        :return: Лимит запросов или None.
+        """
+
+        view_class = getattr(view_func, 'cls', None)
+        budget = getattr(view_class, 'query_budget', None)
+        if isinstance(budget, dict):
+            actions = getattr(view_func, 'actions', None) or {}
+            budget = budget.get(actions.get(request.method.lower()))
+        if budget is None:
+            budget = settings.QUERY_BUDGET_DEFAULT
+        return budget
+
+
+def add_serialization_duration(request, duration: float) -> None:
+    """
+    Учет времени сериализации ответа для PerformanceMiddleware.
+    :param request: Экземпляр класса Request DRF, HttpRequest или None.
+    :param duration: Время to_representation, секунды.
+    :return: None
+    """
+
+    if request is None:
+        return
+    request = getattr(request, '_request', request)
+    request.serialization_duration = (
+        getattr(request, 'serialization_duration', 0.0) + duration
+    )
+
+
+class PerformanceMiddleware:
+    """
+    Метрики времени обработки запроса: общее время, количество и время
+    SQL-запросов (connection.execute_wrapper), время сериализации данных
+    (to_representation сериализаторов DRF, входит в общее время view),
+    время рендеринга ответа DRF в JSON и размер ответа. Значения
+    учитываются в api.metrics по имени view (ViewSet.действие) и, при
+    SERVER_TIMING_ENABLED, возвращаются в заголовке Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PERFORMANCE_METRICS_ENABLED:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        values = {
+            'request_duration_seconds': duration,
+            'sql_queries': counter.count,
+            'sql_duration_seconds': counter.duration,
+        }
+        for name in ('serialization_duration', 'render_duration'):
+            duration = getattr(request, name, None)
+            if duration is not None:
+                values[f'{name}_seconds'] = duration
+        if not response.streaming:
+            values['response_size_bytes'] = len(response.content)
+        request_metrics.record(
+            getattr(request, 'view_name', 'unresolved'),
+            response.status_code,
+            values,
+        )
+        process_metrics_writer.mark_changed()
+        if settings.SERVER_TIMING_ENABLED:
+            response['Server-Timing'] = self.get_server_timing(values)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.view_name = self.get_view_name(request, view_func)
+
+    @staticmethod
+    def process_template_response(request, response):
+        # Ответы DRF рендерятся после view, время берется до и после
+        # рендеринга.
+        start = time.perf_counter()
+
+        def set_render_duration(response):
+            request.render_duration = time.perf_counter() - start
+
+        response.add_post_render_callback(set_render_duration)
+        return response
+
+    @staticmethod
+    def get_view_name(request, view_func) -> str:
+        """
+        Имя view для метрик: ViewSet.действие для DRF, иначе модуль и
+        имя функции.
+        :param request: Экземпляр класса HttpRequest.
+        :param view_func: Функция view, для DRF - результат as_view().
+        :return: Имя view.
+        """
+
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None:
+            return f'{view_func.__module__}.{view_func.__name__}'
+        actions = getattr(view_func, 'actions', None) or {}
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{view_class.__name__}.{action}'
+
+    @staticmethod
+    def get_server_timing(values: dict) -> str:
+        metrics = [
+            'total;dur={:.1f}'.format(
+                values['request_duration_seconds'] * 1000
+            ),
+            'db;dur={:.1f};desc="{} queries"'.format(
+                values['sql_duration_seconds'] * 1000, values['sql_queries']
+            ),
+        ]
+        for name, key in (
+            ('serialize', 'serialization_duration_seconds'),
+            ('render', 'render_duration_seconds'),
+        ):
+            if key in values:
+                metrics.append(
+                    '{};dur={:.1f}'.format(name, values[key] * 1000)
+                )
+        return ', '.join(metrics)
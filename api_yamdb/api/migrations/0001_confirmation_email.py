@@ -0,0 +1,95 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfirmationEmail',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'Ожидает отправки'),
+                            ('sent', 'Отправлено'),
+                            ('failed', 'Ошибка отправки'),
+                        ],
+                        default='pending',
+                        max_length=20,
+                        verbose_name='Статус',
+                    ),
+                ),
+                (
+                    'attempts',
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name='Количество попыток'
+                    ),
+                ),
+                (
+                    'next_attempt_at',
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name='Время следующей попытки',
+                    ),
+                ),
+                (
+                    'last_error',
+                    models.TextField(
+                        blank=True, verbose_name='Последняя ошибка'
+                    ),
+                ),
+                (
+                    'created',
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name='Дата создания'
+                    ),
+                ),
+                (
+                    'sent_at',
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name='Дата отправки'
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='Пользователь',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Письмо с кодом подтверждения',
+                'verbose_name_plural': 'Письма с кодом подтверждения',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='confirmationemail',
+            index=models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='email_status_next_attempt_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils import timezone
+
+User = get_user_model()
+
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+EMAIL_STATUS_CHOICES = [
+    (PENDING, 'Ожидает отправки'),
+    (SENT, 'Отправлено'),
+    (FAILED, 'Ошибка отправки'),
+]
+
+
+class ConfirmationEmail(models.Model):
+    """
+    Очередь писем с кодом подтверждения.
+    Код генерируется при отправке, поэтому в таблице не хранится.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=20,
+        choices=EMAIL_STATUS_CHOICES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Количество попыток',
+        default=0,
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Время следующей попытки',
+        default=timezone.now,
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Дата отправки',
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'Письмо с кодом подтверждения'
+        verbose_name_plural = 'Письма с кодом подтверждения'
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='email_status_next_attempt_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.user_id}: {self.status}'
@@ -0,0 +1,198 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset-пагинация по составному ключу сортировки.
+    Вместо COUNT(*) и OFFSET следующая страница выбирается условием
+    "после последней записи предыдущей страницы", которое использует
+    составной индекс по полям keyset_ordering.
+    Ключ сортировки задается атрибутом keyset_ordering у view, последним
+    полем должен быть уникальный столбец (обычно id).
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request,
+        view=None,
+    ) -> List[Any]:
+        """
+        Выборка страницы по курсору из параметров запроса.
+        :param queryset: Выборка объектов.
+        :param request: Экземпляр класса Request DRF.
+        :param view: ViewSet с атрибутом keyset_ordering.
+        :return: Объекты страницы.
+        """
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(view.keyset_ordering)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(position, reverse)
+            )
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+        results = list(queryset.order_by(*ordering)[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(
+            OrderedDict(
+                [
+                    ('next', self.get_next_link()),
+                    ('previous', self.get_previous_link()),
+                    ('results', data),
+                ]
+            )
+        )
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def get_keyset_filter(self, position: Sequence[Any], reverse: bool) -> Q:
+        """
+        Условие "строго после позиции" для составного ключа сортировки:
+        (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ...
+        Направление сравнения зависит от направления сортировки поля.
+        :param position: Значения полей ключа последней записи.
+        :param reverse: Выборка в обратном направлении.
+        :return: Условие фильтрации.
+        """
+
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, instance) -> Tuple[Any, ...]:
+        return tuple(
+            attrgetter(field.lstrip('-'))(instance) for field in self.ordering
+        )
+
+    def encode_cursor(self, position: Sequence[Any], reverse: bool) -> str:
+        """
+        Кодирование позиции в параметр cursor ссылки на страницу.
+        :param position: Значения полей ключа.
+        :param reverse: Выборка в обратном направлении.
+        :return: Ссылка на страницу.
+        """
+
+        data = json.dumps(
+            {'p': [self.to_json(value) for value in position], 'r': reverse},
+            separators=(',', ':'),
+        )
+        cursor = base64.urlsafe_b64encode(data.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(
+        self,
+        request,
+        model,
+    ) -> Tuple[Optional[Tuple[Any, ...]], bool]:
+        """
+        Разбор параметра cursor. Пустой cursor - первая страница.
+        :param request: Экземпляр класса Request DRF.
+        :param model: Модель выборки, для приведения типов полей ключа.
+        :return: Позиция (или None) и направление выборки.
+        """
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            values = data['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = tuple(
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            )
+            return position, bool(data.get('r'))
+        except (
+            binascii.Error,
+            KeyError,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def invert(field: str) -> str:
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def to_json(value: Any) -> Any:
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Пагинация по номеру страницы (по умолчанию) с переключением на
+    keyset-пагинацию, если в запросе есть параметр cursor (в том числе
+    пустой) и у view задан keyset_ordering.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if getattr(view, 'keyset_ordering', None) and (
+            self.keyset_pagination_class.cursor_query_param
+            in request.query_params
+        ):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
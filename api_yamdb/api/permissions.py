@@ -8,7 +8,9 @@ class IsAuthor(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        return request.user.is_authenticated and obj.author == request.user
+        return (
+            request.user.is_authenticated and obj.author_id == request.user.pk
+        )
 
 
 class IsModerator(BasePermission):
@@ -0,0 +1,33 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+
+class QueryCounter:
+    """
+    Контекстный менеджер подсчета SQL-запросов и времени их выполнения
+    во всех подключениях к БД (через connection.execute_wrapper).
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+    def __enter__(self) -> 'QueryCounter':
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stack.close()
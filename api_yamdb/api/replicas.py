@@ -0,0 +1,118 @@
+import random
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = 'api:replica:pin:{user}'
+
+state = threading.local()
+
+
+def get_replica() -> Optional[str]:
+    """
+    Реплика, из которой читает текущий запрос.
+    :return: Имя подключения или None - чтение из основной БД.
+    """
+
+    return getattr(state, 'replica', None)
+
+
+def set_replica(alias: Optional[str]) -> None:
+    state.replica = alias
+
+
+class ReplicaRouter:
+    """
+    Роутер БД: запись всегда в основную БД, чтение - в реплику, если ее
+    выбрал ReplicaReadMixin для текущего запроса. Миграции на реплики
+    не применяются, схему они получают репликацией.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        return get_replica()
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints) -> Optional[bool]:
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+def pin_to_primary(request, response) -> None:
+    """
+    Чтение из основной БД в течение REPLICA_STICKY_SECONDS после
+    изменения данных, чтобы пользователь видел свои изменения при
+    отставании реплики. Метка хранится в кэше для пользователя и в
+    cookie (если кэш у каждого процесса свой).
+    :param request: Экземпляр класса Request DRF.
+    :param response: Ответ на запрос изменения.
+    :return: None
+    """
+
+    timeout = settings.REPLICA_STICKY_SECONDS
+    if request.user.is_authenticated:
+        caches[settings.API_CACHE_ALIAS].set(
+            PIN_KEY.format(user=request.user.pk), True, timeout=timeout
+        )
+    response.set_cookie(
+        settings.REPLICA_STICKY_COOKIE,
+        '1',
+        max_age=timeout,
+        httponly=True,
+        samesite='Lax',
+    )
+
+
+def is_pinned_to_primary(request) -> bool:
+    if request.COOKIES.get(settings.REPLICA_STICKY_COOKIE):
+        return True
+    return request.user.is_authenticated and bool(
+        caches[settings.API_CACHE_ALIAS].get(
+            PIN_KEY.format(user=request.user.pk)
+        )
+    )
+
+
+class ReplicaReadMixin:
+    """
+    Миксин ViewSet: безопасные запросы (GET, HEAD, OPTIONS) читают из
+    случайной реплики, одной на весь запрос. Запросы изменения идут в
+    основную БД и закрепляют за пользователем основную БД на
+    REPLICA_STICKY_SECONDS.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            settings.REPLICA_DATABASES
+            and request.method in SAFE_METHODS
+            and not is_pinned_to_primary(request)
+        ):
+            set_replica(random.choice(settings.REPLICA_DATABASES))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            settings.REPLICA_DATABASES
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            pin_to_primary(request, response)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            set_replica(None)
@@ -1,15 +1,58 @@
 import datetime
+import time
 
-from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import IntegrityError
 from rest_framework import serializers
 
-from reviews.models import Title, Category, Genre, Review, Comment, User
+from reviews.models import (
+    Title,
+    TitleRanking,
+    Category,
+    Genre,
+    Review,
+    Comment,
+    User,
+)
+from reviews.ratings import get_histogram
+from reviews.slugs import category_slugs, genre_slugs
 from .email import ConfirmationCodeEmailMessage
+from .fields import CachedSlugRelatedField
+from .middleware import add_serialization_duration
 from .validators import username_validator
 
 
+class SerializationTimingMixin:
+    """
+    Учет времени сериализации ответа в PerformanceMiddleware: время
+    to_representation корневого сериализатора (для списка - каждого
+    элемента) добавляется к запросу из контекста.
+    """
+
+    def to_representation(self, instance):
+        parent = self.parent
+        if parent is not None and not (
+            isinstance(parent, serializers.ListSerializer)
+            and parent.parent is None
+        ):
+            return super().to_representation(instance)
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            add_serialization_duration(
+                self.context.get('request'), time.perf_counter() - start
+            )
+
+
+class TimedModelSerializer(
+    SerializationTimingMixin, serializers.ModelSerializer
+):
+    """
+    ModelSerializer с учетом времени сериализации ответа.
+    """
+
+
 class SignUpSerializer(serializers.Serializer):
     """
     Сериализатор аутентификации пользователя.
@@ -51,13 +94,8 @@ class SignUpSerializer(serializers.Serializer):
                 )
             }
             raise serializers.ValidationError(detail=data)
-        confirmation_code = default_token_generator.make_token(user=user)
         email_sender = ConfirmationCodeEmailMessage()
-        email_sender.send_confirmation_code_email(
-            username=user.username,
-            email=user.email,
-            confirmation_code=confirmation_code,
-        )
+        email_sender.send_confirmation_code_email(user=user)
         return user
 
 
@@ -89,7 +127,7 @@ class TokenResponseSerializer(serializers.Serializer):
     token = serializers.CharField(label='Токен')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedModelSerializer):
     """
     Сериализатор категорий.
     """
@@ -102,7 +140,7 @@ class CategorySerializer(serializers.ModelSerializer):
         )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedModelSerializer):
     """
     Сериализатор жанров.
     """
@@ -115,9 +153,54 @@ class GenreSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleGetSerializer(serializers.ModelSerializer):
+def include_stats(request) -> bool:
+    """
+    Запрошена ли статистика оценок в ответе (?include=stats).
+    :param request: Экземпляр класса Request DRF или None.
+    :return: True, если статистика запрошена.
+    """
+
+    if request is None:
+        return False
+    include = request.query_params.get('include', '')
+    return 'stats' in include.split(',')
+
+
+class TitleStatsSerializer(TimedModelSerializer):
+    """
+    Сериализатор статистики оценок произведения.
+    Гистограмма строится по строкам TitleScore (related_name scores),
+    их следует загружать через prefetch_related('scores').
+    """
+
+    count = serializers.IntegerField(
+        source='rating_count',
+        read_only=True,
+        label='Количество оценок',
+    )
+    average = serializers.FloatField(
+        source='rating',
+        read_only=True,
+        label='Средняя оценка',
+    )
+    histogram = serializers.SerializerMethodField(label='Гистограмма оценок')
+
+    class Meta:
+        model = Title
+        fields = (
+            'count',
+            'average',
+            'histogram',
+        )
+
+    def get_histogram(self, title: Title) -> dict:
+        return get_histogram(title.scores.all())
+
+
+class TitleGetSerializer(TimedModelSerializer):
     """
     Сериализатор произведений на GET запрос.
+    Статистика оценок (stats) выводится при параметре ?include=stats.
     """
 
     genre = GenreSerializer(many=True, label='Жанры')
@@ -126,6 +209,11 @@ class TitleGetSerializer(serializers.ModelSerializer):
         read_only=True,
         label='Рейтинг',
     )
+    stats = TitleStatsSerializer(
+        source='*',
+        read_only=True,
+        label='Статистика оценок',
+    )
 
     class Meta:
         model = Title
@@ -137,22 +225,48 @@ class TitleGetSerializer(serializers.ModelSerializer):
             'genre',
             'category',
             'rating',
+            'stats',
+        )
+
+    def get_fields(self):
+        # Поля строятся при первом обращении, когда вложенный сериализатор
+        # уже привязан к родителю и self.context - контекст корневого.
+        fields = super().get_fields()
+        if not include_stats(self.context.get('request')):
+            fields.pop('stats')
+        return fields
+
+
+class TitleRankingSerializer(TimedModelSerializer):
+    """
+    Сериализатор позиции произведения в рейтинге.
+    """
+
+    title = TitleGetSerializer(label='Произведение')
+
+    class Meta:
+        model = TitleRanking
+        fields = (
+            'score',
+            'trending',
+            'rating_count',
+            'title',
         )
 
 
-class TitlePostPatchSerializer(serializers.ModelSerializer):
+class TitlePostPatchSerializer(TimedModelSerializer):
     """
     Сериализатор произведений на POST запрос.
     """
 
-    genre = serializers.SlugRelatedField(
+    genre = CachedSlugRelatedField(
+        slug_cache=genre_slugs,
         many=True,
-        slug_field='slug',
-        queryset=Genre.objects.all(),
         label='Жанры',
     )
-    category = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Category.objects.all(), label='Категория'
+    category = CachedSlugRelatedField(
+        slug_cache=category_slugs,
+        label='Категория',
     )
 
     class Meta:
@@ -174,7 +288,7 @@ class TitlePostPatchSerializer(serializers.ModelSerializer):
         return value
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedModelSerializer):
     """
     Сериализатор отзывов
     """
@@ -206,7 +320,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         if (
             method == 'POST'
             and Review.objects.filter(
-                author=author, title__id=title_id
+                author_id=author.pk, title__id=title_id
             ).exists()
         ):
             raise serializers.ValidationError(
@@ -215,7 +329,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedModelSerializer):
     """
     Сериализатор комментариев
     """
@@ -236,7 +350,7 @@ class CommentSerializer(serializers.ModelSerializer):
         )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedModelSerializer):
     """
     Сериализатор пользователя.
     """
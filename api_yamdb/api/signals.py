@@ -0,0 +1,66 @@
+from functools import partial
+
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.exports import csv_loaded
+from reviews.models import Category, Genre, Review, Title, User
+from reviews.rankings import rankings_refreshed
+from .authentication import invalidate_user_state
+from .cache import bump_generation
+from .connections import close_unusable_connections, connection_metrics
+
+
+def invalidate_after_commit(*scopes: str) -> None:
+    """
+    Инвалидация после фиксации транзакции, чтобы параллельный запрос
+    не сохранил в кэш старые данные под новым поколением.
+    """
+
+    transaction.on_commit(partial(bump_generation, *scopes))
+
+
+@receiver((post_save, post_delete), sender=Category)
+def invalidate_categories(sender, **kwargs) -> None:
+    invalidate_after_commit('categories', 'titles')
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def invalidate_genres(sender, **kwargs) -> None:
+    invalidate_after_commit('genres', 'titles')
+
+
+@receiver((post_save, post_delete), sender=Title)
+@receiver((post_save, post_delete), sender=Review)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_titles(sender, **kwargs) -> None:
+    invalidate_after_commit('titles')
+
+
+@receiver(csv_loaded)
+def invalidate_loaded_data(sender, **kwargs) -> None:
+    bump_generation('categories', 'genres', 'titles')
+
+
+@receiver(rankings_refreshed)
+def invalidate_rankings(sender, **kwargs) -> None:
+    bump_generation('rankings')
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_user(sender, instance, **kwargs) -> None:
+    invalidate_user_state(instance.pk)
+    transaction.on_commit(partial(invalidate_user_state, instance.pk))
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs) -> None:
+    close_unusable_connections()
+
+
+@receiver(connection_created)
+def count_connection(sender, **kwargs) -> None:
+    connection_metrics.record_opened()
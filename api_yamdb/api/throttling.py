@@ -0,0 +1,233 @@
+import hashlib
+import math
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .cache import get_cache
+
+THROTTLE_KEY = 'api:throttle:{scope}:{ident}:{bucket}'
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class LocalCounterStore:
+    """
+    Счетчики в памяти процесса. Подходит для одного воркера: у каждого
+    процесса gunicorn свои счетчики.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Tuple[int, float]] = {}
+        self.next_expire = 0.0
+
+    def get_many(self, keys: List[str]) -> Dict[str, int]:
+        now = time.monotonic()
+        with self.lock:
+            return {
+                key: self.counters[key][0]
+                for key in keys
+                if key in self.counters and self.counters[key][1] > now
+            }
+
+    def incr(self, key: str, timeout: int) -> None:
+        now = time.monotonic()
+        with self.lock:
+            value, expires = self.counters.get(key, (0, 0))
+            if expires <= now:
+                value, expires = 0, now + timeout
+            self.counters[key] = (value + 1, expires)
+            if self.next_expire <= now:
+                self.expire(now)
+                self.next_expire = now + timeout
+
+    def expire(self, now: float) -> None:
+        """
+        Удаление истекших счетчиков, не чаще раза в окно.
+        :param now: Текущее время.
+        :return: None
+        """
+
+        for key in [
+            key
+            for key, (_, expires) in self.counters.items()
+            if expires <= now
+        ]:
+            del self.counters[key]
+
+
+class CacheCounterStore:
+    """
+    Счетчики в кэше API_CACHE_ALIAS. С общим кэшем (Redis, memcached)
+    лимиты действуют на все воркеры gunicorn.
+    """
+
+    def get_many(self, keys: List[str]) -> Dict[str, int]:
+        return get_cache().get_many(keys)
+
+    def incr(self, key: str, timeout: int) -> None:
+        cache = get_cache()
+        cache.add(key, 0, timeout=timeout)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=timeout)
+
+
+class ThrottleMetrics:
+    """
+    Счетчики отклоненных запросов по областям ограничений.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rejected = Counter()
+
+    def record(self, scope: str) -> None:
+        with self.lock:
+            self.rejected[scope] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.rejected)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.rejected.clear()
+
+
+throttle_metrics = ThrottleMetrics()
+_stores = {}
+
+
+def get_store():
+    """
+    Хранилище счетчиков из настройки THROTTLE_STORE, одно на процесс.
+    :return: Хранилище счетчиков.
+    """
+
+    path = settings.THROTTLE_STORE
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    Разбор ограничения вида '5/min'.
+    :param rate: Ограничение.
+    :return: Количество запросов и длина окна в секундах.
+    """
+
+    count, period = rate.split('/')
+    return int(count), DURATIONS[period[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов скользящим окном.
+    Хранятся только два счетчика на ключ: текущего и предыдущего окна;
+    число запросов за последние window секунд оценивается как
+    текущий + предыдущий * (доля предыдущего окна, попадающая в
+    скользящее). Лимит задается в DEFAULT_THROTTLE_RATES по scope,
+    ключи (IP, имя пользователя и т.п.) возвращает get_idents.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self.limit, self.window = parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        )
+        self.retry_after = None
+
+    def get_idents(self, request, view) -> List[str]:
+        raise NotImplementedError('Метод get_idents должен быть определен.')
+
+    def get_keys(self, ident: str, bucket: int) -> Tuple[str, str]:
+        digest = hashlib.md5(ident.encode()).hexdigest()
+        return tuple(
+            THROTTLE_KEY.format(scope=self.scope, ident=digest, bucket=number)
+            for number in (bucket - 1, bucket)
+        )
+
+    def allow_request(self, request, view) -> bool:
+        store = get_store()
+        now = time.time()
+        bucket, elapsed = divmod(now, self.window)
+        bucket = int(bucket)
+        keys = [
+            self.get_keys(ident, bucket)
+            for ident in self.get_idents(request, view)
+        ]
+        counters = store.get_many([key for pair in keys for key in pair])
+        for previous_key, current_key in keys:
+            previous = counters.get(previous_key, 0)
+            current = counters.get(current_key, 0)
+            estimate = previous * (1 - elapsed / self.window) + current
+            if estimate >= self.limit:
+                self.retry_after = self.get_wait(previous, current, elapsed)
+                throttle_metrics.record(self.scope)
+                return False
+        for _, current_key in keys:
+            store.incr(current_key, timeout=2 * self.window)
+        return True
+
+    def get_wait(self, previous: int, current: int, elapsed: float) -> float:
+        """
+        Время до момента, когда оценка опустится ниже лимита.
+        :param previous: Счетчик предыдущего окна.
+        :param current: Счетчик текущего окна.
+        :param elapsed: Прошло секунд с начала текущего окна.
+        :return: Секунды ожидания.
+        """
+
+        window = self.window
+        next_window = window - elapsed
+        if current < self.limit and previous:
+            excess = previous * (1 - elapsed / window) + current - self.limit
+            wait = (excess + 1) / previous * window
+            if wait <= next_window:
+                return wait
+        decay = max(0, 1 - (self.limit - 1) / max(current, 1))
+        return next_window + window * decay
+
+    def wait(self) -> Optional[float]:
+        if self.retry_after is None:
+            return None
+        return math.ceil(self.retry_after)
+
+
+class AuthIPThrottle(SlidingWindowThrottle):
+    """
+    Ограничение запросов регистрации и получения токена с одного IP.
+    """
+
+    scope = 'auth_ip'
+
+    def get_idents(self, request, view) -> List[str]:
+        return [self.get_ident(request)]
+
+
+class AuthIdentityThrottle(SlidingWindowThrottle):
+    """
+    Ограничение запросов регистрации и получения токена для одного
+    имени пользователя и одной эл.почты независимо от IP.
+    """
+
+    scope = 'auth_identity'
+    fields = ('username', 'email')
+
+    def get_idents(self, request, view) -> List[str]:
+        data = request.data if hasattr(request.data, 'get') else {}
+        return [
+            f'{field}:{str(data[field]).strip().lower()}'
+            for field in self.fields
+            if data.get(field)
+        ]
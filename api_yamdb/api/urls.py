@@ -9,6 +9,7 @@ from .views import (
     GenreViewSet,
     ReviewModelViewSet,
     CommentModelViewSet,
+    ExportViewSet,
     SignUpViewSet,
     TokenViewSet,
     UsersModelViewSet,
@@ -49,6 +50,12 @@ router.register(
     basename='comments',
 )
 
+router.register(
+    'export',
+    ExportViewSet,
+    basename='export',
+)
+
 router.register(
     'auth',
     SignUpViewSet,
@@ -1,28 +1,52 @@
 from typing import List, Union
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.http import StreamingHttpResponse
 from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import viewsets, status, permissions
+from rest_framework import viewsets, serializers, status, permissions
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
+from rest_framework.parsers import JSONParser
 from rest_framework.generics import get_object_or_404
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 
 from reviews.models import (
     Title,
+    TitleRanking,
     Category,
     Genre,
     Review,
     Comment,
 )
-from reviews.filters import TitleFilter
+from reviews.exports import (
+    EXPORT_TABLES,
+    get_csv_table,
+    get_rows,
+    iter_csv,
+    iter_ndjson,
+)
+from reviews.filters import (
+    TitleFilter,
+    TitleRankingFilter,
+    get_keyset_ordering,
+)
+from .authentication import (
+    get_access_token,
+    get_full_user,
+    get_user_instance,
+)
+from .bulk import CREATED, INVALID, UPDATED, save_titles, validate_titles
+from .cache import cache_response
 from .custom_viewset import CreateListDestroyModelMixinViewSet
+from .fields import stale_slugs_guard
+from .parsers import NDJSONParser
 from .permissions import (
     IsAdminOrReadOnly,
     IsSuperuser,
@@ -30,8 +54,12 @@ from .permissions import (
     IsAuthor,
     IsModerator,
 )
+from .replicas import ReplicaReadMixin
+from .throttling import AuthIdentityThrottle, AuthIPThrottle
 from .serializers import (
     TitleGetSerializer,
+    TitleStatsSerializer,
+    TitleRankingSerializer,
     CategorySerializer,
     GenreSerializer,
     TitlePostPatchSerializer,
@@ -41,6 +69,7 @@ from .serializers import (
     TokenResponseSerializer,
     SignUpSerializer,
     UserSerializer,
+    include_stats,
 )
 
 User = get_user_model()
@@ -60,6 +89,7 @@ class SignUpViewSet(viewsets.GenericViewSet):
 
     serializer_class = SignUpSerializer
     swagger_tags = ('auth',)
+    throttle_classes = (AuthIPThrottle, AuthIdentityThrottle)
 
     @action(
         detail=False,
@@ -96,6 +126,7 @@ class TokenViewSet(viewsets.GenericViewSet):
     """
 
     serializer_class = TokenCreateSerializer
+    throttle_classes = (AuthIPThrottle, AuthIdentityThrottle)
 
     @action(
         detail=False,
@@ -121,7 +152,7 @@ class TokenViewSet(viewsets.GenericViewSet):
         if not user_confirmation_code:
             data = {'confirmation_code': 'Неверный код подтверждения'}
             return Response(data=data, status=status.HTTP_400_BAD_REQUEST)
-        response = {'token': str(AccessToken.for_user(user))}
+        response = {'token': str(get_access_token(user))}
         return Response(response, status=status.HTTP_200_OK)
 
 
@@ -151,20 +182,21 @@ class UsersModelViewSet(viewsets.ModelViewSet):
         :return: Response DRF.
         """
 
+        user = get_full_user(request.user)
         if request.method == 'PATCH':
             serializer = self.get_serializer(
-                instance=request.user, data=request.data, partial=True
+                instance=user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
 
             # Если пользователь пытается изменить свою роль, вернуть роль из
             # request.user
             if serializer.validated_data.get('role'):
-                serializer.validated_data['role'] = request.user.role
+                serializer.validated_data['role'] = user.role
             serializer.save()
             return Response(serializer.data)
 
-        serializer = self.get_serializer(request.user, many=False)
+        serializer = self.get_serializer(user, many=False)
         return Response(serializer.data)
 
 
@@ -174,25 +206,50 @@ class UsersModelViewSet(viewsets.ModelViewSet):
         responses={status.HTTP_201_CREATED: TitleGetSerializer()}
     ),
 )
-class TitleModelViewSet(viewsets.ModelViewSet):
+class TitleModelViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ModelViewSet произведений.
     """
 
     queryset = (
-        Title.objects.prefetch_related('reviews')
-        .annotate(rating=Avg('reviews__score'))
+        Title.objects.select_related('category')
+        .prefetch_related('genre')
+        .defer('search_vector')
         .order_by('year')
     )
-    filter_backends = (
-        DjangoFilterBackend,
-        SearchFilter,
-    )
+    filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly & IsAdminOrReadOnly
         | IsSuperuser,
     )
+    # С ?include=stats добавляется запрос строк гистограмм оценок,
+    # с фильтрами по слагам - загрузка справочника после его изменения.
+    query_budget = {'list': 4, 'retrieve': 3, 'stats': 2, 'top': 3}
+    top_limit = serializers.IntegerField(min_value=1, max_value=100)
+    top_default_limit = 10
+    default_keyset_ordering = ('year', 'id')
+
+    @property
+    def keyset_ordering(self):
+        """
+        Ключ keyset-пагинации с учетом параметра ?ordering=.
+        """
+
+        if self.request.query_params.get('q'):
+            # Результаты поиска сортируются по релевантности.
+            return None
+        ordering = self.request.query_params.get('ordering', '')
+        values = [value for value in ordering.split(',') if value]
+        if not values:
+            return self.default_keyset_ordering
+        return get_keyset_ordering(values)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if include_stats(self.request):
+            queryset = queryset.prefetch_related('scores')
+        return queryset
 
     def get_serializer_class(
         self,
@@ -208,6 +265,117 @@ class TitleModelViewSet(viewsets.ModelViewSet):
             serializer = TitlePostPatchSerializer
         return serializer
 
+    @cache_response('titles')
+    def list(self, request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
+
+    @cache_response('titles')
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        return super().retrieve(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        responses={status.HTTP_200_OK: TitleStatsSerializer()}
+    )
+    @action(detail=True, methods=['get'], url_path='stats')
+    @cache_response('titles')
+    def stats(self, request: Request, pk=None) -> Response:
+        """
+        Статистика оценок произведения: количество, среднее и гистограмма.
+        Читается из сохраненных счетчиков, без выборки отзывов.
+        :param request: Экземпляр класса Request DRF.
+        :param pk: id произведения.
+        :return: Response DRF.
+        """
+
+        title = get_object_or_404(
+            Title.objects.only(
+                'id', 'rating', 'rating_count'
+            ).prefetch_related('scores'),
+            pk=pk,
+        )
+        return Response(
+            TitleStatsSerializer(title, context={'request': request}).data
+        )
+
+    @swagger_auto_schema(
+        responses={status.HTTP_200_OK: TitleRankingSerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'], url_path='top')
+    @cache_response('titles', 'rankings')
+    def top(self, request: Request) -> Response:
+        """
+        Лучшие (?order=score, по умолчанию) или популярные
+        (?order=trending) произведения из таблицы TitleRanking с
+        фильтрами category, genre, year_min, year_max и ?limit=
+        (до 100). Таблица пересчитывается командой refresh_rankings.
+        :param request: Экземпляр класса Request DRF.
+        :return: Response DRF.
+        """
+
+        queryset = (
+            TitleRanking.objects.select_related('title__category')
+            .prefetch_related('title__genre')
+            .defer('title__search_vector')
+            .order_by('-score', 'title_id')
+        )
+        if include_stats(request):
+            queryset = queryset.prefetch_related('title__scores')
+        filterset = TitleRankingFilter(request.query_params, queryset)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        limit = self.top_limit.run_validation(
+            request.query_params.get('limit', self.top_default_limit)
+        )
+        serializer = TitleRankingSerializer(
+            filterset.qs[:limit], many=True, context={'request': request}
+        )
+        return Response(serializer.data)
+
+    @swagger_auto_schema(request_body=TitlePostPatchSerializer(many=True))
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk',
+        parser_classes=(JSONParser, NDJSONParser),
+        permission_classes=(IsAdmin | IsSuperuser,),
+    )
+    def bulk(self, request: Request) -> Response:
+        """
+        Массовая загрузка произведений списком JSON или NDJSON
+        (Content-Type: application/x-ndjson). Элемент с id изменяет
+        произведение, без id - создает новое. Корректные элементы
+        сохраняются в одной транзакции, в ответе - результат по каждому
+        элементу.
+        :param request: Экземпляр класса Request DRF.
+        :return: Response DRF.
+        """
+
+        items = request.data
+        if not isinstance(items, list):
+            raise serializers.ValidationError(
+                {'non_field_errors': ['Ожидается список произведений.']}
+            )
+        if len(items) > settings.TITLES_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                {
+                    'non_field_errors': [
+                        'Не больше {} произведений в запросе.'.format(
+                            settings.TITLES_BULK_MAX_ITEMS
+                        )
+                    ]
+                }
+            )
+        results, valid = validate_titles(items, self.get_serializer_context())
+        with stale_slugs_guard(Title):
+            ids = save_titles(valid)
+        data = {CREATED: 0, UPDATED: 0, INVALID: 0}
+        for result in results:
+            data[result['status']] += 1
+            if result['index'] in ids:
+                result['id'] = ids[result['index']]
+        data['results'] = results
+        return Response(data)
+
     def create(self, request, *args, **kwargs) -> Response:
         """
         Переопределенный метод create.
@@ -218,7 +386,10 @@ class TitleModelViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
-        response_serializer = TitleGetSerializer(instance=serializer.instance)
+        response_serializer = TitleGetSerializer(
+            instance=serializer.instance,
+            context=self.get_serializer_context(),
+        )
         headers = self.get_success_headers(response_serializer.data)
         return Response(
             response_serializer.data,
@@ -226,8 +397,16 @@ class TitleModelViewSet(viewsets.ModelViewSet):
             headers=headers,
         )
 
+    def perform_create(self, serializer: TitlePostPatchSerializer) -> None:
+        with stale_slugs_guard(Title):
+            serializer.save()
+
+    def perform_update(self, serializer: TitlePostPatchSerializer) -> None:
+        with stale_slugs_guard(Title):
+            serializer.save()
+
 
-class CategoryViewSet(CreateListDestroyModelMixinViewSet):
+class CategoryViewSet(ReplicaReadMixin, CreateListDestroyModelMixinViewSet):
     """
     GenericViewSet категорий.
     """
@@ -238,9 +417,14 @@ class CategoryViewSet(CreateListDestroyModelMixinViewSet):
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    query_budget = {'list': 2}
 
+    @cache_response('categories')
+    def list(self, request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
 
-class GenreViewSet(CreateListDestroyModelMixinViewSet):
+
+class GenreViewSet(ReplicaReadMixin, CreateListDestroyModelMixinViewSet):
     """
     GenericViewSet жанров.
     """
@@ -251,9 +435,14 @@ class GenreViewSet(CreateListDestroyModelMixinViewSet):
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    query_budget = {'list': 2}
+
+    @cache_response('genres')
+    def list(self, request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
 
 
-class ReviewModelViewSet(viewsets.ModelViewSet):
+class ReviewModelViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ModelViewSet отзывов.
     """
@@ -266,6 +455,8 @@ class ReviewModelViewSet(viewsets.ModelViewSet):
         | IsSuperuser,
     )
     swagger_tags = ('reviews',)
+    query_budget = {'list': 2, 'retrieve': 1}
+    keyset_ordering = ('-pub_date', 'id')
 
     def get_queryset(self) -> List[Review]:
         """
@@ -279,8 +470,10 @@ class ReviewModelViewSet(viewsets.ModelViewSet):
         if getattr(self, 'swagger_fake_view', False):
             return Review.objects.none()
 
-        return Review.objects.filter(title__id=self.get_title_id()).order_by(
-            '-pub_date',
+        return (
+            Review.objects.filter(title__id=self.get_title_id())
+            .select_related('author')
+            .order_by('-pub_date')
         )
 
     def perform_create(
@@ -303,7 +496,7 @@ class ReviewModelViewSet(viewsets.ModelViewSet):
         )
         serializer.save(
             title=title,
-            author=self.request.user,
+            author=get_user_instance(self.request.user),
         )
 
     def get_title_id(self) -> int:
@@ -315,7 +508,7 @@ class ReviewModelViewSet(viewsets.ModelViewSet):
         return self.kwargs.get('title_id')
 
 
-class CommentModelViewSet(viewsets.ModelViewSet):
+class CommentModelViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ModelViewSet комментариев.
     """
@@ -328,6 +521,8 @@ class CommentModelViewSet(viewsets.ModelViewSet):
         | IsSuperuser,
     )
     swagger_tags = ('comments',)
+    query_budget = {'list': 3, 'retrieve': 2}
+    keyset_ordering = ('-pub_date', 'id')
 
     def get_queryset(self) -> List[Comment]:
         """
@@ -346,8 +541,10 @@ class CommentModelViewSet(viewsets.ModelViewSet):
             pk=self.get_review_id(),
             title__pk=self.get_title_id(),
         )
-        return Comment.objects.filter(review=review,).order_by(
-            '-pub_date',
+        return (
+            Comment.objects.filter(review=review)
+            .select_related('author')
+            .order_by('-pub_date')
         )
 
     def perform_create(
@@ -369,7 +566,7 @@ class CommentModelViewSet(viewsets.ModelViewSet):
         )
         serializer.save(
             review=review,
-            author=self.request.user,
+            author=get_user_instance(self.request.user),
         )
 
     def get_title_id(self) -> int:
@@ -387,3 +584,57 @@ class CommentModelViewSet(viewsets.ModelViewSet):
         """
 
         return self.kwargs.get('review_id')
+
+
+class ExportViewSet(viewsets.ViewSet):
+    """
+    ViewSet потоковой выгрузки таблиц в CSV (формат load_csv) или NDJSON.
+    """
+
+    permission_classes = (IsAdmin | IsSuperuser,)
+    lookup_field = 'table'
+    lookup_value_regex = '|'.join(EXPORT_TABLES)
+    swagger_tags = ('export',)
+    output_formats = {
+        'csv': ('text/csv', iter_csv),
+        'ndjson': ('application/x-ndjson', iter_ndjson),
+    }
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'output',
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                enum=['csv', 'ndjson'],
+                description='Формат выгрузки (по умолчанию csv).',
+            )
+        ],
+        responses={status.HTTP_200_OK: 'Файл CSV или NDJSON'},
+    )
+    def retrieve(self, request: Request, table=None) -> StreamingHttpResponse:
+        """
+        Выгрузка таблицы ответом StreamingHttpResponse: строки читаются
+        курсором частями по EXPORT_CHUNK_SIZE и сразу отправляются
+        клиенту. Параметр ?output=csv|ndjson (?format= занят DRF).
+        :param request: Экземпляр класса Request DRF.
+        :param table: Имя таблицы.
+        :return: StreamingHttpResponse.
+        """
+
+        output = request.query_params.get('output', 'csv')
+        if output not in self.output_formats:
+            raise serializers.ValidationError(
+                {'output': [f'Неизвестный формат {output}.']}
+            )
+        content_type, render = self.output_formats[output]
+        file_name = EXPORT_TABLES[table]
+        model, columns = get_csv_table(file_name)
+        rows = get_rows(model, columns, settings.EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(
+            render(columns, rows), content_type=content_type
+        )
+        response[
+            'Content-Disposition'
+        ] = f'attachment; filename="{file_name}.{output}"'
+        return response
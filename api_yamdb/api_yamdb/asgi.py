@@ -0,0 +1,19 @@
+"""
+ASGI config for YaMDb project.
+
+Django 2.2 does not support ASGI, so the WSGI application is wrapped
+in api.asgi.ASGIHandler, which runs requests in thread pools:
+
+    GUNICORN_WORKER_CLASS=uvicorn gunicorn -c gunicorn.conf.py \\
+        api_yamdb.asgi:application
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+from api.asgi import ASGIHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+application = ASGIHandler(get_wsgi_application())
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,6 +41,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -72,9 +74,82 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'postgresql_db'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Постоянные соединения: одно на поток воркера gunicorn.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        # Проверка соединения перед запросом (api.connections).
+        'CONN_HEALTH_CHECKS': (
+            os.getenv('DB_CONN_HEALTH_CHECKS', 'true') == 'true'
+        ),
+        # Для pgbouncer в режиме transaction: именованные курсоры
+        # QuerySet.iterator() не переживают смену соединения.
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', 'false') == 'true'
+        ),
     }
 }
 
+# Реплики для чтения (api.replicas): DB_REPLICAS - адреса host[:port]
+# через запятую, для SQLite - пути к файлам БД. Остальные параметры
+# подключения совпадают с основной БД.
+for index, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(','))
+):
+    if DATABASES['default']['ENGINE'].endswith('sqlite3'):
+        location = {'NAME': replica}
+    else:
+        host, _, port = replica.partition(':')
+        location = {
+            'HOST': host,
+            'PORT': port or DATABASES['default']['PORT'],
+        }
+    DATABASES[f'replica{index + 1}'] = dict(
+        DATABASES['default'], **location, TEST={'MIRROR': 'default'}
+    )
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+# Время чтения из основной БД после изменения данных пользователем,
+# должно быть больше отставания реплик.
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+REPLICA_STICKY_COOKIE = 'use_primary'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'api-yamdb'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+        },
+    }
+}
+
+# Кэш ответов read-only эндпоинтов каталога (api.cache).
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+# По умолчанию кэш ответов включен только с общим кэшем: с кэшем в
+# памяти процесса (LocMemCache) сброс при изменении данных не виден
+# другим воркерам, и они отдают устаревшие ответы до API_CACHE_TIMEOUT.
+API_CACHE_ENABLED = (
+    os.getenv(
+        'API_CACHE_ENABLED',
+        'false'
+        if CACHES[API_CACHE_ALIAS]['BACKEND'].endswith('LocMemCache')
+        else 'true',
+    )
+    == 'true'
+)
+
+# Время жизни ключа версии справочников слагов (reviews.slugs): с кэшем
+# в памяти процесса - наибольшая задержка, с которой процесс видит
+# изменения жанров и категорий, сделанные другими процессами.
+SLUG_CACHE_TIMEOUT = int(os.getenv('SLUG_CACHE_TIMEOUT', 60))
+# Наименьший интервал в секундах между перечитываниями справочника из-за
+# неизвестного слага: запросы с несуществующим слагом не читают таблицу
+# жанров или категорий каждый раз.
+SLUG_RELOAD_INTERVAL = float(os.getenv('SLUG_RELOAD_INTERVAL', 5))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -101,14 +176,59 @@ SIMPLE_JWT = {
 }
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination'
-    '.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination'
+    '.PageNumberOrKeysetPagination',
     'PAGE_SIZE': 20,
+    # JWT_STATELESS_AUTH=true - роль и статус без загрузки пользователя
+    # из БД, см. AUTH_USER_STATE_TIMEOUT.
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication'
+        if os.getenv('JWT_STATELESS_AUTH', 'false') == 'true'
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.getenv('THROTTLE_AUTH_IP', '20/min'),
+        'auth_identity': os.getenv('THROTTLE_AUTH_IDENTITY', '5/min'),
+    },
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 1)),
 }
 
+# Хранилище счетчиков ограничения частоты запросов:
+# api.throttling.LocalCounterStore - в памяти процесса,
+# api.throttling.CacheCounterStore - в кэше API_CACHE_ALIAS.
+THROTTLE_STORE = os.getenv(
+    'THROTTLE_STORE', 'api.throttling.CacheCounterStore'
+)
+
+# Рейтинги лучших и популярных произведений (команда refresh_rankings).
+# Вес средней оценки по всем отзывам в байесовской оценке произведения.
+RANKING_PRIOR_WEIGHT = int(os.getenv('RANKING_PRIOR_WEIGHT', 10))
+RANKING_TRENDING_HALF_LIFE_DAYS = float(
+    os.getenv('RANKING_TRENDING_HALF_LIFE_DAYS', 7)
+)
+RANKING_TRENDING_WINDOW_DAYS = int(
+    os.getenv('RANKING_TRENDING_WINDOW_DAYS', 30)
+)
+
+# Массовая загрузка произведений (POST /api/v1/titles/bulk/):
+# максимум элементов в запросе и размер пачки вставки.
+TITLES_BULK_MAX_ITEMS = int(os.getenv('TITLES_BULK_MAX_ITEMS', 5000))
+TITLES_BULK_BATCH_SIZE = int(os.getenv('TITLES_BULK_BATCH_SIZE', 500))
+
+# Количество строк в одной выборке курсора при выгрузке таблиц
+# (GET /api/v1/export/{table}/).
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Время кэширования роли и статуса пользователя для
+# StatelessJWTAuthentication, секунды (0 - только данные токена).
+# Сброс кэша при изменении пользователя виден только процессу, в
+# котором кэш сброшен, если кэш в памяти процесса (LocMemCache): тогда
+# смена роли и блокировка вступают в силу в остальных процессах через
+# AUTH_USER_STATE_TIMEOUT, а при 0 - только после истечения срока
+# действия токена (ACCESS_TOKEN_LIFETIME). Поэтому JWT_STATELESS_AUTH
+# стоит включать с общим кэшем (CACHE_BACKEND, например django-redis).
+AUTH_USER_STATE_TIMEOUT = int(os.getenv('AUTH_USER_STATE_TIMEOUT', 60))
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
         'Token': {
@@ -147,5 +267,34 @@ EMAIL_HOST_USER = 'apikey'
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', 10))
+
+# Очередь писем с кодом подтверждения (команда send_emails).
+EMAIL_QUEUE_ENABLED = os.getenv('EMAIL_QUEUE_ENABLED', 'true') == 'true'
+EMAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv('EMAIL_QUEUE_MAX_ATTEMPTS', 5))
+EMAIL_QUEUE_RETRY_DELAY = int(os.getenv('EMAIL_QUEUE_RETRY_DELAY', 30))
 
 LOGGER_LINE_SEPARATOR = "-" * 80
+
+# Контроль количества SQL-запросов на запрос (api.middleware).
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET_ENABLED', 'false') == 'true'
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'false') == 'true'
+QUERY_BUDGET_DEFAULT = None
+
+# Метрики времени обработки запросов (api.middleware.PerformanceMiddleware,
+# эндпоинт /metrics) и заголовок Server-Timing в ответах.
+PERFORMANCE_METRICS_ENABLED = (
+    os.getenv('PERFORMANCE_METRICS_ENABLED', 'true') == 'true'
+)
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'true') == 'true'
+# Каталог, в котором каждый процесс сохраняет свои метрики (не чаще раза
+# в METRICS_SAVE_INTERVAL секунд), чтобы /metrics возвращал сумму по всем
+# воркерам gunicorn. Пустое значение - метрики только своего процесса.
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_SAVE_INTERVAL = float(os.getenv('METRICS_SAVE_INTERVAL', 1))
+
+# Пулы потоков ASGI-приложения (api_yamdb/asgi.py): чтение каталога
+# (произведения, категории, жанры, отзывы, комментарии) и остальные
+# запросы. У каждого потока свое соединение с БД.
+ASGI_CATALOGUE_THREADS = int(os.getenv('ASGI_CATALOGUE_THREADS', 8))
+ASGI_DEFAULT_THREADS = int(os.getenv('ASGI_DEFAULT_THREADS', 4))
@@ -0,0 +1,122 @@
+"""
+Настройки gunicorn.
+
+    gunicorn -c gunicorn.conf.py api_yamdb.wsgi:application
+
+Тип воркеров задается GUNICORN_WORKER_CLASS:
+- sync - один запрос на процесс, ожидание БД и SMTP блокирует воркер;
+- gthread - GUNICORN_THREADS потоков на процесс, у каждого потока свое
+  соединение с БД;
+- gevent - GUNICORN_WORKER_CONNECTIONS гринлетов на процесс, нужны
+  пакеты gevent и psycogreen (не входят в requirements.txt);
+- uvicorn - ASGI-приложение api_yamdb.asgi:application, запросы
+  выполняются в пулах потоков ASGI_CATALOGUE_THREADS и
+  ASGI_DEFAULT_THREADS.
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'gevent': 'gevent',
+    'uvicorn': 'uvicorn.workers.UvicornWorker',
+}
+
+worker_type = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_type not in WORKER_CLASSES:
+    raise ValueError(
+        f'GUNICORN_WORKER_CLASS={worker_type}, допустимые значения: '
+        + ', '.join(WORKER_CLASSES)
+    )
+worker_class = WORKER_CLASSES[worker_type]
+
+if worker_class == 'gevent':
+    # Патчи применяются до импорта Django (preload_app), иначе
+    # threading.local соединений БД останется общим для всех гринлетов.
+    from gevent import monkey
+
+    monkey.patch_all()
+
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
+
+    # Соединения с БД привязаны к гринлету и после завершения запроса
+    # не используются повторно, постоянные соединения только копятся.
+    os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(
+    os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+)
+# У каждого потока gthread свое постоянное соединение с БД: до
+# workers × threads соединений на экземпляр (68 на 8 ядрах), расчет
+# относительно max_connections PostgreSQL - в README, «Соединения с БД».
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 100))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Django импортируется один раз в мастер-процессе, воркеры получают
+# его память через fork: быстрее старт и меньше потребление памяти.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true') == 'true'
+
+# Перезапуск воркера после max_requests запросов ограничивает утечки
+# памяти, разброс jitter не дает воркерам перезапускаться одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+
+# Метрики воркеров суммируются через файлы в METRICS_DIR, иначе /metrics
+# вернул бы метрики одного случайного воркера.
+os.environ.setdefault(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'yamdb_metrics')
+)
+
+
+def close_connections() -> None:
+    from django.apps import apps
+
+    # Без preload_app Django в мастер-процессе не загружен.
+    if apps.ready:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def on_starting(server) -> None:
+    """
+    Метрики прошлого запуска удаляются: счетчики начинаются с нуля.
+    """
+
+    directory = os.environ['METRICS_DIR']
+    if directory:
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            os.remove(path)
+
+
+def post_fork(server, worker) -> None:
+    """
+    Соединения с БД, открытые мастер-процессом при preload_app, не
+    должны использоваться воркерами совместно.
+    """
+
+    close_connections()
+
+
+def worker_exit(server, worker) -> None:
+    """
+    Метрики завершающегося воркера переносятся в архив METRICS_DIR.
+    """
+
+    from django.apps import apps
+
+    if apps.ready:
+        from api.metrics import process_metrics_writer
+
+        process_metrics_writer.archive()
+    close_connections()
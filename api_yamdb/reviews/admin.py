@@ -60,6 +60,7 @@ class TitleAdmin(admin.ModelAdmin):
         'year',
         'category',
         'get_genre_names',
+        'rating',
     )
     search_fields = (
         'name',
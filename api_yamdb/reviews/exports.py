@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, Sequence, Tuple
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.dispatch import Signal
+
+from .models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+# Отправляется после загрузки CSV файлов командой load_csv: строки
+# записываются без сигналов моделей.
+csv_loaded = Signal()
+
+# Имя CSV файла без расширения, модель и столбцы таблицы в файле.
+# Таблица идет после всех таблиц, на которые ссылается: в этом порядке
+# файлы загружает load_csv и выгружает dump_csv. Пароли пользователей,
+# рейтинги и поисковые векторы произведений не выгружаются: при загрузке
+# они заполняются значениями по умолчанию и пересчитываются. Флаги
+# пользователей выгружаются, иначе загрузка выгрузки сбросила бы права
+# суперпользователей и блокировки.
+CSV_TABLES = (
+    (
+        'users',
+        User,
+        (
+            'id',
+            'username',
+            'email',
+            'role',
+            'bio',
+            'first_name',
+            'last_name',
+            'is_staff',
+            'is_superuser',
+            'is_active',
+        ),
+    ),
+    ('category', Category, ('id', 'name', 'slug')),
+    ('genre', Genre, ('id', 'name', 'slug')),
+    ('titles', Title, ('id', 'name', 'year', 'description', 'category_id')),
+    ('genre_title', Title.genre.through, ('id', 'title_id', 'genre_id')),
+    (
+        'review',
+        Review,
+        ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date'),
+    ),
+    (
+        'comments',
+        Comment,
+        ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+    ),
+)
+
+# Таблицы, которые выгружаются через API: имя в URL и имя CSV файла.
+EXPORT_TABLES = {
+    'titles': 'titles',
+    'genre_title': 'genre_title',
+    'reviews': 'review',
+    'comments': 'comments',
+}
+
+# Количество строк в одной части ответа или записи в файл.
+ROWS_PER_CHUNK = 500
+
+
+def get_csv_table(file_name: str) -> Tuple[models.Model, Sequence[str]]:
+    for name, model, columns in CSV_TABLES:
+        if name == file_name:
+            return model, columns
+    raise KeyError(file_name)
+
+
+def get_rows(
+    model: models.Model, columns: Sequence[str], chunk_size: int
+) -> Iterator[tuple]:
+    """
+    Строки таблицы по возрастанию id. В PostgreSQL читаются курсором на
+    стороне сервера частями по chunk_size, память не зависит от размера
+    таблицы.
+    :param model: Модель таблицы.
+    :param columns: Имена столбцов.
+    :param chunk_size: Количество строк в одной выборке курсора.
+    :return: Итератор кортежей значений.
+    """
+
+    return (
+        model.objects.order_by('pk')
+        .values_list(*columns)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def format_csv_value(value: Any) -> Any:
+    """
+    Значение в формате, который разбирает load_csv: пустая строка для
+    NULL, ISO 8601 для дат.
+    """
+
+    if value is None:
+        return ''
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    """
+    CSV с заголовком частями по ROWS_PER_CHUNK строк.
+    :param columns: Имена столбцов.
+    :param rows: Строки таблицы.
+    :return: Итератор частей CSV.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for number, row in enumerate(rows, start=1):
+        writer.writerow([format_csv_value(value) for value in row])
+        if number % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(
+    columns: Sequence[str], rows: Iterable[tuple]
+) -> Iterator[str]:
+    """
+    NDJSON (объект на строку) частями по ROWS_PER_CHUNK строк.
+    :param columns: Имена столбцов.
+    :param rows: Строки таблицы.
+    :return: Итератор частей NDJSON.
+    """
+
+    lines = []
+    for row in rows:
+        lines.append(
+            json.dumps(
+                dict(zip(columns, row)),
+                cls=DjangoJSONEncoder,
+                ensure_ascii=False,
+            )
+        )
+        if len(lines) == ROWS_PER_CHUNK:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
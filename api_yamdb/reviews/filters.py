@@ -1,19 +1,258 @@
+from typing import List, Optional, Sequence, Tuple
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Count, F, Q, QuerySet
+from django.db.models.expressions import OrderBy
 from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
+
+from .models import Title, TitleRanking
+from .slugs import category_slugs, genre_slugs
 
-from .models import Title
+# Параметр ?ordering= и поле модели. Все поля хранятся в таблице
+# произведений и покрыты индексами (поле, id).
+TITLE_ORDERING_FIELDS = {
+    'rating': 'rating',
+    'year': 'year',
+    'name': 'name',
+    'review_count': 'rating_count',
+}
+NULLABLE_ORDERING_FIELDS = {'rating'}
+SEARCH_CONFIGS = ('russian', 'english')
+GENRE_MODE_ALL = 'all'
+GENRE_MODE_ANY = 'any'
 
 
-class TitleFilter(filters.FilterSet):
+def get_title_ordering(values: Sequence[str]) -> Tuple[str, ...]:
     """
-    Фильтрация произведений по имени, категории, жанру или году
+    Сортировка произведений по значениям параметра ?ordering= с id в
+    конце. id сортируется в направлении последнего поля, чтобы запрос
+    читал индекс (поле, id) в одном направлении.
+    :param values: Значения параметра, например ['-rating'].
+    :return: Поля сортировки, например ('-rating', '-id').
     """
 
-    name = filters.CharFilter(field_name='name', lookup_expr='contains')
-    category = filters.CharFilter(
-        field_name='category__slug', lookup_expr='exact'
+    ordering = tuple(
+        ('-' if value.startswith('-') else '')
+        + TITLE_ORDERING_FIELDS[value.lstrip('-')]
+        for value in values
     )
-    genre = filters.CharFilter(field_name='genre__slug', lookup_expr='exact')
+    descending = bool(ordering) and ordering[-1].startswith('-')
+    return ordering + ('-id' if descending else 'id',)
+
+
+def get_keyset_ordering(values: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Ключ keyset-пагинации для сортировки ?ordering=. Для полей с NULL
+    (rating) keyset-условие неприменимо, используется пагинация по
+    номеру страницы.
+    :param values: Значения параметра ?ordering=.
+    :return: Поля сортировки или None.
+    """
+
+    if any(value.lstrip('-') in NULLABLE_ORDERING_FIELDS for value in values):
+        return None
+    return get_title_ordering(values)
+
+
+def get_ordering_expressions(ordering: Sequence[str]) -> List[OrderBy]:
+    """
+    Выражения ORDER BY: поля с NULL (произведения без оценок) всегда в
+    конце списка.
+    :param ordering: Поля сортировки.
+    :return: Выражения сортировки.
+    """
+
+    expressions = []
+    for field in ordering:
+        name = field.lstrip('-')
+        nulls_last = True if name in NULLABLE_ORDERING_FIELDS else None
+        if field.startswith('-'):
+            expressions.append(F(name).desc(nulls_last=nulls_last))
+        else:
+            expressions.append(F(name).asc(nulls_last=nulls_last))
+    return expressions
+
+
+class TitleOrderingFilter(filters.OrderingFilter):
+    """
+    Сортировка произведений по сохраненным полям (rating, rating_count)
+    вместо агрегатов по отзывам.
+    """
+
+    def filter(self, qs, value):
+        # Пустые элементы (?ordering=year,) проходят проверку CSV-значений.
+        value = [item for item in value or () if item]
+        if value in EMPTY_VALUES:
+            return qs
+        return qs.order_by(
+            *get_ordering_expressions(get_title_ordering(value))
+        )
+
+
+def get_slugs(value: str) -> List[str]:
+    return sorted({slug.strip() for slug in value.split(',') if slug.strip()})
+
+
+def filter_by_genres(
+    queryset: QuerySet,
+    slugs: Sequence[str],
+    mode: str,
+    field: str = 'id',
+) -> QuerySet:
+    """
+    Фильтрация по жанрам подзапросом к таблице связей произведений и
+    жанров (semi-join), без JOIN в основном запросе, поэтому строки не
+    дублируются и DISTINCT не нужен. В режиме all подзапрос группирует
+    связи по произведению и оставляет произведения со всеми жанрами
+    (HAVING COUNT = количество жанров). Слаги переводятся в id по кэшу
+    справочника, поэтому таблица жанров в запросе не участвует.
+    :param queryset: Выборка.
+    :param slugs: Слаги жанров.
+    :param mode: GENRE_MODE_ALL или GENRE_MODE_ANY.
+    :param field: Поле выборки с id произведения.
+    :return: Отфильтрованная выборка.
+    """
+
+    genre_ids = genre_slugs.get_ids(slugs)
+    if not genre_ids or (
+        mode == GENRE_MODE_ALL and len(genre_ids) < len(slugs)
+    ):
+        return queryset.none()
+    title_ids = Title.genre.through.objects.filter(genre_id__in=genre_ids)
+    if mode == GENRE_MODE_ALL and len(genre_ids) > 1:
+        title_ids = (
+            title_ids.values('title_id')
+            .annotate(genres=Count('genre_id'))
+            .filter(genres=len(genre_ids))
+        )
+    return queryset.filter(**{f'{field}__in': title_ids.values('title_id')})
+
+
+class GenreFilterMixin(filters.FilterSet):
+    """
+    Фильтры жанров (genre=a,b,c и genre_mode=all|any) и категорий
+    (category=a,b) со списком слагов через запятую.
+    """
+
+    genre_field = 'id'
+    category_field = 'category_id'
+
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    genre_mode = filters.ChoiceFilter(
+        choices=(
+            (GENRE_MODE_ANY, 'Любой из жанров'),
+            (GENRE_MODE_ALL, 'Все жанры'),
+        ),
+        method='filter_genre_mode',
+    )
+
+    def filter_category(self, queryset, name, value):
+        category_ids = category_slugs.get_ids(get_slugs(value))
+        return queryset.filter(**{f'{self.category_field}__in': category_ids})
+
+    def filter_genre(self, queryset, name, value):
+        slugs = get_slugs(value)
+        if not slugs:
+            return queryset
+        mode = self.form.cleaned_data.get('genre_mode') or GENRE_MODE_ANY
+        return filter_by_genres(queryset, slugs, mode, self.genre_field)
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
+
+
+def search_titles(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Полнотекстовый поиск произведений по названию и описанию.
+    В PostgreSQL - по столбцу search_vector (GIN-индекс) в русской и
+    английской конфигурациях, результаты сортируются по релевантности
+    (совпадения в названии весят больше). В других СУБД (тесты на
+    SQLite) - поиск подстроки без ранжирования.
+    :param queryset: Выборка произведений.
+    :param text: Поисковый запрос.
+    :return: Отфильтрованная выборка.
+    """
+
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    query = SearchQuery(text, config=SEARCH_CONFIGS[0])
+    for config in SEARCH_CONFIGS[1:]:
+        query |= SearchQuery(text, config=config)
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F('search_vector'), query))
+        .order_by('-search_rank', 'id')
+    )
+
+
+class TitleFilter(GenreFilterMixin):
+    """
+    Фильтрация произведений по имени, категории, жанру, году и рейтингу,
+    полнотекстовый поиск параметром q, сортировка параметром ordering
+    (по умолчанию результаты поиска сортируются по релевантности).
+    """
+
+    name = filters.CharFilter(field_name='name', lookup_expr='contains')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    q = filters.CharFilter(method='filter_q', label='Поиск')
+    ordering = TitleOrderingFilter(fields=tuple(TITLE_ORDERING_FIELDS))
 
     class Meta:
         model = Title
-        fields = ('name', 'category', 'genre', 'year')
+        fields = (
+            'name',
+            'category',
+            'genre',
+            'genre_mode',
+            'year',
+            'year_min',
+            'year_max',
+            'rating_min',
+            'rating_max',
+            'q',
+            'ordering',
+        )
+
+    def filter_q(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        return search_titles(queryset, value)
+
+
+class TitleRankingFilter(GenreFilterMixin):
+    """
+    Фильтрация рейтинга произведений по категориям, жанрам и годам.
+    """
+
+    genre_field = 'title_id'
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    order = filters.ChoiceFilter(
+        choices=(('score', 'Лучшие'), ('trending', 'Популярные')),
+        method='filter_order',
+        empty_label=None,
+    )
+
+    class Meta:
+        model = TitleRanking
+        fields = (
+            'category',
+            'genre',
+            'genre_mode',
+            'year_min',
+            'year_max',
+            'order',
+        )
+
+    def filter_order(self, queryset, name, value):
+        return queryset.order_by(f'-{value}', 'title_id')
@@ -0,0 +1,90 @@
+import csv
+import os
+import time
+from typing import Sequence
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from reviews.exports import CSV_TABLES, format_csv_value, get_rows
+
+
+class Command(BaseCommand):
+    """
+    Команда выгрузки таблиц в CSV файлы в формате load_csv.
+    Строки читаются курсором частями по --chunk-size и сразу пишутся в
+    файл, поэтому память не зависит от размера таблиц. Файл записывается
+    во временный и переименовывается после выгрузки.
+    """
+
+    help = 'Выгрузка данных в CSV файлы (обратная load_csv)'
+    CHUNK_SIZE = 2000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Каталог для CSV файлов.',
+        )
+        parser.add_argument(
+            '--tables',
+            nargs='+',
+            choices=[file_name for file_name, _, _ in CSV_TABLES],
+            help='Выгружаемые файлы (по умолчанию все).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=self.CHUNK_SIZE,
+            help='Количество строк в одной выборке курсора.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if os.path.exists(path) and not os.path.isdir(path):
+            raise CommandError(f'{path} не является каталогом')
+        os.makedirs(path, exist_ok=True)
+        tables = options['tables']
+        for file_name, model, columns in CSV_TABLES:
+            if tables and file_name not in tables:
+                continue
+            start = time.perf_counter()
+            rows = self.dump_table(
+                file_path=os.path.join(path, f'{file_name}.csv'),
+                model=model,
+                columns=columns,
+                chunk_size=options['chunk_size'],
+            )
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{model._meta.db_table} - {rows} строк в '
+                    f'{file_name}.csv за {elapsed:.2f} с'
+                )
+            )
+
+    @staticmethod
+    def dump_table(
+        file_path: str,
+        model: models.Model,
+        columns: Sequence[str],
+        chunk_size: int,
+    ) -> int:
+        """
+        Выгрузка таблицы в CSV файл.
+        :param file_path: Путь к файлу.
+        :param model: Модель таблицы.
+        :param columns: Имена столбцов.
+        :param chunk_size: Количество строк в одной выборке курсора.
+        :return: Количество строк.
+        """
+
+        temporary_path = f'{file_path}.tmp'
+        rows = 0
+        with open(temporary_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            for row in get_rows(model, columns, chunk_size):
+                writer.writerow([format_csv_value(value) for value in row])
+                rows += 1
+        os.replace(temporary_path, file_path)
+        return rows
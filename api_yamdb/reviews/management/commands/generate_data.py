@@ -0,0 +1,247 @@
+import random
+import time
+from itertools import accumulate
+from typing import Iterator, List, Sequence
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+
+from reviews.models import ADMIN, MODERATOR, USER
+from reviews.models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+WORDS = (
+    'фильм книга сюжет герой финал автор музыка актер роль сцена '
+    'история смысл диалог время мир жизнь любовь война дорога город '
+    'отлично скучно сильно слабо неожиданно красиво долго быстро'
+).split()
+
+# Распределение оценок: высокие оценки встречаются чаще низких.
+SCORE_WEIGHTS = (1, 1, 2, 3, 5, 8, 12, 15, 12, 8)
+
+
+def get_zipf_weights(size: int, skew: float) -> List[float]:
+    """
+    Накопленные веса закона Ципфа: элемент с номером k выбирается с
+    вероятностью, пропорциональной 1 / k ** skew.
+    :param size: Количество элементов.
+    :param skew: Показатель (0 - равномерное распределение).
+    :return: Накопленные веса для random.choices(cum_weights=...).
+    """
+
+    return list(accumulate(1 / rank**skew for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    """
+    Команда генерации синтетических данных для нагрузочного тестирования.
+    Данные воспроизводимы при одинаковом --seed. Популярность
+    произведений и отзывов распределена по закону Ципфа (--skew):
+    немногие произведения собирают большую часть отзывов, как в реальном
+    каталоге. Строки вставляются bulk_create пачками по --batch-size без
+    сигналов, рейтинги пересчитываются в конце командой rebuild_ratings.
+    """
+
+    help = 'Генерация синтетических данных'
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 1000),
+            ('categories', 5),
+            ('genres', 20),
+            ('titles', 2000),
+            ('reviews', 20000),
+            ('comments', 20000),
+        ):
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Количество записей (по умолчанию {default}).',
+            )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа популярности.',
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Удалить данные (кроме суперпользователей) перед генерацией.',
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.skew = options['skew']
+        if options['clear']:
+            self.clear()
+        elif Title.objects.exists() or Review.objects.exists():
+            raise CommandError('БД не пуста, используйте --clear')
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            categories = self.create_dictionary(
+                Category, 'category', options['categories']
+            )
+            genres = self.create_dictionary(Genre, 'genre', options['genres'])
+            titles = self.create_titles(options['titles'], categories, genres)
+            reviews = self.create_reviews(options['reviews'], titles, users)
+            self.create_comments(options['comments'], reviews, users)
+        call_command('rebuild_ratings', verbosity=0, stdout=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Создано: пользователей {len(users)}, произведений '
+                f'{len(titles)}, отзывов {len(reviews)}, комментариев '
+                f'{options["comments"]} за '
+                f'{time.perf_counter() - start:.1f} с'
+            )
+        )
+
+    @staticmethod
+    def clear() -> None:
+        for model in (Comment, Review, Title, Genre, Category):
+            model.objects.all().delete()
+        User.objects.filter(is_superuser=False).delete()
+
+    def get_text(self, words: int) -> str:
+        return ' '.join(self.random.choices(WORDS, k=words)).capitalize()
+
+    def insert(self, model: models.Model, objects: Iterator) -> List[int]:
+        """
+        Вставка объектов пачками.
+        :param model: Модель.
+        :param objects: Объекты модели.
+        :return: id всех записей модели по возрастанию.
+        """
+
+        batch = []
+        for instance in objects:
+            batch.append(instance)
+            if len(batch) == self.batch_size:
+                model.objects.bulk_create(batch)
+                batch = []
+        model.objects.bulk_create(batch)
+        return list(model.objects.order_by('pk').values_list('pk', flat=True))
+
+    def create_users(self, count: int) -> List[int]:
+        # Хэш пароля одинаковый: хэширование для каждого пользователя
+        # заняло бы большую часть времени генерации.
+        password = make_password(None)
+        roles = self.random.choices(
+            (USER, MODERATOR, ADMIN), weights=(95, 4, 1), k=count
+        )
+        return self.insert(
+            User,
+            (
+                User(
+                    username=f'user{index}',
+                    email=f'user{index}@yamdb.fake',
+                    role=role,
+                    password=password,
+                )
+                for index, role in enumerate(roles)
+            ),
+        )
+
+    def create_dictionary(
+        self, model: models.Model, prefix: str, count: int
+    ) -> List[int]:
+        return self.insert(
+            model,
+            (
+                model(
+                    name=f'{prefix.capitalize()} {index}',
+                    slug=f'{prefix}-{index}',
+                )
+                for index in range(count)
+            ),
+        )
+
+    def create_titles(
+        self, count: int, categories: Sequence[int], genres: Sequence[int]
+    ) -> List[int]:
+        titles = self.insert(
+            Title,
+            (
+                Title(
+                    name=self.get_text(self.random.randint(1, 4)),
+                    year=self.random.randint(1950, 2022),
+                    description=self.get_text(self.random.randint(5, 30)),
+                    category_id=self.random.choice(categories),
+                )
+                for _ in range(count)
+            ),
+        )
+        through = Title.genre.through
+        self.insert(
+            through,
+            (
+                through(title_id=title_id, genre_id=genre_id)
+                for title_id in titles
+                for genre_id in self.random.sample(
+                    genres, min(len(genres), self.random.randint(1, 3))
+                )
+            ),
+        )
+        return titles
+
+    def create_reviews(
+        self, count: int, titles: Sequence[int], users: Sequence[int]
+    ) -> List[int]:
+        """
+        Отзывы к произведениям, выбранным по закону Ципфа. Пара
+        (автор, произведение) уникальна; отзывов не больше половины
+        возможных пар, иначе повторные выборы занятых пар замедляют
+        генерацию.
+        """
+
+        count = min(count, len(titles) * len(users) // 2)
+        weights = get_zipf_weights(len(titles), self.skew)
+        pairs = set()
+
+        def generate() -> Iterator[Review]:
+            while len(pairs) < count:
+                title_id = self.random.choices(titles, cum_weights=weights)[0]
+                author_id = self.random.choice(users)
+                if (author_id, title_id) in pairs:
+                    continue
+                pairs.add((author_id, title_id))
+                yield Review(
+                    title_id=title_id,
+                    author_id=author_id,
+                    score=self.random.choices(
+                        range(1, 11), weights=SCORE_WEIGHTS
+                    )[0],
+                    text=self.get_text(self.random.randint(3, 60)),
+                )
+
+        return self.insert(Review, generate())
+
+    def create_comments(
+        self, count: int, reviews: Sequence[int], users: Sequence[int]
+    ) -> None:
+        if not reviews:
+            return
+        weights = get_zipf_weights(len(reviews), self.skew)
+        self.insert(
+            Comment,
+            (
+                Comment(
+                    review_id=self.random.choices(
+                        reviews, cum_weights=weights
+                    )[0],
+                    author_id=self.random.choice(users),
+                    text=self.get_text(self.random.randint(3, 30)),
+                )
+                for _ in range(count)
+            ),
+        )
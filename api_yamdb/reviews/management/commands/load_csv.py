@@ -1,162 +1,571 @@
 import csv
+import io
+import multiprocessing
 import os
-from typing import List, Union, Sequence
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
-from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from django.db import connection, IntegrityError
+from django.core.management.color import no_style
+from django.db import (
+    DatabaseError,
+    IntegrityError,
+    connection,
+    connections,
+    models,
+    transaction,
+)
 
-User = get_user_model()
+from reviews.exports import CSV_TABLES, csv_loaded
+from reviews.models import LoadCheckpoint
+from reviews.slugs import category_slugs, genre_slugs
+
+# Результат загрузки таблицы: успех и сообщение для вывода.
+LoadResult = Tuple[bool, str]
+
+
+class Checkpoint:
+    """
+    Контрольная точка загрузки таблицы: количество зафиксированных строк
+    файла. Хранится в таблице LoadCheckpoint и сохраняется в транзакции
+    части строк, поэтому сбой не оставляет загруженных строк, не
+    записанных в контрольную точку. Повторный запуск команды продолжает
+    загрузку с этой строки.
+    """
+
+    def __init__(self, table: str, file_path: str) -> None:
+        self.table = table
+        stat = os.stat(file_path)
+        self.source = {
+            'source_size': stat.st_size,
+            'source_mtime': int(stat.st_mtime),
+        }
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Чтение контрольной точки.
+        :return: Словарь с ключами rows и done.
+        :raise ValueError: Файл изменился после начала загрузки.
+        """
+
+        state = LoadCheckpoint.objects.filter(table=self.table).first()
+        if state is None:
+            return {'rows': 0, 'done': False}
+        if (state.source_size, state.source_mtime) != (
+            self.source['source_size'],
+            self.source['source_mtime'],
+        ):
+            raise ValueError(self.table)
+        return {'rows': state.rows, 'done': state.done}
+
+    def save(self, rows: int, done: bool = False) -> None:
+        LoadCheckpoint.objects.update_or_create(
+            table=self.table,
+            defaults={'rows': rows, 'done': done, **self.source},
+        )
+
+
+def load_table_worker(options: Dict[str, Any], file_name: str) -> LoadResult:
+    """
+    Загрузка таблицы в дочернем процессе. Подключение к БД дочерний
+    процесс открывает сам: родитель закрывает свои перед запуском пула.
+    """
+
+    try:
+        return Command().load_table(file_name, **options)
+    finally:
+        connections.close_all()
 
 
 class Command(BaseCommand):
     """
     Команда для загрузки данных в БД.
-    В случае ошибки при записи, будет инициализированная повторная
-    попытка записи.
+    Файлы загружаются в порядке зависимостей внешних ключей: независимые
+    таблицы одного уровня - параллельно в отдельных процессах.
+    Строки отправляются частями по CHUNK_SIZE, каждая часть фиксируется
+    отдельной транзакцией (в PostgreSQL через COPY FROM STDIN, в
+    остальных БД через executemany) вместе с номером последней строки в
+    контрольной точке для повторного запуска.
     """
 
     help = 'Загрузка данных и CSV файлов'
-    retry_requests_dictionary = {}
     SUCCESS_MESSAGE = 'УСПЕШНО'
-    PATH_TO_FILES = '../api_yamdb/static/data'
-
-    # Добавьте в словарь TABLES имя файла без расширения .csv
-    # и имя таблицы. Ключ - имя файла, значение - имя таблицы.
-    # НЕ ЗАБУДЬТЕ ПРО ПРЕФИКС "ИМЯ ПРИЛОЖЕНИЯ_ИМЯ ТАБЛИЦЫ",
-    # если ясно не указывали имена таблиц.
-
-    TABLES = {
-        'users': 'reviews_user',
-        'category': 'reviews_category',
-        'titles': 'reviews_title',
-        'genre': 'reviews_genre',
-        'genre_title': 'reviews_title_genre',
-        'comments': 'reviews_comment',
-        'review': 'reviews_review',
-    }
+    PATH_TO_FILES = os.path.join(settings.BASE_DIR, 'static', 'data')
+    CHUNK_SIZE = 10000
+    WORKERS = 4
+    NULL = '\\N'
+
+    # Имя файла без расширения .csv и модель, в таблицу которой он
+    # загружается. Таблица должна идти после всех таблиц, на которые
+    # ссылается: по этому порядку строятся уровни параллельной загрузки.
+    TABLES = tuple((file_name, model) for file_name, model, _ in CSV_TABLES)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=self.PATH_TO_FILES,
+            help='Каталог с CSV файлами.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=self.CHUNK_SIZE,
+            help='Количество строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=self.WORKERS,
+            help='Количество процессов загрузки (для SQLite всегда 1).',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Удалить контрольные точки и загрузить файлы заново.',
+        )
+        parser.add_argument(
+            '--defer-indexes',
+            action='store_true',
+            help='Удалить индексы моделей на время загрузки (PostgreSQL).',
+        )
 
     def handle(
         self,
         *args,
         **options,
     ):
-        list_files = os.listdir(self.PATH_TO_FILES)
-        with connection.cursor() as cursor:
-            for file in list_files:
-                with open(
-                    self.PATH_TO_FILES + '/' + file, 'r', encoding='utf-8'
-                ) as csv_file:
-                    file_name = file.split('.')[0]
-                    table = self.TABLES.get(file_name)
-                    csv_reader = csv.DictReader(csv_file)
-
-                    if table is None:
-                        error = self.get_error_message(
-                            name='UNKNOWN_TABLE',
-                            table_name=file_name,
-                        )
-                        self.stdout.write(self.style.ERROR(error))
-                        continue
-
-                    # Из-за множества полей в таблицы пользователей по
-                    # умолчанию, дешевле было в данном случае использовать ORM.
-                    if file_name == 'users':
-                        self.create_users(table=table, csv_reader=csv_reader)
-                        continue
-
-                    keys = list(csv_reader.fieldnames)
-                    values = [
-                        f'{(*self.substitute_quotes(list(element.values())),)}'
-                        for element in list(csv_reader)
-                    ]
-                    raw_queries = self.get_raw(
-                        table=table,
-                        columns=keys,
-                        values=values,
-                    )
-                    result = self.execute_raw(
-                        raw_queries=raw_queries,
-                        table=table,
-                        cursor=cursor,
-                    )
-                    if result == self.SUCCESS_MESSAGE:
-                        self.stdout.write(self.style.SUCCESS(result))
-                    else:
-                        self.stdout.write(self.style.ERROR(result))
-
-                        # Если произошла ошибка во время записи, raw_queries
-                        # добавятся в словарь повторного запуска.
-                        self.add_raw_queries_to_retry_dict(
-                            table=table,
-                            raw_queries=raw_queries,
-                        )
-                        self.stdout.write(
-                            'Добавление '
-                            f'raw_queries {table} '
-                            'в повторную попытку записи.'
-                        )
-
-            # Повторная попытка записи в случае наличия элементов в словаре.
-
-            if self.retry_requests_dictionary:
-                message = '=' * 20 + ' ПОВТОРНАЯ ПОПЫТКА ЗАПИСИ ' + '=' * 20
-                self.stdout.write(self.style.WARNING(message))
-                self.retry_execute_raw(cursor=cursor)
-            self.stdout.write(self.style.SUCCESS('ЗАВЕРШЕНИЕ ОПЕРАЦИИ'))
-
-    def execute_raw(
+        path = options['path']
+        if options['reset']:
+            LoadCheckpoint.objects.all().delete()
+        self.report_unknown_files(path)
+
+        load_options = {
+            'path': path,
+            'chunk_size': options['chunk_size'],
+        }
+        table_models = [model for _, model in self.TABLES]
+        defer_indexes = (
+            options['defer_indexes'] and connection.vendor == 'postgresql'
+        )
+        if defer_indexes:
+            self.drop_indexes(table_models)
+        try:
+            for level in self.get_levels():
+                results = self.run_level(level, load_options, options)
+                for success, message in results:
+                    style = self.style.SUCCESS if success else self.style.ERROR
+                    self.stdout.write(style(message))
+                if not all(success for success, _ in results):
+                    break
+        finally:
+            if defer_indexes:
+                self.create_indexes(table_models)
+            self.reset_sequences(table_models)
+
+        # Строки загружаются без сигналов моделей, поэтому рейтинги
+        # произведений, таблица лучших произведений, справочники слагов
+        # и кэш ответов API обновляются после загрузки.
+        call_command('rebuild_ratings', verbosity=0, stdout=self.stdout)
+        call_command('refresh_rankings', stdout=self.stdout)
+        category_slugs.invalidate()
+        genre_slugs.invalidate()
+        csv_loaded.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS('ЗАВЕРШЕНИЕ ОПЕРАЦИИ'))
+
+    def report_unknown_files(self, path: str) -> None:
+        known_files = {f'{file_name}.csv' for file_name, _ in self.TABLES}
+        for file in sorted(os.listdir(path)):
+            if not file.endswith('.csv') or file in known_files:
+                continue
+            error = self.get_error_message(
+                name='UNKNOWN_TABLE',
+                table_name=file.split('.')[0],
+            )
+            self.stdout.write(self.style.ERROR(error))
+
+    def get_levels(self) -> List[List[str]]:
+        """
+        Разбиение таблиц на уровни: таблицы одного уровня не ссылаются
+        друг на друга и могут загружаться параллельно.
+        :return: Списки имен файлов по уровням.
+        """
+
+        levels = {}
+        for file_name, model in self.TABLES:
+            related_models = {
+                field.related_model
+                for field in model._meta.concrete_fields
+                if field.is_relation
+            }
+            levels[file_name] = 1 + max(
+                (
+                    levels[other_name]
+                    for other_name, other_model in self.TABLES
+                    if other_model in related_models and other_name in levels
+                ),
+                default=-1,
+            )
+        return [
+            [name for name, level in levels.items() if level == number]
+            for number in sorted(set(levels.values()))
+        ]
+
+    def run_level(
         self,
-        raw_queries: str,
-        table: str,
-        cursor: connection,
-    ) -> str:
+        file_names: List[str],
+        load_options: Dict[str, Any],
+        options: Dict[str, Any],
+    ) -> List[LoadResult]:
         """
-        Загрузка файлов в БД.
-        :param raw_queries: Сырые запросы в формате строки.
-        :param table: Имя таблицы.
-        :param cursor: Курсор.
-        :return: Успешный ответ или raw_queries.
+        Загрузка таблиц одного уровня, параллельно в пуле процессов.
+        SQLite не поддерживает параллельную запись, поэтому для нее
+        таблицы загружаются по очереди в текущем процессе.
+        :param file_names: Имена файлов уровня.
+        :param load_options: Параметры загрузки таблицы.
+        :param options: Параметры команды.
+        :return: Результаты загрузки таблиц.
         """
 
+        workers = min(options['workers'], len(file_names))
+        if workers <= 1 or connection.vendor == 'sqlite':
+            return [
+                self.load_table(file_name, **load_options)
+                for file_name in file_names
+            ]
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+        ) as executor:
+            return list(
+                executor.map(
+                    partial(load_table_worker, load_options), file_names
+                )
+            )
+
+    def load_table(
+        self,
+        file_name: str,
+        path: str,
+        chunk_size: int,
+    ) -> LoadResult:
+        """
+        Загрузка таблицы с продолжением с контрольной точки.
+        :param file_name: Имя файла без расширения.
+        :param path: Каталог с CSV файлами.
+        :param chunk_size: Количество строк в одной транзакции.
+        :return: Результат загрузки.
+        """
+
+        model = dict(self.TABLES)[file_name]
+        table = model._meta.db_table
+        file_path = os.path.join(path, f'{file_name}.csv')
+        if not os.path.exists(file_path):
+            return True, f'ПРОПУСК: {table} - файл {file_name}.csv не найден'
+        checkpoint = Checkpoint(table, file_path)
         try:
-            cursor.execute(raw_queries)
-            result = self.SUCCESS_MESSAGE
-        except IntegrityError as Error:
-            if 'FOREIGN KEY' in str(Error):
-                result = self.get_error_message(
-                    name='RELATION_ERROR',
-                    table_name=table,
+            state = checkpoint.load()
+        except ValueError:
+            return False, self.get_error_message(
+                name='CHECKPOINT_ERROR', table_name=table
+            )
+        if state['done']:
+            return True, f'ПРОПУСК: {table} - загружена ранее'
+        return self.load_file(
+            file_path=file_path,
+            model=model,
+            chunk_size=chunk_size,
+            checkpoint=checkpoint,
+            skip_rows=state['rows'],
+        )
+
+    def load_file(
+        self,
+        file_path: str,
+        model: models.Model,
+        chunk_size: int,
+        checkpoint: Checkpoint,
+        skip_rows: int = 0,
+    ) -> LoadResult:
+        """
+        Потоковая загрузка CSV файла, каждая часть строк фиксируется
+        отдельной транзакцией вместе с контрольной точкой.
+        :param file_path: Путь к файлу.
+        :param model: Модель таблицы.
+        :param chunk_size: Количество строк в одной части.
+        :param checkpoint: Контрольная точка таблицы.
+        :param skip_rows: Количество уже загруженных строк файла.
+        :return: Результат загрузки.
+        """
+
+        table = model._meta.db_table
+        start = time.perf_counter()
+        rows = skip_rows
+        with open(file_path, 'r', encoding='utf-8', newline='') as csv_file:
+            csv_reader = csv.DictReader(csv_file)
+            try:
+                columns, convert = self.get_row_converter(
+                    model=model,
+                    csv_columns=csv_reader.fieldnames or [],
                 )
-            else:
-                result = self.get_error_message(
-                    name='UNIQUE_ERROR',
-                    table_name=table,
+            except KeyError as error:
+                return False, self.get_error_message(
+                    name='UNKNOWN_COLUMN',
+                    table_name=f'{table}.{error.args[0]}',
                 )
 
-        return result
+            # Пропуск строк, зафиксированных при прошлом запуске.
+            next(islice(csv_reader, skip_rows, skip_rows), None)
+            write_chunk = self.get_chunk_writer()
+            try:
+                with connection.cursor() as cursor:
+                    for chunk in self.get_chunks(
+                        csv_reader, convert, chunk_size
+                    ):
+                        rows += len(chunk)
+                        with transaction.atomic():
+                            write_chunk(cursor, table, columns, chunk)
+                            checkpoint.save(rows)
+            except IntegrityError as error:
+                name = (
+                    'RELATION_ERROR'
+                    if 'foreign key' in str(error).lower()
+                    else 'UNIQUE_ERROR'
+                )
+                return False, self.get_error_message(
+                    name=name, table_name=table
+                )
+            except (DatabaseError, ValueError) as error:
+                message = self.get_error_message(
+                    name='DATA_ERROR', table_name=table
+                )
+                return False, f'{message} {error}'
+
+        checkpoint.save(rows, done=True)
+        loaded = rows - skip_rows
+        elapsed = time.perf_counter() - start
+        return True, (
+            f'{self.SUCCESS_MESSAGE}: {table} - {loaded} строк за '
+            f'{elapsed:.2f} с ({loaded / max(elapsed, 1e-6):.0f} строк/с)'
+        )
+
+    @staticmethod
+    def drop_indexes(table_models: List[models.Model]) -> None:
+        """
+        Удаление индексов моделей (Meta.indexes) перед загрузкой.
+        Первичные ключи, уникальные и внешние ключи не удаляются.
+        :param table_models: Модели загружаемых таблиц.
+        :return: None
+        """
+
+        with connection.schema_editor() as schema_editor:
+            for model in table_models:
+                with connection.cursor() as cursor:
+                    existing = connection.introspection.get_constraints(
+                        cursor, model._meta.db_table
+                    )
+                for index in model._meta.indexes:
+                    if index.name in existing:
+                        schema_editor.remove_index(model, index)
+
+    @staticmethod
+    def create_indexes(table_models: List[models.Model]) -> None:
+        """
+        Создание индексов моделей, отсутствующих в БД, после загрузки.
+        :param table_models: Модели загружаемых таблиц.
+        :return: None
+        """
+
+        with connection.schema_editor() as schema_editor:
+            for model in table_models:
+                with connection.cursor() as cursor:
+                    existing = connection.introspection.get_constraints(
+                        cursor, model._meta.db_table
+                    )
+                for index in model._meta.indexes:
+                    if index.name not in existing:
+                        schema_editor.add_index(model, index)
+
+    @staticmethod
+    def reset_sequences(table_models: List[models.Model]) -> None:
+        """
+        Установка последовательностей первичных ключей (setval) после
+        загрузки строк с явными id.
+        :param table_models: Модели загружаемых таблиц.
+        :return: None
+        """
+
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), table_models
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
 
-    def retry_execute_raw(
+    def get_row_converter(
         self,
-        cursor: connection,
+        model: models.Model,
+        csv_columns: List[str],
+    ) -> Tuple[List[str], Callable[[dict], List[Any]]]:
+        """
+        Столбцы таблицы и функция преобразования строки CSV в значения.
+        Столбцы, которых нет в файле, заполняются значениями по умолчанию
+        полей модели (например, пароль и даты у пользователей).
+        :param model: Модель таблицы.
+        :param csv_columns: Заголовок CSV файла.
+        :return: Имена столбцов и функция преобразования строки.
+        """
+
+        fields = {field.column: field for field in model._meta.concrete_fields}
+        csv_fields = [fields[column] for column in csv_columns]
+        default_fields = [
+            field
+            for field in model._meta.concrete_fields
+            if field.column not in csv_columns and not field.primary_key
+        ]
+        defaults = [
+            self.prepare_value(field, field.get_default())
+            for field in default_fields
+        ]
+        prepare_csv_value = (
+            self.prepare_copy_value
+            if connection.vendor == 'postgresql'
+            else self.prepare_value
+        )
+
+        def convert(row: dict) -> List[Any]:
+            return [
+                prepare_csv_value(field, row[field.column])
+                for field in csv_fields
+            ] + defaults
+
+        columns = [field.column for field in csv_fields + default_fields]
+        return columns, convert
+
+    def get_chunk_writer(self) -> Callable:
+        if connection.vendor == 'postgresql':
+            return self.copy_chunk
+        return self.insert_chunk
+
+    def copy_chunk(
+        self,
+        cursor,
+        table: str,
+        columns: List[str],
+        chunk: List[List[Any]],
     ) -> None:
         """
-        Функции повторной записи в БД.
+        Запись части строк через COPY FROM STDIN в текстовом формате.
         :param cursor: Курсор.
+        :param table: Имя таблицы.
+        :param columns: Имена столбцов.
+        :param chunk: Строки.
         :return: None
         """
 
-        for key, value in self.retry_requests_dictionary.items():
-            for raw_queries in value:
-                result = self.execute_raw(
-                    raw_queries=raw_queries,
-                    cursor=cursor,
-                    table=key,
-                )
-                if result == self.SUCCESS_MESSAGE:
-                    self.stdout.write(self.style.SUCCESS(result))
-                else:
-                    self.stdout.write(self.style.ERROR(result))
+        buffer = io.StringIO()
+        for values in chunk:
+            buffer.write('\t'.join(map(self.escape_copy_value, values)))
+            buffer.write('\n')
+        buffer.seek(0)
+        cursor.copy_expert(
+            'COPY {table} ({columns}) FROM STDIN'.format(
+                table=connection.ops.quote_name(table),
+                columns=', '.join(map(connection.ops.quote_name, columns)),
+            ),
+            buffer,
+        )
+
+    @staticmethod
+    def insert_chunk(
+        cursor,
+        table: str,
+        columns: List[str],
+        chunk: List[List[Any]],
+    ) -> None:
+        """
+        Запись части строк через executemany с параметрами запроса.
+        :param cursor: Курсор.
+        :param table: Имя таблицы.
+        :param columns: Имена столбцов.
+        :param chunk: Строки.
+        :return: None
+        """
+
+        cursor.executemany(
+            'INSERT INTO {table} ({columns}) VALUES ({values})'.format(
+                table=connection.ops.quote_name(table),
+                columns=', '.join(map(connection.ops.quote_name, columns)),
+                values=', '.join(['%s'] * len(columns)),
+            ),
+            chunk,
+        )
+
+    @staticmethod
+    def get_chunks(
+        rows: Iterable[dict],
+        convert: Callable[[dict], List[Any]],
+        chunk_size: int,
+    ) -> Iterator[List[List[Any]]]:
+        rows = iter(rows)
+        while True:
+            chunk = [convert(row) for row in islice(rows, chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def prepare_value(field: models.Field, value: Any) -> Any:
+        """
+        Приведение значения к типу поля и формату БД.
+        :param field: Поле модели.
+        :param value: Значение из CSV файла или значение по умолчанию.
+        :return: Значение для запроса.
+        """
+
+        if value == '' and not field.empty_strings_allowed:
+            value = None
+        return field.get_db_prep_save(field.to_python(value), connection)
+
+    @staticmethod
+    def prepare_copy_value(field: models.Field, value: str) -> Optional[str]:
+        """
+        Значение из CSV файла передается в COPY без разбора в Python,
+        типы приводит PostgreSQL.
+        :param field: Поле модели.
+        :param value: Значение из CSV файла.
+        :return: Значение для COPY.
+        """
+
+        if value == '' and not field.empty_strings_allowed:
+            return None
+        return value
+
+    @classmethod
+    def escape_copy_value(cls, value: Any) -> str:
+        if value is None:
+            return cls.NULL
+        return (
+            str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r')
+        )
 
     @staticmethod
     def get_error_message(
@@ -175,6 +584,10 @@ class Command(BaseCommand):
                 'Ошибка при загрузке данных. '
                 f'Таблица {table_name} отсутствует в словаре TABLES'
             ),
+            'UNKNOWN_COLUMN': (
+                'Ошибка при загрузке данных. '
+                f'Столбец {table_name} отсутствует в таблице'
+            ),
             'RELATION_ERROR': (
                 'Ошибка при загрузке данных '
                 f'в таблицу {table_name}. '
@@ -185,82 +598,16 @@ class Command(BaseCommand):
                 f'в таблицу {table_name}. '
                 'Запись в таблице уже существует'
             ),
+            'CHECKPOINT_ERROR': (
+                'Ошибка при загрузке данных '
+                f'в таблицу {table_name}. '
+                'Файл изменился после прошлого запуска, '
+                'используйте --reset.'
+            ),
+            'DATA_ERROR': (
+                'Ошибка при загрузке данных '
+                f'в таблицу {table_name}. '
+                'Неверный формат данных.'
+            ),
         }
         return errors[name]
-
-    @staticmethod
-    def get_raw(
-        table: str,
-        columns: List[str],
-        values: List[Union[int, str]],
-    ) -> str:
-        """
-        Получить сырой запрос.
-        :param table: Имя таблицы.
-        :param columns: Имена столбцов
-        :param values: Значение столбцов.
-        :return: Сырой запрос в формате строки.
-        """
-
-        raw_queries = (
-            "INSERT INTO {table} ({columns}) VALUES  {values}"
-        ).format(
-            table=table, columns=', '.join(columns), values=', '.join(values)
-        )
-        return raw_queries
-
-    def add_raw_queries_to_retry_dict(
-        self,
-        table: str,
-        raw_queries: str,
-    ) -> None:
-        """
-        Добавление raw_queries в словарь на повторную запись.
-        :param table: Имя таблицы.
-        :param raw_queries: Сырые запросы.
-        :return: None
-        """
-
-        if table not in self.retry_requests_dictionary:
-            self.retry_requests_dictionary[table] = []
-            self.retry_requests_dictionary[table].append(raw_queries)
-        else:
-            self.retry_requests_dictionary[table].append(raw_queries)
-
-    def create_users(self, table: str, csv_reader: csv.DictReader) -> None:
-        """
-        Метод создания пользователей.
-        :param table: Имя таблицы.
-        :param csv_reader: Парсер с данными из файла.
-        :return: None
-        """
-
-        try:
-            users = [User(**data) for data in csv_reader]
-            User.objects.bulk_create(users)
-            self.stdout.write(self.style.SUCCESS(self.SUCCESS_MESSAGE))
-        except IntegrityError:
-            self.stdout.write(
-                self.style.ERROR(
-                    self.get_error_message(
-                        name='UNIQUE_ERROR',
-                        table_name=table,
-                    )
-                )
-            )
-
-    @staticmethod
-    def substitute_quotes(
-        data: Union[Sequence[Union[int, str]]]
-    ) -> Union[list[str], str]:
-        """
-        Функция форматирования списка/кортежа значений, либо отдельного
-        элемента,
-        под валидные ковычки для sql row.
-        :param data: Последовательность или отдельный элемент.
-        :return: Последовательность или отдельный элемент.
-        """
-        result = [
-            int(value) if value.isdigit() else f'{value}' for value in data
-        ]
-        return result
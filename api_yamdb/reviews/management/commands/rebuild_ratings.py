@@ -0,0 +1,129 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+
+from reviews.models import Review, Title, TitleScore
+from reviews.ratings import annotate_actual_ratings, get_rating
+
+
+class Command(BaseCommand):
+    """
+    Команда полного пересчета рейтингов произведений.
+    Сравнивает сохраненные суммы и количества оценок и гистограммы
+    оценок с таблицей отзывов, выводит расхождения и исправляет их.
+    """
+
+    help = 'Пересчет рейтингов произведений по отзывам'
+    BATCH_SIZE = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только вывести расхождения, не изменяя данные.',
+        )
+
+    def handle(self, *args, **options):
+        titles = annotate_actual_ratings(Title.objects.all()).values_list(
+            'id', 'rating_sum', 'rating_count', 'actual_sum', 'actual_count'
+        )
+        checked = 0
+        drifted = []
+        for (
+            pk,
+            stored_sum,
+            stored_count,
+            rating_sum,
+            rating_count,
+        ) in titles.iterator():
+            checked += 1
+            if (stored_sum, stored_count) == (rating_sum, rating_count):
+                continue
+            if options['verbosity'] > 0:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'Произведение {pk}: сохранено '
+                        f'({stored_sum}, {stored_count}), '
+                        f'по отзывам ({rating_sum}, {rating_count})'
+                    )
+                )
+            drifted.append(
+                Title(
+                    pk=pk,
+                    rating_sum=rating_sum,
+                    rating_count=rating_count,
+                    rating=get_rating(rating_sum, rating_count),
+                )
+            )
+
+        if drifted and not options['dry_run']:
+            with transaction.atomic():
+                Title.objects.bulk_update(
+                    drifted,
+                    fields=('rating_sum', 'rating_count', 'rating'),
+                    batch_size=self.BATCH_SIZE,
+                )
+        scores_drifted = self.check_scores(options)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Проверено произведений: {checked}. '
+                f'Расхождений: {len(drifted)}. '
+                f'Расхождений гистограмм: {scores_drifted}.'
+            )
+        )
+
+    def check_scores(self, options) -> int:
+        """
+        Сверка гистограмм оценок (TitleScore) с отзывами.
+        :param options: Параметры команды.
+        :return: Количество расхождений.
+        """
+
+        actual = {
+            (title_id, score): count
+            for title_id, score, count in Review.objects.order_by()
+            .values_list('title_id', 'score')
+            .annotate(count=Count('id'))
+        }
+        stored = {
+            (title_id, score): count
+            for title_id, score, count in TitleScore.objects.values_list(
+                'title_id', 'score', 'count'
+            )
+        }
+        drifted = {
+            key: actual.get(key, 0)
+            for key in actual.keys() | stored.keys()
+            if actual.get(key, 0) != stored.get(key, 0)
+        }
+        if options['verbosity'] > 0:
+            for (title_id, score), count in sorted(drifted.items()):
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'Произведение {title_id}, оценка {score}: '
+                        f'сохранено {stored.get((title_id, score), 0)}, '
+                        f'по отзывам {count}'
+                    )
+                )
+        if drifted and not options['dry_run']:
+            titles = {title_id for title_id, _ in drifted}
+            scores = [
+                TitleScore(title_id=title_id, score=score, count=count)
+                for (title_id, score), count in actual.items()
+                if title_id in titles
+            ]
+            # Django 2.2 не уменьшает batch_size до лимита параметров
+            # запроса БД (SQLite).
+            batch_size = min(
+                self.BATCH_SIZE,
+                max(
+                    connection.ops.bulk_batch_size(
+                        ['title_id', 'score', 'count'], scores
+                    ),
+                    1,
+                ),
+            )
+            with transaction.atomic():
+                TitleScore.objects.filter(title_id__in=titles).delete()
+                TitleScore.objects.bulk_create(scores, batch_size=batch_size)
+        return len(drifted)
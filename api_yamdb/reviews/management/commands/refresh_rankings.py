@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.rankings import refresh_rankings
+
+
+class Command(BaseCommand):
+    """
+    Команда пересчета рейтингов лучших и популярных произведений
+    (таблица TitleRanking, эндпоинт /titles/top/).
+    """
+
+    help = 'Пересчет рейтингов лучших и популярных произведений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять пересчет каждые N секунд.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            count = refresh_rankings()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Произведений в рейтинге: {count} '
+                    f'({time.monotonic() - started:.2f} с).'
+                )
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
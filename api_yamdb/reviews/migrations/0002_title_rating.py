@@ -0,0 +1,58 @@
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_title_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = (
+        Title.objects.using(schema_editor.connection.alias)
+        .annotate(
+            actual_sum=Coalesce(Sum('reviews__score'), 0),
+            actual_count=Count('reviews'),
+        )
+        .filter(actual_count__gt=0)
+    )
+    for title in titles.iterator():
+        title.rating_sum = title.actual_sum
+        title.rating_count = title.actual_count
+        title.rating = title.actual_sum / title.actual_count
+        title.save(update_fields=('rating_sum', 'rating_count', 'rating'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='Сумма оценок'
+            ),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='Количество оценок'
+            ),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(
+                blank=True,
+                editable=False,
+                help_text=(
+                    'Средняя оценка, пересчитывается при изменении отзывов.'
+                ),
+                null=True,
+                verbose_name='Рейтинг',
+            ),
+        ),
+        migrations.RunPython(fill_title_ratings, migrations.RunPython.noop),
+    ]
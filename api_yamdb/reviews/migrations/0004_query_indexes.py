@@ -0,0 +1,53 @@
+from django.db import migrations, models
+
+TITLE_GENRE_INDEX_SQL = (
+    'CREATE INDEX reviews_title_genre_genre_title_idx '
+    'ON reviews_title_genre (genre_id, title_id)'
+)
+TITLE_GENRE_INDEX_REVERSE_SQL = (
+    'DROP INDEX reviews_title_genre_genre_title_idx'
+)
+TRIGRAM_INDEX_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS title_name_trgm_idx '
+    'ON reviews_title USING gin (name gin_trgm_ops)',
+)
+TRIGRAM_INDEX_REVERSE_SQL = ('DROP INDEX IF EXISTS title_name_trgm_idx',)
+
+
+def execute_on_postgresql(statements):
+    """
+    Триграммный индекс есть только в PostgreSQL, на SQLite (тесты)
+    фильтр по подстроке названия остается полным просмотром таблицы.
+    """
+
+    def execute(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'
+            ),
+        ),
+        migrations.RunSQL(
+            TITLE_GENRE_INDEX_SQL, TITLE_GENRE_INDEX_REVERSE_SQL
+        ),
+        migrations.RunPython(
+            execute_on_postgresql(TRIGRAM_INDEX_SQL),
+            execute_on_postgresql(TRIGRAM_INDEX_REVERSE_SQL),
+        ),
+    ]
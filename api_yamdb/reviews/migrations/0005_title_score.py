@@ -0,0 +1,79 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:44
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_title_scores(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleScore = apps.get_model('reviews', 'TitleScore')
+    alias = schema_editor.connection.alias
+    scores = (
+        Review.objects.using(alias)
+        .order_by()
+        .values_list('title_id', 'score')
+        .annotate(count=Count('id'))
+    )
+    TitleScore.objects.using(alias).bulk_create(
+        (
+            TitleScore(title_id=title_id, score=score, count=count)
+            for title_id, score, count in scores.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScore',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'score',
+                    models.PositiveSmallIntegerField(verbose_name='Оценка'),
+                ),
+                (
+                    'count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='Количество оценок'
+                    ),
+                ),
+                (
+                    'title',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='scores',
+                        to='reviews.Title',
+                        verbose_name='Произведение',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Оценки произведения',
+                'verbose_name_plural': 'Оценки произведений',
+                'default_related_name': 'scores',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescore',
+            constraint=models.UniqueConstraint(
+                fields=('title', 'score'), name='title_score_unique'
+            ),
+        ),
+        migrations.RunPython(fill_title_scores, migrations.RunPython.noop),
+    ]
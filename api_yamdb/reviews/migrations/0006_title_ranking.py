@@ -0,0 +1,90 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                (
+                    'title',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='ranking',
+                        serialize=False,
+                        to='reviews.Title',
+                        verbose_name='Произведение',
+                    ),
+                ),
+                ('year', models.IntegerField(verbose_name='Год издания')),
+                (
+                    'score',
+                    models.FloatField(
+                        help_text='Средняя оценка, сглаженная к средней по всем отзывам.',
+                        verbose_name='Байесовская оценка',
+                    ),
+                ),
+                (
+                    'trending',
+                    models.FloatField(
+                        help_text='Сумма недавних оценок с экспоненциальным затуханием.',
+                        verbose_name='Популярность',
+                    ),
+                ),
+                (
+                    'rating_count',
+                    models.PositiveIntegerField(
+                        verbose_name='Количество оценок'
+                    ),
+                ),
+                ('updated', models.DateTimeField(verbose_name='Пересчитано')),
+                (
+                    'category',
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name='rankings',
+                        to='reviews.Category',
+                        verbose_name='Категория',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Рейтинг произведения',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['-score'], name='ranking_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(
+                fields=['category', '-score'],
+                name='ranking_category_score_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(
+                fields=['-trending'], name='ranking_trending_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(
+                fields=['category', '-trending'],
+                name='ranking_category_trending_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:48
+
+from django.db import migrations, models
+
+# Для ?ordering=-rating: произведения без оценок (NULL) в конце списка.
+# Индекс (rating, id), прочитанный в обратном порядке, дает NULLS FIRST,
+# поэтому для убывания нужен отдельный индекс (только PostgreSQL).
+RATING_DESC_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS title_rating_desc_idx '
+    'ON reviews_title (rating DESC NULLS LAST, id DESC)'
+)
+RATING_DESC_INDEX_REVERSE_SQL = 'DROP INDEX IF EXISTS title_rating_desc_idx'
+
+
+def execute_on_postgresql(statement):
+    def execute(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(statement)
+
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                fields=['rating', 'id'], name='title_rating_id_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                fields=['rating_count', 'id'], name='title_rating_count_id_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                fields=['name', 'id'], name='title_name_id_idx'
+            ),
+        ),
+        migrations.RunPython(
+            execute_on_postgresql(RATING_DESC_INDEX_SQL),
+            execute_on_postgresql(RATING_DESC_INDEX_REVERSE_SQL),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:49
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# Поисковый вектор заполняется триггером при вставке (в том числе COPY в
+# load_csv) и при изменении названия или описания. Обновления рейтинга
+# не затрагивают эти столбцы и не пересчитывают вектор. save() Django
+# записывает search_vector = NULL, поэтому столбец тоже в списке.
+SEARCH_VECTOR_EXPRESSION = """
+    setweight(to_tsvector('russian', coalesce({row}name, '')), 'A')
+    || setweight(to_tsvector('english', coalesce({row}name, '')), 'A')
+    || setweight(to_tsvector('russian', coalesce({row}description, '')), 'B')
+    || setweight(to_tsvector('english', coalesce({row}description, '')), 'B')
+"""
+SEARCH_VECTOR_SQL = (
+    """
+    CREATE FUNCTION reviews_title_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {expression};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """.format(
+        expression=SEARCH_VECTOR_EXPRESSION.format(row='NEW.')
+    ),
+    """
+    CREATE TRIGGER reviews_title_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description, search_vector
+    ON reviews_title
+    FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector_update()
+    """,
+    'UPDATE reviews_title SET search_vector = {expression}'.format(
+        expression=SEARCH_VECTOR_EXPRESSION.format(row='')
+    ),
+    'CREATE INDEX title_search_vector_idx '
+    'ON reviews_title USING gin (search_vector)',
+)
+SEARCH_VECTOR_REVERSE_SQL = (
+    'DROP INDEX IF EXISTS title_search_vector_idx',
+    'DROP TRIGGER IF EXISTS reviews_title_search_vector_trigger '
+    'ON reviews_title',
+    'DROP FUNCTION IF EXISTS reviews_title_search_vector_update()',
+)
+
+
+def execute_on_postgresql(statements):
+    def execute(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                help_text='Название и описание для полнотекстового поиска, заполняется триггером PostgreSQL.',
+                null=True,
+                verbose_name='Поисковый вектор',
+            ),
+        ),
+        migrations.RunPython(
+            execute_on_postgresql(SEARCH_VECTOR_SQL),
+            execute_on_postgresql(SEARCH_VECTOR_REVERSE_SQL),
+        ),
+    ]
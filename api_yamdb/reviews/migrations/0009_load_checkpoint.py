@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadCheckpoint',
+            fields=[
+                (
+                    'table',
+                    models.CharField(
+                        max_length=100,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='Таблица',
+                    ),
+                ),
+                (
+                    'source_size',
+                    models.BigIntegerField(verbose_name='Размер файла'),
+                ),
+                (
+                    'source_mtime',
+                    models.BigIntegerField(
+                        verbose_name='Время изменения файла'
+                    ),
+                ),
+                (
+                    'rows',
+                    models.BigIntegerField(verbose_name='Загружено строк'),
+                ),
+                (
+                    'done',
+                    models.BooleanField(
+                        default=False, verbose_name='Загружена'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка загрузки',
+                'verbose_name_plural': 'Контрольные точки загрузки',
+            },
+        ),
+    ]
@@ -1,9 +1,10 @@
 import datetime
 
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
 
 from .abstract_models import (
     AbstractContentModel,
@@ -113,11 +114,49 @@ class Title(models.Model):
         null=True,
     )
     genre = models.ManyToManyField(Genre, verbose_name='Жанры')
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='Средняя оценка, пересчитывается при изменении отзывов.',
+    )
+    search_vector = SearchVectorField(
+        verbose_name='Поисковый вектор',
+        null=True,
+        editable=False,
+        help_text=(
+            'Название и описание для полнотекстового поиска, заполняется '
+            'триггером PostgreSQL.'
+        ),
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         default_related_name = 'titles'
+        indexes = [
+            models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'
+            ),
+            models.Index(fields=['rating', 'id'], name='title_rating_id_idx'),
+            models.Index(
+                fields=['rating_count', 'id'],
+                name='title_rating_count_id_idx',
+            ),
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ]
 
     def __str__(self) -> str:
         return f'Название: {self.name}. Год издания: {self.year}'
@@ -132,6 +171,93 @@ class Title(models.Model):
             raise ValidationError('Год выпуска не может быть больше текущего')
 
 
+class TitleScore(models.Model):
+    """
+    Количество оценок произведения с одним значением (строка гистограммы
+    оценок). Поддерживается обработчиками сигналов отзывов.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name='Произведение',
+    )
+    score = models.PositiveSmallIntegerField(verbose_name='Оценка')
+    count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Оценки произведения'
+        verbose_name_plural = 'Оценки произведений'
+        default_related_name = 'scores'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='title_score_unique',
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.title_id}: {self.score} - {self.count}'
+
+
+class TitleRanking(models.Model):
+    """
+    Позиция произведения в рейтингах (таблица пересчитывается командой
+    refresh_rankings). Категория и год копируются из произведения,
+    чтобы выборка лучших произведений шла по индексам этой таблицы.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Произведение',
+        related_name='ranking',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name='Категория',
+        related_name='rankings',
+    )
+    year = models.IntegerField(verbose_name='Год издания')
+    score = models.FloatField(
+        verbose_name='Байесовская оценка',
+        help_text='Средняя оценка, сглаженная к средней по всем отзывам.',
+    )
+    trending = models.FloatField(
+        verbose_name='Популярность',
+        help_text='Сумма недавних оценок с экспоненциальным затуханием.',
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок'
+    )
+    updated = models.DateTimeField(verbose_name='Пересчитано')
+
+    class Meta:
+        verbose_name = 'Рейтинг произведения'
+        verbose_name_plural = 'Рейтинги произведений'
+        indexes = [
+            models.Index(fields=['-score'], name='ranking_score_idx'),
+            models.Index(
+                fields=['category', '-score'],
+                name='ranking_category_score_idx',
+            ),
+            models.Index(fields=['-trending'], name='ranking_trending_idx'),
+            models.Index(
+                fields=['category', '-trending'],
+                name='ranking_category_trending_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.title_id}: {self.score:.2f}'
+
+
 class Review(AbstractReviewCommentModel):
     """
     Модель отзывов.
@@ -153,6 +279,12 @@ class Review(AbstractReviewCommentModel):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         default_related_name = 'reviews'
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=[
@@ -166,6 +298,34 @@ class Review(AbstractReviewCommentModel):
     def __str__(self) -> str:
         return self.text[:FIRST_CHARACTERS]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating_state()
+        return instance
+
+    def save(self, *args, **kwargs) -> None:
+        """
+        Сохранение отзыва в одной транзакции с обновлением рейтинга
+        произведения (обработчики сигналов в reviews/signals.py).
+        """
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self.remember_rating_state()
+
+    def remember_rating_state(self) -> None:
+        """
+        Запоминает произведение и оценку в том виде, в котором они
+        сохранены в БД. Нужно для расчета разницы при изменении оценки.
+        :return: None
+        """
+
+        self.loaded_rating_state = (
+            self.__dict__.get('title_id'),
+            self.__dict__.get('score'),
+        )
+
 
 class Comment(AbstractReviewCommentModel):
     """
@@ -183,6 +343,35 @@ class Comment(AbstractReviewCommentModel):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.text[:FIRST_CHARACTERS]
+
+
+class LoadCheckpoint(models.Model):
+    """
+    Контрольная точка команды load_csv: количество строк CSV файла,
+    загруженных в таблицу. Обновляется в транзакции части строк, поэтому
+    всегда соответствует зафиксированным данным.
+    """
+
+    table = models.CharField(
+        max_length=100, primary_key=True, verbose_name='Таблица'
+    )
+    source_size = models.BigIntegerField(verbose_name='Размер файла')
+    source_mtime = models.BigIntegerField(verbose_name='Время изменения файла')
+    rows = models.BigIntegerField(verbose_name='Загружено строк')
+    done = models.BooleanField(default=False, verbose_name='Загружена')
+
+    class Meta:
+        verbose_name = 'Контрольная точка загрузки'
+        verbose_name_plural = 'Контрольные точки загрузки'
+
+    def __str__(self) -> str:
+        return f'{self.table}: {self.rows}'
@@ -0,0 +1,111 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Review, Title, TitleRanking
+
+# Отправляется после пересчета таблицы TitleRanking.
+rankings_refreshed = Signal()
+
+
+def get_global_rating() -> Optional[float]:
+    """
+    Средняя оценка по всем отзывам (по сохраненным суммам произведений).
+    :return: Средняя оценка или None, если отзывов нет.
+    """
+
+    totals = Title.objects.aggregate(
+        rating_sum=Sum('rating_sum'), rating_count=Sum('rating_count')
+    )
+    if not totals['rating_count']:
+        return None
+    return totals['rating_sum'] / totals['rating_count']
+
+
+def get_bayesian_score(
+    rating_sum: int,
+    rating_count: int,
+    prior: float,
+    prior_weight: int,
+) -> float:
+    """
+    Байесовская оценка: средняя оценка произведения, к которой добавлено
+    prior_weight "виртуальных" оценок, равных средней по всем отзывам.
+    Произведения с несколькими отзывами не обгоняют проверенные.
+    :param rating_sum: Сумма оценок произведения.
+    :param rating_count: Количество оценок произведения.
+    :param prior: Средняя оценка по всем отзывам.
+    :param prior_weight: Вес средней оценки.
+    :return: Оценка.
+    """
+
+    return (prior * prior_weight + rating_sum) / (prior_weight + rating_count)
+
+
+def get_trending_scores(now) -> Dict[int, float]:
+    """
+    Популярность произведений: сумма оценок отзывов за последние
+    RANKING_TRENDING_WINDOW_DAYS дней, вес отзыва уменьшается вдвое
+    каждые RANKING_TRENDING_HALF_LIFE_DAYS дней.
+    :param now: Текущее время.
+    :return: Словарь {id произведения: популярность}.
+    """
+
+    half_life = timedelta(days=settings.RANKING_TRENDING_HALF_LIFE_DAYS)
+    since = now - timedelta(days=settings.RANKING_TRENDING_WINDOW_DAYS)
+    trending = defaultdict(float)
+    reviews = Review.objects.filter(pub_date__gte=since).values_list(
+        'title_id', 'score', 'pub_date'
+    )
+    for title_id, score, pub_date in reviews.iterator():
+        age = max((now - pub_date) / half_life, 0)
+        trending[title_id] += score * math.pow(0.5, age)
+    return trending
+
+
+def refresh_rankings(batch_size: int = 1000) -> int:
+    """
+    Полный пересчет таблицы TitleRanking по сохраненным рейтингам
+    произведений и недавним отзывам. В таблицу попадают произведения,
+    у которых есть отзывы.
+    :param batch_size: Размер пачки вставки.
+    :return: Количество произведений в рейтинге.
+    """
+
+    now = timezone.now()
+    prior = get_global_rating()
+    trending = get_trending_scores(now)
+    titles = Title.objects.filter(rating_count__gt=0).values_list(
+        'id', 'category_id', 'year', 'rating_sum', 'rating_count'
+    )
+    rankings = [
+        TitleRanking(
+            title_id=pk,
+            category_id=category_id,
+            year=year,
+            score=get_bayesian_score(
+                rating_sum,
+                rating_count,
+                prior,
+                settings.RANKING_PRIOR_WEIGHT,
+            ),
+            trending=trending.get(pk, 0.0),
+            rating_count=rating_count,
+            updated=now,
+        )
+        for pk, category_id, year, rating_sum, rating_count in titles
+    ]
+    with transaction.atomic():
+        TitleRanking.objects.all().delete()
+        TitleRanking.objects.bulk_create(rankings, batch_size=batch_size)
+        transaction.on_commit(
+            lambda: rankings_refreshed.send(sender=TitleRanking)
+        )
+    return len(rankings)
@@ -0,0 +1,159 @@
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    QuerySet,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Review, Title, TitleScore
+
+SCORES = range(1, 11)
+
+
+def apply_rating_delta(
+    title_id: int,
+    score_delta: int,
+    count_delta: int,
+) -> None:
+    """
+    Инкрементальное обновление рейтинга произведения одним UPDATE.
+    Сумма и количество оценок меняются через F-выражения, поэтому
+    параллельные отзывы к одному произведению не теряют обновления.
+    :param title_id: id произведения.
+    :param score_delta: Изменение суммы оценок.
+    :param count_delta: Изменение количества оценок.
+    :return: None
+    """
+
+    rating_sum = F('rating_sum') + score_delta
+    rating_count = F('rating_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        # В выражениях UPDATE поля имеют значения до обновления, поэтому
+        # новое количество оценок равно нулю при rating_count == -count_delta.
+        rating=Case(
+            When(rating_count=-count_delta, then=Value(None)),
+            default=Cast(rating_sum, FloatField()) / rating_count,
+            output_field=FloatField(),
+        ),
+    )
+
+
+def apply_score_delta(title_id: int, score: int, count_delta: int) -> None:
+    """
+    Изменение количества оценок score в гистограмме произведения.
+    Строка гистограммы создается при первой такой оценке.
+    :param title_id: id произведения.
+    :param score: Оценка.
+    :param count_delta: Изменение количества оценок.
+    :return: None
+    """
+
+    scores = TitleScore.objects.filter(title_id=title_id, score=score)
+    if scores.update(count=F('count') + count_delta) or count_delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            TitleScore.objects.create(
+                title_id=title_id, score=score, count=count_delta
+            )
+    except IntegrityError:
+        # Строку успел создать параллельный запрос.
+        scores.update(count=F('count') + count_delta)
+
+
+def recalculate_title_rating(title_id: int) -> None:
+    """
+    Полный пересчет рейтинга одного произведения по его отзывам.
+    :param title_id: id произведения.
+    :return: None
+    """
+
+    titles = annotate_actual_ratings(Title.objects.filter(pk=title_id))
+    for rating_sum, rating_count in titles.values_list(
+        'actual_sum', 'actual_count'
+    ):
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=get_rating(rating_sum, rating_count),
+        )
+    recalculate_title_scores(title_id)
+
+
+def recalculate_title_scores(title_id: int) -> None:
+    """
+    Полный пересчет гистограммы оценок одного произведения по отзывам.
+    :param title_id: id произведения.
+    :return: None
+    """
+
+    TitleScore.objects.filter(title_id=title_id).delete()
+    TitleScore.objects.bulk_create(
+        TitleScore(title_id=title_id, score=score, count=count)
+        for score, count in get_actual_scores(title_id).items()
+    )
+
+
+def get_actual_scores(title_id: int) -> Dict[int, int]:
+    """
+    Количество оценок произведения по значениям, посчитанное по отзывам.
+    :param title_id: id произведения.
+    :return: Словарь {оценка: количество}.
+    """
+
+    return dict(
+        Review.objects.filter(title_id=title_id)
+        .order_by()
+        .values_list('score')
+        .annotate(count=Count('id'))
+    )
+
+
+def get_histogram(scores: Iterable[TitleScore]) -> Dict[str, int]:
+    """
+    Гистограмма оценок 1-10 по строкам TitleScore, отсутствующие
+    оценки - нули.
+    :param scores: Строки гистограммы произведения.
+    :return: Словарь {оценка: количество}.
+    """
+
+    counts = {row.score: row.count for row in scores}
+    return OrderedDict((str(score), counts.get(score, 0)) for score in SCORES)
+
+
+def annotate_actual_ratings(queryset: QuerySet) -> QuerySet:
+    """
+    Добавляет к выборке произведений сумму (actual_sum) и количество
+    (actual_count) оценок, посчитанные по таблице отзывов.
+    :param queryset: Выборка произведений.
+    :return: Выборка с аннотациями.
+    """
+
+    return queryset.order_by().annotate(
+        actual_sum=Coalesce(Sum('reviews__score'), 0),
+        actual_count=Count('reviews'),
+    )
+
+
+def get_rating(rating_sum: int, rating_count: int):
+    """
+    Рейтинг по сумме и количеству оценок.
+    :param rating_sum: Сумма оценок.
+    :param rating_count: Количество оценок.
+    :return: Средняя оценка или None, если оценок нет.
+    """
+
+    if not rating_count:
+        return None
+    return rating_sum / rating_count
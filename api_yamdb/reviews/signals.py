@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Category, Genre, Review
+from .ratings import (
+    apply_rating_delta,
+    apply_score_delta,
+    recalculate_title_rating,
+)
+from .slugs import category_slugs, genre_slugs
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(
+    sender, instance: Review, created: bool, **kwargs
+) -> None:
+    """
+    Обновление рейтинга и гистограммы оценок произведения при создании
+    или изменении отзыва.
+    """
+
+    if created:
+        apply_rating_delta(instance.title_id, instance.score, 1)
+        apply_score_delta(instance.title_id, instance.score, 1)
+        return
+
+    old_title_id, old_score = getattr(
+        instance, 'loaded_rating_state', (None, None)
+    )
+    if old_title_id is None or old_score is None:
+        # Исходная оценка неизвестна (объект создан вручную с pk),
+        # поэтому рейтинг пересчитывается по отзывам.
+        recalculate_title_rating(instance.title_id)
+        return
+    if old_title_id != instance.title_id:
+        apply_rating_delta(old_title_id, -old_score, -1)
+        apply_rating_delta(instance.title_id, instance.score, 1)
+    elif old_score != instance.score:
+        apply_rating_delta(instance.title_id, instance.score - old_score, 0)
+    else:
+        return
+    apply_score_delta(old_title_id, old_score, -1)
+    apply_score_delta(instance.title_id, instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance: Review, **kwargs) -> None:
+    """
+    Обновление рейтинга и гистограммы оценок произведения при удалении
+    отзыва, в том числе каскадном (при удалении произведения или
+    пользователя).
+    """
+
+    apply_rating_delta(instance.title_id, -instance.score, -1)
+    apply_score_delta(instance.title_id, instance.score, -1)
+
+
+@receiver((post_save, post_delete), sender=Category)
+@receiver((post_save, post_delete), sender=Genre)
+def invalidate_slugs(sender, **kwargs) -> None:
+    """
+    Сброс кэша слагов категорий или жанров. Повторный сброс после
+    фиксации транзакции не дает параллельному запросу сохранить в кэше
+    справочник без изменений.
+    """
+
+    slugs = category_slugs if sender is Category else genre_slugs
+    slugs.invalidate()
+    transaction.on_commit(slugs.invalidate)
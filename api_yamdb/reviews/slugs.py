@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, router
+
+from .models import Category, Genre
+
+VERSION_KEY = 'reviews:slugs:{label}:version'
+
+
+class SlugCache:
+    """
+    Кэш соответствия slug -> (id, name) небольшого справочника в памяти
+    процесса. Номер версии справочника хранится в кэше Django и
+    увеличивается обработчиками сигналов при изменении записей. С общим
+    кэшем (Redis, memcached) каждый процесс перечитывает справочник после
+    изменений в любом процессе; с кэшем в памяти процесса изменения из
+    других процессов видны не позже чем через SLUG_CACHE_TIMEOUT, когда
+    истекает ключ версии. Неизвестный слаг перечитывает справочник, но не
+    чаще одного раза за SLUG_RELOAD_INTERVAL секунд.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.key = VERSION_KEY.format(label=model._meta.label_lower)
+        self.lock = threading.Lock()
+        self.version = None
+        self.reloaded_at: Optional[float] = None
+        self.slugs: Dict[str, Tuple[int, str]] = {}
+
+    def __deepcopy__(self, memo) -> 'SlugCache':
+        # Поля сериализаторов DRF копируются вместе с аргументами,
+        # кэш должен оставаться общим.
+        return self
+
+    def get_version(self) -> int:
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(
+                self.key,
+                int(time.time() * 1000),
+                timeout=settings.SLUG_CACHE_TIMEOUT,
+            )
+            version = cache.get(self.key)
+        return version
+
+    def get_slugs(self, reload: bool = False) -> Dict[str, Tuple[int, str]]:
+        """
+        Справочник текущей версии, при смене версии - из БД.
+        :param reload: Перечитать справочник независимо от версии.
+        :return: Словарь {slug: (id, name)}.
+        """
+
+        version = self.get_version()
+        if reload or version != self.version:
+            with self.lock:
+                # Из основной БД: справочник из отстающей реплики
+                # сохранился бы до следующего изменения.
+                rows = self.model.objects.using(
+                    router.db_for_write(self.model)
+                ).values_list('slug', 'id', 'name')
+                self.slugs = {slug: (pk, name) for slug, pk, name in rows}
+                self.version = version
+        return self.slugs
+
+    def get_known_slugs(
+        self, slugs: Sequence[str]
+    ) -> Dict[str, Tuple[int, str]]:
+        """
+        Справочник для поиска слагов. Если какого-то слага нет, справочник
+        перечитывается: запись могла быть создана в другом процессе, а
+        новая версия еще не видна в этом. Повторные запросы с
+        несуществующим слагом перечитывают справочник не чаще одного раза
+        за SLUG_RELOAD_INTERVAL секунд.
+        :param slugs: Искомые слаги.
+        :return: Словарь {slug: (id, name)}.
+        """
+
+        known = self.get_slugs()
+        if all(slug in known for slug in slugs):
+            return known
+        now = time.monotonic()
+        if (
+            self.reloaded_at is not None
+            and now - self.reloaded_at < settings.SLUG_RELOAD_INTERVAL
+        ):
+            return known
+        self.reloaded_at = now
+        return self.get_slugs(reload=True)
+
+    def get_ids(self, slugs: Sequence[str]) -> List[int]:
+        known = self.get_known_slugs(slugs)
+        return [known[slug][0] for slug in slugs if slug in known]
+
+    def get_instance(self, slug: str) -> Optional[models.Model]:
+        """
+        Экземпляр модели по slug без запроса к БД.
+        :param slug: slug записи.
+        :return: Экземпляр модели или None.
+        """
+
+        known = self.get_known_slugs([slug])
+        if slug not in known:
+            return None
+        pk, name = known[slug]
+        return self.model.from_db(
+            self.model.objects.db, ('id', 'name', 'slug'), (pk, name, slug)
+        )
+
+    def invalidate(self) -> None:
+        self.version = None
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            pass
+
+
+category_slugs = SlugCache(Category)
+genre_slugs = SlugCache(Genre)
@@ -0,0 +1,289 @@
+"""
+Нагрузочное тестирование API.
+
+    python -m benchmarks --requests 200 --output results.json
+    python -m benchmarks --gunicorn --concurrency 8 --baseline base.json
+    python -m benchmarks --gunicorn --worker-class sync gthread \\
+        --scenarios titles_list --concurrency 16
+    python -m benchmarks --gunicorn --conn-max-age 0 60
+
+Данные берутся из БД настроек Django (переменные DB_*), их готовит
+python manage.py generate_data.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from itertools import product
+from os.path import abspath, dirname, join
+from typing import List, Optional, Tuple
+
+ROOT_DIR = dirname(dirname(abspath(__file__)))
+PROJECT_DIR = join(ROOT_DIR, 'api_yamdb')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument(
+        '--requests',
+        type=int,
+        default=100,
+        help='Количество запросов на сценарий.',
+    )
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument(
+        '--scenarios',
+        nargs='+',
+        help='Запускаемые сценарии (по умолчанию все).',
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument(
+        '--url', help='Адрес запущенного сервера вместо django.test.Client.'
+    )
+    target.add_argument(
+        '--gunicorn',
+        action='store_true',
+        help='Запустить локальный gunicorn и нагружать его по HTTP.',
+    )
+    parser.add_argument(
+        '--workers', type=int, default=2, help='Воркеры gunicorn.'
+    )
+    parser.add_argument(
+        '--worker-class',
+        nargs='+',
+        choices=('sync', 'gthread', 'gevent', 'uvicorn'),
+        default=['sync'],
+        help='Типы воркеров gunicorn; с несколькими значениями сценарии '
+        'запускаются для каждого, к имени сценария добавляется [тип].',
+    )
+    parser.add_argument(
+        '--threads', type=int, default=4, help='Потоки воркера gthread.'
+    )
+    parser.add_argument(
+        '--conn-max-age',
+        nargs='+',
+        type=int,
+        help='CONN_MAX_AGE соединений с БД; с несколькими значениями '
+        'сценарии запускаются для каждого (кроме --url).',
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Параллельные запросы (только для HTTP).',
+    )
+    parser.add_argument('--output', help='Файл JSON с результатами.')
+    parser.add_argument('--baseline', help='Файл JSON базовых результатов.')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        help='Допустимый рост p90 относительно базового (0.2 - на 20%%). '
+        'Без параметра сравниваются только SQL-запросы и ошибки.',
+    )
+    args = parser.parse_args()
+    if args.url and args.conn_max_age:
+        parser.error('--conn-max-age задается только для gunicorn и клиента')
+    return args
+
+
+def setup_django() -> None:
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    # Ограничения частоты запросов к /auth/ отклонили бы сценарии
+    # регистрации, а заголовок Server-Timing нужен для подсчета запросов.
+    os.environ.setdefault('THROTTLE_AUTH_IP', '1000000/min')
+    os.environ.setdefault('THROTTLE_AUTH_IDENTITY', '1000000/min')
+    os.environ['PERFORMANCE_METRICS_ENABLED'] = 'true'
+    os.environ['SERVER_TIMING_ENABLED'] = 'true'
+
+    import django
+
+    django.setup()
+
+
+def start_gunicorn(
+    workers: int,
+    worker_class: str = 'sync',
+    threads: int = 4,
+    conn_max_age: Optional[int] = None,
+) -> Tuple[subprocess.Popen, str]:
+    """
+    Запуск gunicorn с настройками api_yamdb/gunicorn.conf.py.
+    :param workers: Количество воркеров.
+    :param worker_class: Тип воркеров: sync, gthread, gevent или uvicorn.
+    :param threads: Потоки воркера gthread.
+    :param conn_max_age: CONN_MAX_AGE соединений с БД или None.
+    :return: Процесс и адрес сервера.
+    """
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    env = dict(
+        os.environ,
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_THREADS=str(threads),
+    )
+    if conn_max_age is not None:
+        env['DB_CONN_MAX_AGE'] = str(conn_max_age)
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            '-c',
+            # В gunicorn 20.0 нет python -m gunicorn.
+            'from gunicorn.app.wsgiapp import run; run()',
+            '-c',
+            'gunicorn.conf.py',
+            (
+                'api_yamdb.asgi:application'
+                if worker_class == 'uvicorn'
+                else 'api_yamdb.wsgi:application'
+            ),
+            '--bind',
+            f'127.0.0.1:{port}',
+        ],
+        cwd=PROJECT_DIR,
+        env=env,
+    )
+    for _ in range(100):
+        if process.poll() is not None:
+            break
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('gunicorn не запустился')
+
+
+def get_variants(
+    args: argparse.Namespace,
+) -> List[Tuple[str, Optional[str], Optional[int]]]:
+    """
+    Сравниваемые конфигурации: сочетания типов воркеров gunicorn и
+    значений CONN_MAX_AGE.
+    :param args: Аргументы командной строки.
+    :return: Суффикс имен сценариев, тип воркеров и CONN_MAX_AGE.
+    """
+
+    worker_classes = args.worker_class if args.gunicorn else [None]
+    conn_max_ages = args.conn_max_age or [None]
+    variants = []
+    for worker_class, conn_max_age in product(worker_classes, conn_max_ages):
+        labels = []
+        if len(worker_classes) > 1:
+            labels.append(worker_class)
+        if len(conn_max_ages) > 1:
+            labels.append(f'age={conn_max_age}')
+        suffix = '[{}]'.format(','.join(labels)) if labels else ''
+        variants.append((suffix, worker_class, conn_max_age))
+    return variants
+
+
+def run_scenarios(
+    args: argparse.Namespace,
+    worker_class: Optional[str] = None,
+    conn_max_age: Optional[int] = None,
+    suffix: str = '',
+) -> dict:
+    """
+    Запуск сценариев на одном сервере. Данные сценариев готовятся
+    заново, поэтому в сравниваемых конфигурациях запросы одинаковые.
+    :param args: Аргументы командной строки.
+    :param worker_class: Тип воркеров gunicorn или None.
+    :param conn_max_age: CONN_MAX_AGE соединений с БД или None.
+    :param suffix: Суффикс имен сценариев.
+    :return: Результаты по сценариям.
+    """
+
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.db import connection
+
+    from .harness import DjangoTestClient, HttpClient, run_scenario
+    from .scenarios import Context, get_scenarios
+
+    context = Context(args.requests, args.seed)
+    process = None
+    try:
+        if worker_class:
+            process, url = start_gunicorn(
+                args.workers, worker_class, args.threads, conn_max_age
+            )
+            client = HttpClient(url)
+        elif args.url:
+            client = HttpClient(args.url)
+        else:
+            if conn_max_age is not None:
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+            # Кэш ответов процесса не должен переходить между
+            # сравниваемыми конфигурациями.
+            caches[settings.API_CACHE_ALIAS].clear()
+            client = DjangoTestClient()
+        concurrency = args.concurrency if args.url or worker_class else 1
+        scenarios = {}
+        for scenario in get_scenarios(context):
+            if args.scenarios and scenario.name not in args.scenarios:
+                continue
+            scenarios[scenario.name + suffix] = run_scenario(
+                client, scenario, args.requests, concurrency
+            )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        context.cleanup()
+    return scenarios
+
+
+def main() -> int:
+    args = parse_args()
+    setup_django()
+
+    from django.db import connection
+
+    from .harness import compare, format_table
+
+    scenarios = {}
+    for suffix, worker_class, conn_max_age in get_variants(args):
+        scenarios.update(
+            run_scenarios(args, worker_class, conn_max_age, suffix)
+        )
+
+    results = {
+        'meta': {
+            'target': 'gunicorn' if args.gunicorn else args.url or 'client',
+            'database': connection.vendor,
+            'requests': args.requests,
+            'concurrency': (
+                args.concurrency if args.url or args.gunicorn else 1
+            ),
+            'seed': args.seed,
+            'worker_class': args.worker_class if args.gunicorn else None,
+            'conn_max_age': args.conn_max_age,
+        },
+        'scenarios': scenarios,
+    }
+    print(format_table(scenarios))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'РЕГРЕССИЯ {regression}')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
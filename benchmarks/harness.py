@@ -0,0 +1,194 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from django.test import Client
+
+from .scenarios import Scenario
+
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+PERCENTILES = (50, 90, 99)
+
+
+class DjangoTestClient:
+    """
+    Запросы через django.test.Client в текущем процессе: без сети и
+    gunicorn, только стоимость Django, DRF и БД.
+    """
+
+    def __init__(self) -> None:
+        self.client = Client()
+
+    def request(self, method: str, params: dict) -> Tuple[int, dict]:
+        headers = {}
+        if params.get('token'):
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {params["token"]}'
+        kwargs = {}
+        if 'data' in params:
+            kwargs = {
+                'data': json.dumps(params['data']),
+                'content_type': 'application/json',
+            }
+        response = getattr(self.client, method)(
+            params['path'], **kwargs, **headers
+        )
+        return response.status_code, response
+
+
+class HttpClient:
+    """
+    Запросы по HTTP к запущенному серверу (gunicorn, nginx).
+    Сессия requests у каждого потока своя.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url.rstrip('/')
+        self.sessions = {}
+
+    def request(self, method: str, params: dict) -> Tuple[int, dict]:
+        session = self.sessions.setdefault(
+            threading.get_ident(), requests.Session()
+        )
+        headers = {}
+        if params.get('token'):
+            headers['Authorization'] = f'Bearer {params["token"]}'
+        response = session.request(
+            method,
+            self.url + params['path'],
+            json=params.get('data'),
+            headers=headers,
+        )
+        return response.status_code, response.headers
+
+
+def get_query_count(headers) -> Optional[int]:
+    """
+    Количество SQL-запросов из заголовка Server-Timing
+    (api.middleware.PerformanceMiddleware).
+    """
+
+    match = SERVER_TIMING_QUERIES.search(headers.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
+
+
+def get_percentile(values: List[float], percentile: int) -> float:
+    """
+    Перцентиль методом ближайшего ранга.
+    :param values: Отсортированные значения.
+    :param percentile: Перцентиль, 0-100.
+    :return: Значение.
+    """
+
+    if not values:
+        return 0.0
+    rank = max(int(round(percentile / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def run_scenario(
+    client, scenario: Scenario, requests_count: int, concurrency: int = 1
+) -> dict:
+    """
+    Запуск сценария: параметры запросов строятся заранее, запросы
+    выполняются в concurrency потоков.
+    :param client: DjangoTestClient или HttpClient.
+    :param scenario: Сценарий.
+    :param requests_count: Количество запросов.
+    :param concurrency: Количество потоков.
+    :return: Результаты сценария.
+    """
+
+    params = [scenario.build(index) for index in range(requests_count)]
+
+    def send(request_params: dict) -> Tuple[float, int, Optional[int]]:
+        start = time.perf_counter()
+        status, headers = client.request(scenario.method, request_params)
+        return (
+            time.perf_counter() - start,
+            status,
+            get_query_count(headers),
+        )
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(send, params))
+    else:
+        results = [send(request_params) for request_params in params]
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(duration * 1000 for duration, _, _ in results)
+    queries = [count for _, _, count in results if count is not None]
+    summary = {
+        'requests': len(results),
+        'errors': sum(status >= 400 for _, status, _ in results),
+        'mean_ms': round(sum(latencies) / max(len(latencies), 1), 3),
+        'throughput_rps': round(len(results) / max(elapsed, 1e-9), 1),
+        'queries_max': max(queries) if queries else None,
+        'queries_mean': (
+            round(sum(queries) / len(queries), 2) if queries else None
+        ),
+    }
+    for percentile in PERCENTILES:
+        summary[f'p{percentile}_ms'] = round(
+            get_percentile(latencies, percentile), 3
+        )
+    return summary
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: Optional[float]
+) -> List[str]:
+    """
+    Сравнение результатов с базовыми: рост максимального количества
+    SQL-запросов, новые ошибки и, если задан tolerance, рост p90 больше
+    чем в 1 + tolerance раз считаются регрессией.
+    :param results: Результаты текущего запуска.
+    :param baseline: Базовые результаты.
+    :param tolerance: Допустимый относительный рост p90 или None.
+    :return: Описания регрессий.
+    """
+
+    regressions = []
+    for name, base in baseline['scenarios'].items():
+        current = results['scenarios'].get(name)
+        if current is None:
+            continue
+        if (current['queries_max'] or 0) > (base['queries_max'] or 0):
+            regressions.append(
+                f'{name}: SQL-запросов {current["queries_max"]}, '
+                f'базовое значение {base["queries_max"]}'
+            )
+        if current['errors'] > base['errors']:
+            regressions.append(
+                f'{name}: ошибок {current["errors"]}, '
+                f'базовое значение {base["errors"]}'
+            )
+        if tolerance is not None and current['p90_ms'] > base['p90_ms'] * (
+            1 + tolerance
+        ):
+            regressions.append(
+                f'{name}: p90 {current["p90_ms"]} мс, '
+                f'базовое значение {base["p90_ms"]} мс'
+            )
+    return regressions
+
+
+def format_table(results: Dict[str, dict]) -> str:
+    columns = ('requests', 'errors', 'p50_ms', 'p90_ms', 'p99_ms')
+    columns += ('throughput_rps', 'queries_max')
+    width = max(map(len, ['scenario', *results])) + 2
+    lines = [
+        'scenario'.ljust(width)
+        + ''.join(f'{column:>15}' for column in columns)
+    ]
+    for name, summary in results.items():
+        lines.append(
+            name.ljust(width)
+            + ''.join(f'{str(summary[column]):>15}' for column in columns)
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,150 @@
+import random
+from typing import Callable, List, Optional
+
+from django.contrib.auth.tokens import default_token_generator
+from django.db.models import Count
+
+from api.authentication import get_access_token
+from reviews.models import Genre, Review, Title, User
+
+API = '/api/v1'
+BENCH_PREFIX = 'bench_'
+
+
+class Scenario:
+    """
+    Сценарий нагрузки: эндпоинт и функция, которая строит параметры
+    очередного запроса (путь, тело и токен) по номеру запроса.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        build: Callable[[int], dict],
+    ) -> None:
+        self.name = name
+        self.method = method
+        self.build = build
+
+
+class Context:
+    """
+    Данные БД для построения запросов: популярные произведения и их
+    отзывы, слаги жанров, пользователи для отзывов и регистрации.
+    Пользователи с именами bench_* создаются при подготовке и удаляются
+    в cleanup вместе с их отзывами.
+    """
+
+    def __init__(self, requests: int, seed: int = 1) -> None:
+        self.random = random.Random(seed)
+        titles = list(
+            Title.objects.order_by('-rating_count', 'id').values_list(
+                'id', flat=True
+            )[:50]
+        )
+        if not titles:
+            raise ValueError('Нет произведений, запустите generate_data')
+        self.titles = titles
+        self.title_pages = max(Title.objects.count() // 20, 1)
+        self.reviews = list(
+            Review.objects.filter(title_id__in=titles)
+            .annotate(comment_count=Count('comments'))
+            .order_by('-comment_count', 'id')
+            .values_list('title_id', 'id')[:50]
+        )
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.cleanup()
+        authors = User.objects.bulk_create(
+            User(
+                username=f'{BENCH_PREFIX}author{index}',
+                email=f'{BENCH_PREFIX}author{index}@yamdb.fake',
+            )
+            for index in range(requests)
+        )
+        self.author_tokens = [
+            get_access_token(author)
+            for author in User.objects.filter(
+                username__in=[author.username for author in authors]
+            ).order_by('id')
+        ]
+
+    @staticmethod
+    def cleanup() -> None:
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+
+    def get_confirmation_code(self, username: str) -> Optional[str]:
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            return None
+        return default_token_generator.make_token(user)
+
+
+def get_scenarios(context: Context) -> List[Scenario]:
+    """
+    Сценарии основных эндпоинтов API.
+    :param context: Данные для построения запросов.
+    :return: Список сценариев в порядке запуска.
+    """
+
+    rand = context.random
+
+    def titles_list(index: int) -> dict:
+        page = rand.randint(1, context.title_pages)
+        return {'path': f'{API}/titles/?page={page}'}
+
+    def titles_filtered(index: int) -> dict:
+        genre = rand.choice(context.genres) if context.genres else ''
+        year = rand.randint(1950, 2020)
+        return {
+            'path': (
+                f'{API}/titles/?genre={genre}&year_min={year}'
+                f'&ordering=-rating'
+            )
+        }
+
+    def reviews_list(index: int) -> dict:
+        title_id = rand.choice(context.titles)
+        return {'path': f'{API}/titles/{title_id}/reviews/'}
+
+    def comments_list(index: int) -> dict:
+        title_id, review_id = rand.choice(context.reviews)
+        return {
+            'path': (f'{API}/titles/{title_id}/reviews/{review_id}/comments/')
+        }
+
+    def review_create(index: int) -> dict:
+        return {
+            'path': f'{API}/titles/{rand.choice(context.titles)}/reviews/',
+            'data': {'text': 'Отзыв нагрузочного теста', 'score': 7},
+            'token': context.author_tokens[index],
+        }
+
+    def signup(index: int) -> dict:
+        username = f'{BENCH_PREFIX}signup{index}'
+        return {
+            'path': f'{API}/auth/signup/',
+            'data': {'username': username, 'email': f'{username}@ya.ru'},
+        }
+
+    def token(index: int) -> dict:
+        username = f'{BENCH_PREFIX}signup{index}'
+        return {
+            'path': f'{API}/auth/token/',
+            'data': {
+                'username': username,
+                'confirmation_code': context.get_confirmation_code(username),
+            },
+        }
+
+    scenarios = [
+        Scenario('titles_list', 'get', titles_list),
+        Scenario('titles_filtered', 'get', titles_filtered),
+        Scenario('reviews_list', 'get', reviews_list),
+        Scenario('review_create', 'post', review_create),
+        Scenario('signup', 'post', signup),
+        Scenario('token', 'post', token),
+    ]
+    if context.reviews:
+        scenarios.insert(3, Scenario('comments_list', 'get', comments_list))
+    return scenarios
@@ -1,9 +1,54 @@
+import os
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """
+    Тесты с БД запускаются на SQLite, если движок явно не задан через
+    переменную окружения DB_ENGINE (например, внутри контейнера web).
+    """
+
+    from django.db import connections
+
+    if not os.getenv('DB_ENGINE'):
+        connections.databases = {
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:',
+            },
+        }
+        try:
+            del connections['default']
+        except AttributeError:
+            pass
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Кэш в памяти процесса переживает откат транзакций между тестами.
+    """
+
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+@pytest.fixture
+def api_cache(settings):
+    """
+    Кэш ответов API (по умолчанию выключен с кэшем в памяти процесса).
+    """
+
+    settings.API_CACHE_ENABLED = True
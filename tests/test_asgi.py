@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+
+from api.asgi import ASGIHandler, get_environ
+from api.authentication import get_access_token
+from api_yamdb.asgi import application
+from reviews.models import ADMIN, Category, Title, User
+
+
+def call(method, path, body=(b'',), headers=()):
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': b'',
+        'headers': [
+            (name.encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers
+        ],
+    }
+    inbound = [
+        {
+            'type': 'http.request',
+            'body': chunk,
+            'more_body': index < len(body) - 1,
+        }
+        for index, chunk in enumerate(body)
+    ]
+    sent = []
+
+    async def receive():
+        return inbound.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    return sent
+
+
+@pytest.mark.django_db(transaction=True)
+class TestASGI:
+
+    def test_get(self):
+        Category.objects.create(name='Фильмы', slug='films')
+        start, body = call('GET', '/api/v1/categories/')
+        assert start['status'] == 200, (
+            'Проверьте, что ASGI-приложение обрабатывает запросы Django'
+        )
+        assert b'server-timing' in dict(start['headers'])
+        assert json.loads(body['body'])['results'][0]['slug'] == 'films'
+
+    def test_post_body_in_chunks(self):
+        data = json.dumps({'username': 'asgi', 'email': 'asgi@ya.ru'})
+        data = data.encode()
+        start, _ = call(
+            'POST',
+            '/api/v1/auth/signup/',
+            body=(data[:10], data[10:]),
+            headers=(('content-type', 'application/json'),),
+        )
+        assert start['status'] == 200, (
+            'Проверьте, что тело запроса собирается из нескольких сообщений'
+        )
+        assert User.objects.filter(username='asgi').exists()
+
+    def test_streaming_response(self):
+        Title.objects.bulk_create(
+            Title(name=f'Фильм {index}', year=2000) for index in range(3)
+        )
+        admin = User.objects.create(
+            username='asgi_admin', email='asgi_admin@ya.ru', role=ADMIN
+        )
+        messages = call(
+            'GET',
+            '/api/v1/export/titles/',
+            headers=(
+                ('authorization', f'Bearer {get_access_token(admin)}'),
+            ),
+        )
+        assert messages[0]['status'] == 200
+        body = b''.join(message.get('body', b'') for message in messages)
+        assert body.decode().count('\n') == 4, (
+            'Проверьте, что потоковый ответ отправляется целиком'
+        )
+        assert messages[-1].get('more_body', False) is False
+
+    def test_executors(self):
+        for method, path, name in (
+            ('GET', '/api/v1/titles/1/reviews/', 'catalogue'),
+            ('GET', '/api/v1/genres/', 'catalogue'),
+            ('POST', '/api/v1/titles/1/reviews/', 'default'),
+            ('POST', '/api/v1/auth/token/', 'default'),
+            ('GET', '/api/v1/users/me/', 'default'),
+        ):
+            assert (
+                ASGIHandler.get_executor_name(
+                    {'method': method, 'path': path}
+                )
+                == name
+            ), f'Проверьте выбор пула потоков для {method} {path}'
+
+    def test_repeated_headers(self):
+        environ = get_environ(
+            {
+                'method': 'GET',
+                'path': '/api/v1/titles/',
+                'headers': [
+                    (b'cookie', b'use_primary=1'),
+                    (b'cookie', b'csrftoken=token'),
+                    (b'accept', b'text/html'),
+                    (b'accept', b'application/json'),
+                ],
+            },
+            b'',
+        )
+        assert environ['HTTP_COOKIE'] == 'use_primary=1; csrftoken=token', (
+            'Проверьте, что заголовки Cookie объединяются через "; "'
+        )
+        assert environ['HTTP_ACCEPT'] == 'text/html,application/json'
@@ -0,0 +1,118 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import StatelessJWTAuthentication, get_access_token
+from reviews.models import ADMIN, USER, Review, Title, User
+
+
+def auth_header(user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {get_access_token(user)}'}
+
+
+def user_queries(queries):
+    return [
+        query['sql'] for query in queries if 'reviews_user' in query['sql']
+    ]
+
+
+@pytest.fixture
+def stateless_auth(monkeypatch):
+    # Классы аутентификации копируются в APIView при импорте DRF,
+    # поэтому переопределения настройки REST_FRAMEWORK недостаточно.
+    monkeypatch.setattr(
+        APIView, 'authentication_classes', [StatelessJWTAuthentication]
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('stateless_auth')
+class TestStatelessAuthentication:
+
+    def test_token_claims(self):
+        user = User.objects.create(
+            username='admin', email='admin@ya.ru', role=ADMIN
+        )
+        token = AccessToken(str(get_access_token(user)))
+
+        assert (token['username'], token['role'], token['is_superuser']) == (
+            'admin', ADMIN, False
+        ), 'Проверьте, что токен содержит имя, роль и is_superuser'
+
+    def test_no_user_query_per_request(self, client):
+        user = User.objects.create(
+            username='admin', email='admin@ya.ru', role=ADMIN
+        )
+        headers = auth_header(user)
+        client.post(
+            '/api/v1/categories/',
+            data={'name': 'Фильм', 'slug': 'movie'},
+            **headers,
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                '/api/v1/categories/',
+                data={'name': 'Книга', 'slug': 'book'},
+                **headers,
+            )
+        assert response.status_code == 201
+        assert not user_queries(context.captured_queries), (
+            'Проверьте, что аутентификация не загружает пользователя из БД '
+            'на каждый запрос'
+        )
+
+    def test_role_change_applies(self, client):
+        user = User.objects.create(
+            username='admin', email='admin@ya.ru', role=ADMIN
+        )
+        headers = auth_header(user)
+        response = client.get('/api/v1/users/', **headers)
+        assert response.status_code == 200
+
+        user.role = USER
+        user.save()
+        response = client.get('/api/v1/users/', **headers)
+        assert response.status_code == 403, (
+            'Проверьте, что смена роли применяется к выданным токенам'
+        )
+
+        user.delete()
+        response = client.get('/api/v1/users/', **headers)
+        assert response.status_code == 401, (
+            'Проверьте, что токен удаленного пользователя не принимается'
+        )
+
+    def test_author_and_profile(self, client):
+        user = User.objects.create(
+            username='user', email='user@ya.ru', bio='Биография'
+        )
+        title = Title.objects.create(name='Фильм', year=2000)
+        headers = auth_header(user)
+
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Текст', 'score': 7},
+            **headers,
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == 'user'
+        review = Review.objects.get()
+        assert review.author_id == user.id
+
+        response = client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            data={'text': 'Новый текст'},
+            content_type='application/json',
+            **headers,
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что автор может изменить свой отзыв'
+        )
+
+        response = client.get('/api/v1/users/me/', **headers)
+        assert response.json()['bio'] == 'Биография', (
+            'Проверьте, что users/me возвращает полную модель пользователя'
+        )
@@ -0,0 +1,103 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from benchmarks.harness import DjangoTestClient, compare, run_scenario
+from benchmarks.scenarios import Context, get_scenarios
+from reviews.models import Comment, Review, Title, User
+
+COUNTS = {
+    'users': 30,
+    'categories': 2,
+    'genres': 4,
+    'titles': 20,
+    'reviews': 120,
+    'comments': 50,
+}
+
+
+def generate(**options):
+    call_command(
+        'generate_data', stdout=StringIO(), **dict(COUNTS, **options)
+    )
+
+
+@pytest.mark.django_db
+class TestBenchmarks:
+
+    def test_generate_data(self):
+        generate(seed=7)
+        assert (
+            User.objects.count(),
+            Title.objects.count(),
+            Review.objects.count(),
+            Comment.objects.count(),
+        ) == (30, 20, 120, 50), 'Проверьте количество созданных записей'
+        reviews = list(
+            Review.objects.order_by('id').values_list(
+                'title__name', 'author__username', 'score'
+            )
+        )
+        counts = sorted(
+            Title.objects.values_list('rating_count', flat=True),
+            reverse=True,
+        )
+        assert counts[0] >= 3 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределены неравномерно (закон Ципфа)'
+        )
+        assert sum(counts) == 120, 'Проверьте, что рейтинги пересчитаны'
+
+        generate(seed=7, clear=True)
+        assert (
+            list(
+                Review.objects.order_by('id').values_list(
+                    'title__name', 'author__username', 'score'
+                )
+            )
+            == reviews
+        ), 'Проверьте, что данные воспроизводятся при одинаковом --seed'
+
+    def test_harness(self):
+        generate()
+        context = Context(requests=3)
+        client = DjangoTestClient()
+        results = {
+            scenario.name: run_scenario(client, scenario, 3)
+            for scenario in get_scenarios(context)
+        }
+        context.cleanup()
+
+        assert set(results) == {
+            'titles_list',
+            'titles_filtered',
+            'reviews_list',
+            'comments_list',
+            'review_create',
+            'signup',
+            'token',
+        }
+        for name, summary in results.items():
+            assert summary['errors'] == 0, (
+                f'Проверьте, что сценарий {name} выполняется без ошибок'
+            )
+            assert summary['queries_max'] is not None
+            assert summary['p50_ms'] <= summary['p99_ms']
+        assert not User.objects.filter(username__startswith='bench_').exists()
+
+        baseline = {'scenarios': results}
+        current = {
+            'scenarios': dict(
+                results,
+                titles_list=dict(
+                    results['titles_list'],
+                    queries_max=results['titles_list']['queries_max'] + 1,
+                ),
+            )
+        }
+        assert compare(current, baseline, None) == [
+            'titles_list: SQL-запросов {}, базовое значение {}'.format(
+                results['titles_list']['queries_max'] + 1,
+                results['titles_list']['queries_max'],
+            )
+        ], 'Проверьте, что рост количества SQL-запросов считается регрессией'
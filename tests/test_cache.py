@@ -0,0 +1,71 @@
+import pytest
+
+from reviews.models import Category, Genre, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('api_cache')
+class TestResponseCache:
+
+    def test_titles_cache_and_invalidation(
+        self, client, django_assert_num_queries
+    ):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title = Title.objects.create(name='Фильм', year=2000, category=category)
+        client.get('/api/v1/titles/')
+
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['rating'] is None
+
+        author = User.objects.create(username='user', email='user@ya.ru')
+        Review.objects.create(title=title, author=author, text='Тест', score=7)
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['rating'] == 7, (
+            'Проверьте, что новый отзыв инвалидирует кэш произведений'
+        )
+
+        category.name = 'Кино'
+        category.save()
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['category']['name'] == 'Кино', (
+            'Проверьте, что изменение категории инвалидирует кэш произведений'
+        )
+
+        title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert len(response.json()['genre']) == 1, (
+            'Проверьте, что изменение жанров инвалидирует кэш произведений'
+        )
+
+    def test_etag(self, client, django_assert_num_queries):
+        Genre.objects.create(name='Драма', slug='drama')
+        response = client.get('/api/v1/genres/')
+        etag = response['ETag']
+
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/genres/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается статус 304'
+        )
+
+        Genre.objects.create(name='Комедия', slug='comedy')
+        response = client.get('/api/v1/genres/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения жанров ETag меняется'
+        )
+
+
+@pytest.mark.django_db
+class TestResponseCacheDisabled:
+
+    def test_locmem_disabled_by_default(self, client, settings):
+        assert settings.API_CACHE_ENABLED is False, (
+            'Проверьте, что с кэшем в памяти процесса кэширование ответов '
+            'по умолчанию выключено'
+        )
+        Genre.objects.create(name='Драма', slug='drama')
+        client.get('/api/v1/genres/')
+        Genre.objects.filter(slug='drama').update(name='Комедия')
+        response = client.get('/api/v1/genres/')
+        assert response.json()['results'][0]['name'] == 'Комедия'
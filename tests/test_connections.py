@@ -0,0 +1,53 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+
+from api.connections import connection_metrics
+from api_yamdb import settings
+
+
+@pytest.fixture
+def health_checks():
+    connection_metrics.reset()
+    with mock.patch.dict(connection.settings_dict, CONN_HEALTH_CHECKS=True):
+        yield
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConnections:
+
+    def test_settings(self):
+        database = settings.DATABASES['default']
+        assert database['CONN_MAX_AGE'] > 0, (
+            'Проверьте, что соединения с БД по умолчанию постоянные'
+        )
+        assert database['CONN_HEALTH_CHECKS'] is True
+        assert database['DISABLE_SERVER_SIDE_CURSORS'] is False
+
+    def test_unusable_connection_closed(self, client, health_checks):
+        connection.ensure_connection()
+        with mock.patch.object(
+            connection, 'is_usable', return_value=False
+        ), mock.patch.object(connection, 'close') as close:
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert close.called, (
+            'Проверьте, что неработающее соединение закрывается перед '
+            'запросом'
+        )
+        assert connection_metrics.snapshot()['unusable'] == 1
+
+        text = client.get('/metrics').content.decode()
+        assert 'yamdb_db_connections_unusable_total 1' in text, (
+            'Проверьте, что /metrics содержит счетчик закрытых соединений'
+        )
+
+    def test_usable_connection_kept(self, client, health_checks):
+        connection.ensure_connection()
+        with mock.patch.object(
+            connection, 'is_usable', return_value=True
+        ) as is_usable:
+            client.get('/api/v1/categories/')
+        assert is_usable.called
+        assert connection_metrics.snapshot()['unusable'] == 0
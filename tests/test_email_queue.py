@@ -0,0 +1,89 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+
+from api import email as email_module
+from api.models import FAILED, PENDING, SENT, ConfirmationEmail
+from reviews.models import User
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+SIGNUP_DATA = {'username': 'user', 'email': 'user@ya.ru'}
+
+
+@pytest.mark.django_db
+class TestEmailQueue:
+
+    def test_signup_enqueues_email(self, client):
+        response = client.post(SIGNUP_URL, data=SIGNUP_DATA)
+
+        assert response.status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что регистрация не отправляет письмо синхронно'
+        )
+        email = ConfirmationEmail.objects.get()
+        assert email.status == PENDING
+
+        call_command('send_emails', once=True, stdout=StringIO())
+
+        email.refresh_from_db()
+        assert email.status == SENT, (
+            'Проверьте, что send_emails отправляет письма из очереди'
+        )
+        assert len(mail.outbox) == 1
+        user = User.objects.get(username='user')
+        code = mail.outbox[0].body.split('<strong>')[1].split('</strong>')[0]
+        assert default_token_generator.check_token(user, code), (
+            'Проверьте, что письмо содержит действующий код подтверждения'
+        )
+
+    def test_retry_with_backoff(self, client, settings, monkeypatch):
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 2
+
+        def fail(backend, messages):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(locmem.EmailBackend, 'send_messages', fail)
+        client.post(SIGNUP_URL, data=SIGNUP_DATA)
+
+        call_command('send_emails', once=True, stdout=StringIO())
+        email = ConfirmationEmail.objects.get()
+        assert (email.status, email.attempts) == (PENDING, 1), (
+            'Проверьте, что письмо с ошибкой остается в очереди'
+        )
+
+        ConfirmationEmail.objects.update(next_attempt_at=email.created)
+        call_command('send_emails', once=True, stdout=StringIO())
+        email.refresh_from_db()
+        assert email.status == FAILED, (
+            'Проверьте, что после EMAIL_QUEUE_MAX_ATTEMPTS попыток '
+            'письмо помечается ошибочным'
+        )
+
+    def test_batch_uses_one_connection(self, client, monkeypatch):
+        connections = []
+
+        def get_connection():
+            connections.append(locmem.EmailBackend())
+            return connections[-1]
+
+        monkeypatch.setattr(email_module, 'get_connection', get_connection)
+        email_module.email_metrics.reset()
+        for number in range(3):
+            client.post(
+                SIGNUP_URL,
+                data={'username': f'user{number}', 'email': f'{number}@ya.ru'},
+            )
+
+        call_command('send_emails', once=True, threads=1, stdout=StringIO())
+
+        assert len(mail.outbox) == 3
+        assert len(connections) == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        assert email_module.email_metrics.snapshot()['sent'] == 3, (
+            'Проверьте, что отправленные письма учитываются в метриках'
+        )
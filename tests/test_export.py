@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.authentication import get_access_token
+from reviews.models import (
+    ADMIN,
+    USER,
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    User,
+)
+
+
+def get_headers(role):
+    user = User.objects.create(
+        username=f'export_{role}', email=f'export_{role}@ya.ru', role=role
+    )
+    return {'HTTP_AUTHORIZATION': f'Bearer {get_access_token(user)}'}
+
+
+@pytest.fixture
+def loaded_data():
+    call_command('load_csv', stdout=StringIO())
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('loaded_data')
+class TestExport:
+
+    def test_dump_csv_roundtrip(self, tmp_path):
+        reviews = list(Review.objects.values_list('id', 'text', 'pub_date'))
+        titles = list(
+            Title.objects.values_list('id', 'name', 'category_id', 'rating')
+        )
+        User.objects.create_superuser(
+            username='root', email='root@ya.ru', password='password'
+        )
+        User.objects.filter(pk=1).update(is_active=False)
+        users = list(
+            User.objects.values_list(
+                'id', 'role', 'is_staff', 'is_superuser', 'is_active'
+            )
+        )
+        call_command('dump_csv', str(tmp_path / 'dump'), stdout=StringIO())
+
+        for model in (Comment, Review, Title, Genre, Category, User):
+            model.objects.all().delete()
+        call_command(
+            'load_csv',
+            path=str(tmp_path / 'dump'),
+            reset=True,
+            stdout=StringIO(),
+        )
+        assert (
+            list(Review.objects.values_list('id', 'text', 'pub_date'))
+            == reviews
+        ), 'Проверьте, что load_csv загружает файлы dump_csv без искажений'
+        assert (
+            list(
+                Title.objects.values_list(
+                    'id', 'name', 'category_id', 'rating'
+                )
+            )
+            == titles
+        )
+        assert (
+            list(
+                User.objects.values_list(
+                    'id', 'role', 'is_staff', 'is_superuser', 'is_active'
+                )
+            )
+            == users
+        ), 'Проверьте, что dump_csv выгружает права и статус пользователей'
+
+    def test_export_endpoint(self, client):
+        headers = get_headers(ADMIN)
+        response = client.get('/api/v1/export/reviews/', **headers)
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдается StreamingHttpResponse'
+        )
+        assert response['Content-Type'] == 'text/csv'
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == Review.objects.count()
+        assert rows[0]['text'] == Review.objects.get(pk=1).text
+
+        response = client.get(
+            '/api/v1/export/titles/?output=ndjson', **headers
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == Title.objects.count()
+        assert set(json.loads(lines[0])) == {
+            'id',
+            'name',
+            'year',
+            'description',
+            'category_id',
+        }, 'Проверьте выгрузку в NDJSON'
+
+        response = client.get('/api/v1/export/titles/?output=xml', **headers)
+        assert response.status_code == 400
+        response = client.get('/api/v1/export/users/', **headers)
+        assert response.status_code == 404
+        response = client.get(
+            '/api/v1/export/titles/', **get_headers(USER)
+        )
+        assert response.status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору'
+        )
@@ -0,0 +1,62 @@
+import os
+import runpy
+from unittest import mock
+
+import pytest
+
+from .conftest import root_dir
+
+CONFIG_PATH = os.path.join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+
+
+def load_config(**env):
+    with mock.patch.dict(os.environ, env):
+        return runpy.run_path(CONFIG_PATH)
+
+
+class TestGunicornConfig:
+
+    def test_settings(self):
+        config = load_config(
+            GUNICORN_WORKER_CLASS='gthread',
+            GUNICORN_WORKERS='3',
+            GUNICORN_THREADS='8',
+        )
+        assert (
+            config['worker_class'],
+            config['workers'],
+            config['threads'],
+        ) == ('gthread', 3, 8), (
+            'Проверьте, что тип воркеров, количество воркеров и потоков '
+            'задаются переменными окружения'
+        )
+        assert config['preload_app'] is True, (
+            'Проверьте, что по умолчанию включен preload_app'
+        )
+        assert 0 < config['max_requests_jitter'] < config['max_requests']
+
+        assert (
+            load_config(GUNICORN_WORKER_CLASS='uvicorn')['worker_class']
+            == 'uvicorn.workers.UvicornWorker'
+        ), 'Проверьте, что режим uvicorn запускает ASGI-воркеры'
+        with pytest.raises(ValueError):
+            load_config(GUNICORN_WORKER_CLASS='eventlet')
+
+        with open(
+            os.path.join(root_dir, 'api_yamdb', 'Dockerfile'), 'r'
+        ) as file:
+            assert 'gunicorn.conf.py' in file.read(), (
+                'Проверьте, что gunicorn в Dockerfile запускается с '
+                'gunicorn.conf.py'
+            )
+
+    @pytest.mark.django_db
+    def test_post_fork_closes_connections(self):
+        from django.db import connection
+
+        connection.ensure_connection()
+        with mock.patch.object(connection, 'close') as close:
+            load_config()['post_fork'](None, None)
+        assert close.called, (
+            'Проверьте, что после fork воркер закрывает соединения с БД'
+        )
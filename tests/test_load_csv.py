@@ -0,0 +1,93 @@
+import csv
+import os
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.management.commands.load_csv import Checkpoint
+from reviews.models import Comment, LoadCheckpoint, Review, Title, User
+
+DATA_PATH = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def count_rows(file_name):
+    with open(os.path.join(DATA_PATH, file_name), encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+@pytest.mark.django_db
+class TestLoadCsv:
+
+    def test_load_csv(self):
+        call_command('load_csv', stdout=StringIO())
+
+        for model, file_name in (
+            (User, 'users.csv'),
+            (Title, 'titles.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        ):
+            assert model.objects.count() == count_rows(file_name), (
+                f'Проверьте, что load_csv загружает все строки {file_name}'
+            )
+        assert not Title.objects.filter(
+            reviews__isnull=False, rating__isnull=True
+        ).exists(), 'Проверьте, что после загрузки пересчитаны рейтинги'
+        assert '\n' in Review.objects.get(pk=1).text, (
+            'Проверьте, что многострочный текст загружается без искажений'
+        )
+
+    @pytest.mark.usefixtures('api_cache')
+    def test_invalidates_api_cache(self, client):
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        assert client.get('/api/v1/titles/top/').json() == []
+
+        call_command('load_csv', stdout=StringIO())
+        assert client.get('/api/v1/titles/').json()['count'] == (
+            count_rows('titles.csv')
+        ), 'Проверьте, что загрузка сбрасывает кэш ответов API'
+        assert client.get('/api/v1/titles/top/').json(), (
+            'Проверьте, что после загрузки пересчитываются рейтинги '
+            'лучших произведений'
+        )
+
+    def test_resume_from_checkpoint(self):
+        call_command('load_csv', chunk_size=7, stdout=StringIO())
+        output = StringIO()
+        call_command('load_csv', stdout=output)
+
+        assert 'Ошибка' not in output.getvalue(), (
+            'Проверьте, что повторный запуск продолжает загрузку '
+            'с контрольной точки'
+        )
+        assert Review.objects.count() == count_rows('review.csv')
+
+    def test_checkpoint_in_chunk_transaction(self):
+        save = Checkpoint.save
+        calls = []
+
+        def failing_save(checkpoint, rows, done=False):
+            if checkpoint.table == Review._meta.db_table:
+                calls.append(rows)
+                if len(calls) > 3:
+                    raise RuntimeError('Сбой загрузки')
+            save(checkpoint, rows, done)
+
+        with mock.patch.object(Checkpoint, 'save', failing_save):
+            with pytest.raises(RuntimeError):
+                call_command('load_csv', chunk_size=7, stdout=StringIO())
+        checkpoint = LoadCheckpoint.objects.get(table=Review._meta.db_table)
+        assert Review.objects.count() == checkpoint.rows, (
+            'Проверьте, что контрольная точка сохраняется в транзакции '
+            'части строк'
+        )
+
+        output = StringIO()
+        call_command('load_csv', stdout=output)
+        assert 'Ошибка' not in output.getvalue(), (
+            'Проверьте, что загрузка продолжается после сбоя'
+        )
+        assert Review.objects.count() == count_rows('review.csv')
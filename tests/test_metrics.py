@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+from api.email import email_metrics
+from api.metrics import (
+    ProcessMetricsWriter,
+    collect_metrics,
+    request_metrics,
+)
+from reviews.models import Title
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    request_metrics.reset()
+    email_metrics.reset()
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_server_timing(self, client):
+        Title.objects.create(name='Фильм', year=2000)
+        response = client.get('/api/v1/titles/')
+        server_timing = response['Server-Timing']
+        for metric in (
+            'total;dur=',
+            'db;dur=',
+            'serialize;dur=',
+            'render;dur=',
+        ):
+            assert metric in server_timing, (
+                f'Проверьте, что заголовок Server-Timing содержит {metric}'
+            )
+
+    def test_metrics_endpoint(self, client):
+        Title.objects.create(name='Фильм', year=2000)
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/100/')
+        email_metrics.record(sent=3, failed=1, connections=1, duration=0.5)
+
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        for line in (
+            'yamdb_request_duration_seconds_count'
+            '{view="TitleModelViewSet.list"} 2',
+            'yamdb_responses_total'
+            '{view="TitleModelViewSet.retrieve",status="404"} 1',
+            'yamdb_sql_queries_bucket'
+            '{view="TitleModelViewSet.list",le="+Inf"} 2',
+            'yamdb_emails_sent_total 3',
+            '# TYPE yamdb_response_size_bytes histogram',
+            'yamdb_serialization_duration_seconds_count'
+            '{view="TitleModelViewSet.list"} 2',
+        ):
+            assert line in text, f'Проверьте, что /metrics содержит {line}'
+
+    def test_metrics_dir(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        client.get('/api/v1/titles/')
+        # Метрики другого воркера и завершившегося процесса.
+        with open(tmp_path / '1.json', 'w', encoding='utf-8') as file:
+            json.dump(collect_metrics(), file)
+        ProcessMetricsWriter().archive()
+        request_metrics.reset()
+        client.get('/api/v1/titles/')
+        ProcessMetricsWriter().save()
+        assert os.path.exists(tmp_path / f'{os.getpid()}.json')
+
+        text = client.get('/metrics').content.decode()
+        line = (
+            'yamdb_request_duration_seconds_count'
+            '{view="TitleModelViewSet.list"} 3'
+        )
+        assert line in text, (
+            'Проверьте, что /metrics суммирует метрики процессов из '
+            'METRICS_DIR'
+        )
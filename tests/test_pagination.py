@@ -0,0 +1,100 @@
+import pytest
+
+from reviews.models import Comment, Review, Title, User
+
+
+def collect_pages(client, url, direction='next'):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET {url} возвращает статус 200'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что keyset-пагинация не считает COUNT(*)'
+        )
+        page = [item['id'] for item in data['results']]
+        ids = page + ids if direction == 'previous' else ids + page
+        url = data[direction]
+    return ids, data
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_titles_cursor(self, client):
+        for index in range(45):
+            Title.objects.create(name=f'Фильм {index}', year=2000 + index % 3)
+        expected = list(
+            Title.objects.order_by('year', 'id').values_list('id', flat=True)
+        )
+
+        ids, last_page = collect_pages(client, '/api/v1/titles/?cursor=')
+        assert ids == expected, (
+            'Проверьте, что keyset-пагинация произведений обходит все '
+            'записи в порядке (year, id)'
+        )
+
+        ids, _ = collect_pages(client, last_page['previous'], 'previous')
+        assert ids + [item['id'] for item in last_page['results']] == (
+            expected
+        ), 'Проверьте ссылки previous keyset-пагинации'
+
+        response = client.get('/api/v1/titles/?page=2')
+        assert response.json()['count'] == 45, (
+            'Проверьте, что пагинация по номеру страницы сохранена'
+        )
+
+    def test_reviews_cursor(self, client):
+        title = Title.objects.create(name='Фильм', year=2000)
+        for index in range(25):
+            author = User.objects.create(
+                username=f'user{index}', email=f'{index}@ya.ru'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+        expected = list(
+            Review.objects.order_by('-pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+
+        ids, _ = collect_pages(
+            client, f'/api/v1/titles/{title.id}/reviews/?cursor='
+        )
+        assert ids == expected, (
+            'Проверьте, что keyset-пагинация отзывов обходит все записи '
+            'в порядке (-pub_date, id)'
+        )
+
+    def test_comments_cursor(self, client):
+        title = Title.objects.create(name='Фильм', year=2000)
+        author = User.objects.create(username='user', email='user@ya.ru')
+        review = Review.objects.create(
+            title=title, author=author, text='Текст', score=5
+        )
+        for _ in range(25):
+            Comment.objects.create(review=review, author=author, text='Текст')
+        expected = list(
+            Comment.objects.order_by('-pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+
+        ids, _ = collect_pages(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?cursor=',
+        )
+        assert ids == expected, (
+            'Проверьте, что keyset-пагинация комментариев обходит все '
+            'записи в порядке (-pub_date, id)'
+        )
+
+    def test_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=invalid')
+        assert response.status_code == 404, (
+            'Проверьте, что неверный курсор возвращает статус 404'
+        )
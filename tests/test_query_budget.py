@@ -0,0 +1,74 @@
+import pytest
+from django.core.management import call_command
+
+from api.middleware import QueryBudgetExceeded
+from api.views import TitleModelViewSet
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+@pytest.fixture
+def query_budget(settings):
+    settings.QUERY_BUDGET_ENABLED = True
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture
+def catalogue():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [
+        Genre.objects.create(name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(3)
+    ]
+    authors = [
+        User.objects.create(username=f'user{index}', email=f'{index}@ya.ru')
+        for index in range(5)
+    ]
+    titles = []
+    for index in range(5):
+        title = Title.objects.create(
+            name=f'Фильм {index}', year=2000 + index, category=category
+        )
+        title.genre.set(genres[:2])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Текст', score=5
+        )
+        for author in authors
+    ]
+    for author in authors:
+        Comment.objects.create(review=reviews[0], author=author, text='Текст')
+    return titles[0], reviews[0]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('query_budget')
+class TestQueryBudget:
+
+    def test_endpoints_fit_budget(self, client, catalogue):
+        title, review = catalogue
+        call_command('refresh_rankings', verbosity=0)
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.id}/',
+            '/api/v1/titles/?include=stats',
+            f'/api/v1/titles/{title.id}/?include=stats',
+            f'/api/v1/titles/{title.id}/stats/',
+            '/api/v1/titles/top/?genre=genre-0',
+            '/api/v1/titles/top/?include=stats',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET {url} возвращает статус 200'
+            )
+
+    def test_budget_exceeded(self, client, catalogue, monkeypatch):
+        monkeypatch.setattr(TitleModelViewSet, 'query_budget', {'list': 1})
+        with pytest.raises(QueryBudgetExceeded):
+            client.get('/api/v1/titles/')
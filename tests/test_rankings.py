@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import Category, Genre, Review, Title, TitleRanking, User
+
+
+@pytest.fixture
+def rated_titles(settings):
+    settings.RANKING_PRIOR_WEIGHT = 2
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    authors = [
+        User.objects.create(username=f'user{index}', email=f'{index}@ya.ru')
+        for index in range(4)
+    ]
+    scores = {
+        ('Один отзыв', movie, 2001): [10],
+        ('Много отзывов', movie, 2002): [9, 9, 9, 10],
+        ('Книга', book, 2003): [5, 5],
+    }
+    titles = {}
+    for (name, category, year), title_scores in scores.items():
+        title = Title.objects.create(name=name, year=year, category=category)
+        title.genre.set([drama])
+        for author, score in zip(authors, title_scores):
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=score
+            )
+        titles[name] = title
+    return titles
+
+
+def get_names(response):
+    assert response.status_code == 200
+    return [item['title']['name'] for item in response.json()]
+
+
+@pytest.mark.django_db
+class TestRankings:
+
+    def test_bayesian_top(self, client, rated_titles):
+        call_command('refresh_rankings', stdout=StringIO())
+        assert TitleRanking.objects.count() == 3
+
+        names = get_names(client.get('/api/v1/titles/top/'))
+        assert names == ['Много отзывов', 'Один отзыв', 'Книга'], (
+            'Проверьте, что байесовская оценка ставит произведение с '
+            'одним отзывом ниже произведения с многими высокими оценками'
+        )
+
+        names = get_names(
+            client.get('/api/v1/titles/top/?category=movie&limit=1')
+        )
+        assert names == ['Много отзывов'], (
+            'Проверьте фильтр по категории и параметр limit'
+        )
+        names = get_names(
+            client.get('/api/v1/titles/top/?genre=drama&year_min=2003')
+        )
+        assert names == ['Книга'], 'Проверьте фильтры по жанру и годам'
+
+        response = client.get('/api/v1/titles/top/?limit=1000')
+        assert response.status_code == 400, (
+            'Проверьте, что limit больше 100 не принимается'
+        )
+
+    def test_trending(self, client, rated_titles):
+        old = timezone.now() - timedelta(days=60)
+        Review.objects.exclude(title=rated_titles['Книга']).update(
+            pub_date=old
+        )
+        call_command('refresh_rankings', stdout=StringIO())
+
+        names = get_names(client.get('/api/v1/titles/top/?order=trending'))
+        assert names[0] == 'Книга', (
+            'Проверьте, что популярность считается по недавним отзывам'
+        )
+        assert TitleRanking.objects.get(
+            title=rated_titles['Один отзыв']
+        ).trending == 0
+
+    def test_include_stats(self, client, rated_titles):
+        call_command('refresh_rankings', stdout=StringIO())
+
+        response = client.get('/api/v1/titles/top/?include=stats')
+        assert response.status_code == 200
+        stats = response.json()[0]['title']['stats']
+        assert (stats['count'], stats['histogram']['9']) == (4, 3), (
+            'Проверьте, что /titles/top/?include=stats выводит статистику '
+            'оценок произведений'
+        )
+        response = client.get('/api/v1/titles/top/')
+        assert 'stats' not in response.json()[0]['title'], (
+            'Проверьте, что статистика выводится только с ?include=stats'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.usefixtures('api_cache')
+    def test_refresh_invalidates_cache(self, client, rated_titles):
+        call_command('refresh_rankings', stdout=StringIO())
+        assert len(get_names(client.get('/api/v1/titles/top/'))) == 3
+
+        Title.objects.filter(pk=rated_titles['Книга'].pk).update(
+            rating_count=0
+        )
+        call_command('refresh_rankings', stdout=StringIO())
+        assert len(get_names(client.get('/api/v1/titles/top/'))) == 2, (
+            'Проверьте, что пересчет рейтингов сбрасывает кэш /titles/top/'
+        )
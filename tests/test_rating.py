@@ -0,0 +1,67 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Review, Title, User
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    return Title.objects.create(name='Фильм', year=2000, category=category)
+
+
+@pytest.fixture
+def authors():
+    return [
+        User.objects.create(username=f'user{index}', email=f'{index}@ya.ru')
+        for index in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, authors):
+        for author, score in zip(authors, (10, 6, 5)):
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=score
+            )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (21, 3), (
+            'Проверьте, что создание отзыва обновляет сумму и количество оценок'
+        )
+        assert title.rating == 7, 'Проверьте расчет рейтинга произведения'
+
+        review = Review.objects.get(author=authors[0])
+        review.score = 1
+        review.save()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что изменение оценки обновляет рейтинг'
+        )
+
+        review.delete()
+        authors[1].delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            5, 1, 5
+        ), 'Проверьте, что удаление отзыва (в т.ч. каскадное) обновляет рейтинг'
+
+        authors[2].delete()
+        title.refresh_from_db()
+        assert title.rating is None, (
+            'Проверьте, что рейтинг произведения без отзывов равен None'
+        )
+
+    def test_rebuild_ratings(self, title, authors):
+        Review.objects.create(
+            title=title, author=authors[0], text='Текст', score=8
+        )
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+
+        call_command('rebuild_ratings')
+
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            8, 1, 8
+        ), 'Проверьте, что rebuild_ratings исправляет расхождения'
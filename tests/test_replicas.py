@@ -0,0 +1,94 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import get_access_token
+from api.replicas import ReplicaRouter
+from reviews.models import Category, Title, User
+
+
+@pytest.fixture
+def replica(settings):
+    # Второе подключение к той же тестовой БД, как TEST MIRROR.
+    connections.databases['replica1'] = dict(
+        connections['default'].settings_dict
+    )
+    settings.REPLICA_DATABASES = ['replica1']
+    yield connections['replica1']
+    connections['replica1'].close()
+    del connections.databases['replica1']
+    delattr(connections._connections, 'replica1')
+
+
+def get_headers(username):
+    user = User.objects.create(username=username, email=f'{username}@ya.ru')
+    return {'HTTP_AUTHORIZATION': f'Bearer {get_access_token(user)}'}
+
+
+def count_queries(client, path, **headers):
+    with CaptureQueriesContext(
+        connections['default']
+    ) as primary, CaptureQueriesContext(connections['replica1']) as replica:
+        response = client.get(path, **headers)
+    assert response.status_code == 200
+    return len(primary), len(replica)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicas:
+
+    def test_safe_requests_read_from_replica(self, client, replica):
+        Category.objects.create(name='Фильмы', slug='films')
+        primary, replica_queries = count_queries(client, '/api/v1/categories/')
+        assert (primary, replica_queries) == (0, 2), (
+            'Проверьте, что GET-запросы к каталогу читают из реплики'
+        )
+        _, replica_queries = count_queries(
+            client, '/api/v1/users/me/', **get_headers('me')
+        )
+        assert replica_queries == 0, (
+            'Проверьте, что остальные эндпоинты читают из основной БД'
+        )
+
+    @pytest.mark.usefixtures('api_cache')
+    def test_read_your_writes(self, client, replica):
+        title = Title.objects.create(name='Фильм', year=2000)
+        path = f'/api/v1/titles/{title.id}/reviews/'
+        author = get_headers('author')
+        reader = get_headers('reader')
+
+        response = client.post(
+            path,
+            {'text': 'Отзыв', 'score': 7},
+            content_type='application/json',
+            **author,
+        )
+        assert response.status_code == 201
+        assert response.cookies['use_primary']['max-age'] == 5, (
+            'Проверьте, что после изменения данных выставляется cookie'
+        )
+
+        client.cookies.clear()
+        _, replica_queries = count_queries(client, path, **author)
+        assert replica_queries == 0, (
+            'Проверьте, что автор изменения читает из основной БД'
+        )
+        assert count_queries(client, path, **reader)[1] > 0, (
+            'Проверьте, что другие пользователи читают из реплики'
+        )
+        assert count_queries(client, path, **reader)[1] > 0, (
+            'Проверьте, что ответ, прочитанный из реплики сразу после '
+            'изменения, не сохраняется в кэш'
+        )
+
+        client.cookies['use_primary'] = '1'
+        assert count_queries(client, path, **reader)[1] == 0, (
+            'Проверьте, что cookie закрепляет основную БД'
+        )
+
+    def test_router(self, replica):
+        router = ReplicaRouter()
+        assert router.allow_migrate('replica1', 'reviews') is False
+        assert router.allow_migrate('default', 'reviews') is None
+        assert router.db_for_write(Title) == 'default'
+        assert router.db_for_read(Title) is None
@@ -0,0 +1,153 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import get_access_token
+from reviews.models import ADMIN, Category, Genre, Title, User
+from reviews.slugs import category_slugs, genre_slugs
+
+
+@pytest.fixture(autouse=True)
+def reset_reloads(monkeypatch):
+    monkeypatch.setattr(category_slugs, 'reloaded_at', None)
+    monkeypatch.setattr(genre_slugs, 'reloaded_at', None)
+
+
+@pytest.fixture
+def admin_headers():
+    user = User.objects.create(
+        username='admin', email='admin@ya.ru', role=ADMIN
+    )
+    return {'HTTP_AUTHORIZATION': f'Bearer {get_access_token(user)}'}
+
+
+@pytest.mark.django_db
+class TestSlugCache:
+    def test_create_title_without_slug_lookups(self, client, admin_headers):
+        Category.objects.create(name='Фильм', slug='movie')
+        slugs = [f'genre-{index}' for index in range(5)]
+        for slug in slugs:
+            Genre.objects.create(name=slug, slug=slug)
+        data = {
+            'name': 'Фильм',
+            'year': 2000,
+            'category': 'movie',
+            'genre': slugs,
+        }
+        client.post('/api/v1/titles/', data=data, **admin_headers)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                '/api/v1/titles/', data=data, **admin_headers
+            )
+        assert response.status_code == 201
+        assert response.json()['category'] == {
+            'name': 'Фильм',
+            'slug': 'movie',
+        }
+        assert (
+            sorted(genre['slug'] for genre in response.json()['genre'])
+            == slugs
+        )
+        lookups = [
+            query['sql']
+            for query in context.captured_queries
+            if '"slug" IN' in query['sql'] or '"slug" =' in query['sql']
+        ]
+        assert not lookups, (
+            'Проверьте, что слаги жанров и категории не загружаются из БД '
+            'по одному при создании произведения'
+        )
+
+    def test_invalidation(self, client, admin_headers):
+        Genre.objects.create(name='Драма', slug='drama')
+        assert genre_slugs.get_ids(['drama', 'comedy']) == [
+            Genre.objects.get().id
+        ]
+
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        assert comedy.id in genre_slugs.get_ids(
+            ['comedy']
+        ), 'Проверьте, что новый жанр сбрасывает кэш слагов'
+        title = Title.objects.create(name='Фильм', year=2000)
+        title.genre.set([comedy])
+        response = client.get('/api/v1/titles/?genre=comedy')
+        assert response.json()['count'] == 1
+
+        comedy.slug = 'sitcom'
+        comedy.save()
+        response = client.patch(
+            f'/api/v1/titles/{title.id}/',
+            data={'genre': ['comedy']},
+            content_type='application/json',
+            **admin_headers,
+        )
+        assert (
+            response.status_code == 400
+        ), 'Проверьте, что измененный слаг жанра больше не принимается'
+
+    def test_reload_on_unknown_slug(self, client):
+        Genre.objects.create(name='Драма', slug='drama')
+        genre_slugs.get_slugs()
+        # bulk_create без сигналов, как запись из другого процесса,
+        # версия справочника которого в этом процессе не видна.
+        Genre.objects.bulk_create([Genre(name='Комедия', slug='comedy')])
+        comedy = Genre.objects.get(slug='comedy')
+        title = Title.objects.create(name='Фильм', year=2000)
+        title.genre.set([comedy])
+
+        response = client.get('/api/v1/titles/?genre=comedy')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что неизвестный слаг перечитывает справочник'
+        )
+
+    def test_reload_interval(self, client, settings):
+        settings.SLUG_RELOAD_INTERVAL = 60
+        Genre.objects.create(name='Драма', slug='drama')
+        genre_slugs.get_slugs()
+        client.get('/api/v1/titles/?genre=nope')
+
+        with CaptureQueriesContext(connection) as context:
+            for _ in range(3):
+                client.get('/api/v1/titles/?genre=nope')
+        reloads = [
+            query['sql']
+            for query in context.captured_queries
+            if 'FROM "reviews_genre"' in query['sql']
+        ]
+        assert not reloads, (
+            'Проверьте, что неизвестный слаг перечитывает справочник не '
+            'чаще одного раза за SLUG_RELOAD_INTERVAL'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStaleSlugs:
+    def test_deleted_genre(self, client, admin_headers):
+        Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        genre_slugs.get_slugs()
+        # Удаление без сигналов, как в другом процессе, версия
+        # справочника которого в этом процессе еще не видна.
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_genre')
+        data = {
+            'name': 'Фильм',
+            'year': 2000,
+            'category': 'movie',
+            'genre': ['drama'],
+        }
+        response = client.post('/api/v1/titles/', data=data, **admin_headers)
+        assert response.status_code == 400, (
+            'Проверьте, что запись с удаленным жанром возвращает 400, '
+            'а не ошибку внешнего ключа'
+        )
+        assert not Title.objects.exists(), (
+            'Проверьте, что произведение с удаленным жанром не сохраняется'
+        )
+
+        response = client.post('/api/v1/titles/', data=data, **admin_headers)
+        assert response.status_code == 400
+        assert 'genre' in response.json(), (
+            'Проверьте, что после ошибки справочник жанров перечитывается'
+        )
@@ -0,0 +1,94 @@
+import pytest
+
+from api import throttling
+from api.throttling import AuthIPThrottle, throttle_metrics
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+@pytest.fixture
+def auth_rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'auth_ip': '4/min',
+            'auth_identity': '2/min',
+        },
+    }
+    throttle_metrics.reset()
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+
+    def test_identity_limit(self, client, auth_rates):
+        data = {'username': 'user', 'email': 'user@ya.ru'}
+        for _ in range(2):
+            assert client.post(SIGNUP_URL, data=data).status_code == 200
+
+        response = client.post(SIGNUP_URL, data=data)
+        assert response.status_code == 429, (
+            'Проверьте, что частые запросы регистрации одного пользователя '
+            'ограничиваются'
+        )
+        assert int(response['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 содержит заголовок Retry-After'
+        )
+        assert throttle_metrics.snapshot() == {'auth_identity': 1}, (
+            'Проверьте, что отклоненные запросы учитываются в метриках'
+        )
+
+        response = client.post(
+            '/api/v1/auth/token/',
+            data={'username': 'USER', 'confirmation_code': 'code'},
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что ограничение по имени пользователя действует и '
+            'на получение токена'
+        )
+
+    def test_ip_limit(self, client, auth_rates):
+        for index in range(4):
+            response = client.post(
+                SIGNUP_URL,
+                data={'username': f'user{index}', 'email': f'{index}@ya.ru'},
+            )
+            assert response.status_code == 200
+
+        response = client.post(
+            SIGNUP_URL, data={'username': 'other', 'email': 'other@ya.ru'}
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что частые запросы с одного IP ограничиваются'
+        )
+
+
+class TestSlidingWindow:
+
+    def test_previous_window_weight(self, settings, monkeypatch, rf):
+        settings.THROTTLE_STORE = 'api.throttling.LocalCounterStore'
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'auth_ip': '4/min'},
+        }
+        monkeypatch.setattr(throttling, '_stores', {})
+        request = rf.post(SIGNUP_URL)
+        now = [600.0]
+        monkeypatch.setattr(throttling.time, 'time', lambda: now[0])
+
+        for _ in range(4):
+            assert AuthIPThrottle().allow_request(request, None)
+        throttle = AuthIPThrottle()
+        assert not throttle.allow_request(request, None)
+        assert throttle.wait() == 75
+
+        now[0] = 675.0
+        assert AuthIPThrottle().allow_request(request, None), (
+            'Проверьте, что запросы прошлого окна учитываются с весом '
+            'оставшейся доли окна'
+        )
+        throttle = AuthIPThrottle()
+        assert not throttle.allow_request(request, None), (
+            'Проверьте оценку скользящего окна: 4 * 0.75 + 1 = 4 запроса'
+        )
+        assert throttle.wait() == 15
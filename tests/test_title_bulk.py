@@ -0,0 +1,151 @@
+import json
+
+import pytest
+
+from api.authentication import get_access_token
+from reviews.models import ADMIN, USER, Category, Genre, Title, User
+
+URL = '/api/v1/titles/bulk/'
+
+
+def get_headers(role):
+    user = User.objects.create(
+        username=role, email=f'{role}@ya.ru', role=role
+    )
+    return {'HTTP_AUTHORIZATION': f'Bearer {get_access_token(user)}'}
+
+
+@pytest.fixture
+def catalogue():
+    Category.objects.create(name='Фильм', slug='movie')
+    Category.objects.create(name='Книга', slug='book')
+    for slug in ('drama', 'comedy'):
+        Genre.objects.create(name=slug, slug=slug)
+    title = Title.objects.create(name='Старое название', year=2000)
+    title.genre.set(Genre.objects.all())
+    return title
+
+
+@pytest.mark.django_db
+class TestTitleBulk:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_bulk_create_and_update(self, client, catalogue):
+        headers = get_headers(ADMIN)
+        assert client.get('/api/v1/titles/').json()['count'] == 1
+
+        items = [
+            {
+                'name': 'Новый',
+                'year': 2001,
+                'category': 'movie',
+                'genre': ['drama', 'comedy', 'drama'],
+            },
+            {'id': catalogue.id, 'name': 'Новое название', 'genre': []},
+            {'name': 'Без жанра', 'year': 2002, 'category': 'unknown'},
+            {'id': 10 ** 6, 'name': 'Нет такого'},
+            'не объект',
+        ]
+        response = client.post(
+            URL,
+            data=json.dumps(items),
+            content_type='application/json',
+            **headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data['created'], data['updated'], data['invalid']) == (
+            1,
+            1,
+            3,
+        ), 'Проверьте количество созданных, измененных и ошибочных элементов'
+        statuses = [result['status'] for result in data['results']]
+        assert statuses == [
+            'created',
+            'updated',
+            'invalid',
+            'invalid',
+            'invalid',
+        ], 'Проверьте, что результаты возвращаются по каждому элементу'
+        assert 'category' in data['results'][2]['errors']
+
+        created = Title.objects.get(pk=data['results'][0]['id'])
+        assert created.category.slug == 'movie'
+        assert sorted(created.genre.values_list('slug', flat=True)) == [
+            'comedy',
+            'drama',
+        ], 'Проверьте, что жанры новых произведений сохраняются'
+        catalogue.refresh_from_db()
+        assert catalogue.name == 'Новое название'
+        assert catalogue.year == 2000, (
+            'Проверьте, что изменяются только переданные поля'
+        )
+        assert not catalogue.genre.exists()
+        assert client.get('/api/v1/titles/').json()['count'] == 2, (
+            'Проверьте, что массовая загрузка сбрасывает кэш произведений'
+        )
+
+    def test_bulk_ndjson(self, client, catalogue):
+        headers = get_headers(ADMIN)
+        lines = [
+            {
+                'name': f'Фильм {index}',
+                'year': 2000,
+                'category': 'book',
+                'genre': ['drama'],
+            }
+            for index in range(3)
+        ]
+        body = '\n'.join(json.dumps(line) for line in lines) + '\n\n'
+        response = client.post(
+            URL, data=body, content_type='application/x-ndjson', **headers
+        )
+        assert response.json()['created'] == 3, (
+            'Проверьте, что эндпоинт принимает NDJSON'
+        )
+        assert Title.genre.through.objects.count() == 5
+
+        response = client.post(
+            URL,
+            data=body + '{"name": ',
+            content_type='application/x-ndjson',
+            **headers,
+        )
+        assert response.status_code == 400
+        assert Title.objects.count() == 4
+
+    def test_bulk_permissions(self, client, catalogue):
+        response = client.post(
+            URL,
+            data='[]',
+            content_type='application/json',
+            **get_headers(USER),
+        )
+        assert response.status_code == 403, (
+            'Проверьте, что массовая загрузка доступна только администратору'
+        )
+        response = client.post(
+            URL,
+            data='{}',
+            content_type='application/json',
+            **get_headers(ADMIN),
+        )
+        assert response.status_code == 400
+
+    def test_bulk_bool_id(self, client, catalogue):
+        title, _ = Title.objects.get_or_create(
+            pk=1, defaults={'name': 'Первое', 'year': 2000}
+        )
+        name = title.name
+        response = client.post(
+            URL,
+            data=json.dumps([{'id': True, 'name': 'Переименовано'}]),
+            content_type='application/json',
+            **get_headers(ADMIN),
+        )
+        assert response.status_code == 200
+        assert response.json()['results'][0]['status'] == 'invalid', (
+            'Проверьте, что id=true не принимается за id=1'
+        )
+        title.refresh_from_db()
+        assert title.name == name
@@ -0,0 +1,186 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.views import TitleModelViewSet
+from reviews.filters import TitleFilter
+from reviews.models import Category, Genre, Review, Title, User
+
+
+@pytest.fixture
+def rated_titles():
+    authors = [
+        User.objects.create(username=f'user{index}', email=f'{index}@ya.ru')
+        for index in range(3)
+    ]
+    scores = {
+        ('Без оценок', 2001): [],
+        ('Средний', 2002): [5, 7],
+        ('Лучший', 2003): [9],
+        ('Худший', 2004): [2, 3, 1],
+    }
+    for (name, year), title_scores in scores.items():
+        title = Title.objects.create(name=name, year=year)
+        for author, score in zip(authors, title_scores):
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=score
+            )
+
+
+def get_names(client, query):
+    response = client.get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200, (
+        f'Проверьте, что GET /api/v1/titles/?{query} возвращает статус 200'
+    )
+    return [item['name'] for item in response.json()['results']]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('rated_titles')
+class TestTitleFilters:
+
+    def test_ordering(self, client):
+        assert get_names(client, 'ordering=-rating') == [
+            'Лучший',
+            'Средний',
+            'Худший',
+            'Без оценок',
+        ], 'Проверьте сортировку по рейтингу: без оценок - в конце'
+        assert get_names(client, 'ordering=rating') == [
+            'Худший',
+            'Средний',
+            'Лучший',
+            'Без оценок',
+        ]
+        assert get_names(client, 'ordering=-review_count')[:2] == [
+            'Худший',
+            'Средний',
+        ], 'Проверьте сортировку по количеству отзывов'
+        assert get_names(client, 'ordering=name')[0] == 'Без оценок'
+
+        response = client.get('/api/v1/titles/?ordering=unknown')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле сортировки не принимается'
+        )
+
+    def test_empty_ordering_items(self, client):
+        assert get_names(client, 'ordering=-year,') == [
+            'Худший',
+            'Лучший',
+            'Средний',
+            'Без оценок',
+        ], 'Проверьте, что пустые элементы ?ordering= пропускаются'
+        for query in (
+            'ordering=,',
+            'ordering=,&cursor=',
+            'ordering=-year,&cursor=',
+        ):
+            assert get_names(client, query), (
+                f'Проверьте GET /api/v1/titles/?{query}'
+            )
+
+    def test_ranges(self, client):
+        assert get_names(
+            client, 'rating_min=4&rating_max=9&ordering=year'
+        ) == ['Средний', 'Лучший'], 'Проверьте фильтры rating_min/rating_max'
+        assert get_names(
+            client, 'year_min=2002&year_max=2003&ordering=-year'
+        ) == ['Лучший', 'Средний'], 'Проверьте фильтры year_min/year_max'
+
+    def test_cursor_with_ordering(self, client):
+        response = client.get('/api/v1/titles/?ordering=-year&cursor=')
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что keyset-пагинация работает с ?ordering='
+        )
+        assert [item['name'] for item in data['results']][0] == 'Худший'
+
+        response = client.get('/api/v1/titles/?ordering=-rating&cursor=')
+        assert 'count' in response.json(), (
+            'Проверьте, что для сортировки по рейтингу (с NULL) '
+            'используется пагинация по номеру страницы'
+        )
+
+    def test_search(self, client):
+        Title.objects.filter(name='Лучший').update(
+            description='Фильм про матрицу'
+        )
+        assert get_names(client, 'q=матрицу') == ['Лучший'], (
+            'Проверьте поиск по описанию параметром q'
+        )
+        assert get_names(client, 'q=Худ') == ['Худший'], (
+            'Проверьте поиск по названию параметром q'
+        )
+        response = client.get('/api/v1/titles/?q=Худ&cursor=')
+        assert 'count' in response.json(), (
+            'Проверьте, что результаты поиска не используют keyset-пагинацию'
+        )
+
+
+@pytest.fixture
+def genre_titles():
+    genres = {
+        slug: Genre.objects.create(name=slug, slug=slug)
+        for slug in ('drama', 'comedy', 'action')
+    }
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    titles = {
+        ('Драма', movie): ['drama'],
+        ('Трагикомедия', movie): ['drama', 'comedy'],
+        ('Боевик', book): ['action', 'comedy', 'drama'],
+        ('Без жанра', None): [],
+    }
+    for (name, category), slugs in titles.items():
+        title = Title.objects.create(name=name, year=2000, category=category)
+        title.genre.set([genres[slug] for slug in slugs])
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('genre_titles')
+class TestGenreFilters:
+
+    def test_genre_modes(self, client):
+        assert sorted(get_names(client, 'genre=comedy,action')) == [
+            'Боевик',
+            'Трагикомедия',
+        ], 'Проверьте, что genre=a,b возвращает произведения любого жанра'
+        assert get_names(
+            client, 'genre=drama,comedy&genre_mode=all&ordering=name'
+        ) == ['Боевик', 'Трагикомедия'], (
+            'Проверьте, что genre_mode=all возвращает произведения со всеми '
+            'жанрами без повторов'
+        )
+        assert get_names(client, 'genre=drama,unknown&genre_mode=all') == []
+        assert sorted(get_names(client, 'category=movie,book')) == [
+            'Боевик',
+            'Драма',
+            'Трагикомедия',
+        ], 'Проверьте фильтр по нескольким категориям'
+
+        response = client.get('/api/v1/titles/?genre=drama&genre_mode=some')
+        assert response.status_code == 400
+
+    def test_genre_query_plan(self, client):
+        queryset = TitleFilter(
+            {'genre': 'drama,comedy', 'genre_mode': 'all'},
+            queryset=TitleModelViewSet.queryset.all(),
+        ).qs
+        sql = str(queryset.query)
+        assert 'DISTINCT' not in sql, (
+            'Проверьте, что фильтр по жанрам не требует DISTINCT'
+        )
+        assert sql.count('reviews_title_genre') == 1 and 'HAVING' in sql, (
+            'Проверьте, что режим all выполняется одним подзапросом '
+            'с GROUP BY и HAVING'
+        )
+        plan = queryset.explain()
+        assert 'reviews_title_genre_genre_title_idx' in plan, (
+            'Проверьте, что подзапрос читает индекс (genre_id, title_id)'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/titles/?genre=drama,comedy&genre_mode=all')
+        assert len(context.captured_queries) == 3, (
+            'Проверьте, что фильтр по жанрам не добавляет запросов'
+        )
@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, TitleScore, User
+
+
+@pytest.fixture
+def title_with_reviews():
+    title = Title.objects.create(name='Фильм', year=2000)
+    for index, score in enumerate((10, 10, 7)):
+        author = User.objects.create(
+            username=f'user{index}', email=f'{index}@ya.ru'
+        )
+        Review.objects.create(
+            title=title, author=author, text='Текст', score=score
+        )
+    return title
+
+
+def get_histogram(**counts):
+    histogram = {str(score): 0 for score in range(1, 11)}
+    histogram.update(counts)
+    return histogram
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_stats_endpoint(self, client, title_with_reviews):
+        url = f'/api/v1/titles/{title_with_reviews.id}/stats/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            'count': 3,
+            'average': 9.0,
+            'histogram': get_histogram(**{'10': 2, '7': 1}),
+        }, 'Проверьте статистику оценок произведения'
+        assert not [
+            query
+            for query in context.captured_queries
+            if 'reviews_review' in query['sql']
+        ], 'Проверьте, что статистика не читает таблицу отзывов'
+
+    def test_stats_follow_reviews(self, client, title_with_reviews):
+        review = Review.objects.filter(score=7).get()
+        review.score = 1
+        review.save()
+        Review.objects.filter(score=10).first().delete()
+
+        response = client.get(
+            f'/api/v1/titles/{title_with_reviews.id}/?include=stats'
+        )
+        assert response.json()['stats'] == {
+            'count': 2,
+            'average': 5.5,
+            'histogram': get_histogram(**{'10': 1, '1': 1}),
+        }, 'Проверьте, что гистограмма обновляется при изменении отзывов'
+
+        response = client.get('/api/v1/titles/')
+        assert 'stats' not in response.json()['results'][0], (
+            'Проверьте, что статистика выводится только с ?include=stats'
+        )
+
+    def test_rebuild_fixes_histogram(self, title_with_reviews):
+        TitleScore.objects.filter(score=10).update(count=5)
+        TitleScore.objects.filter(score=7).delete()
+        out = StringIO()
+
+        call_command('rebuild_ratings', stdout=out)
+
+        assert 'Расхождений гистограмм: 2' in out.getvalue()
+        assert dict(
+            TitleScore.objects.values_list('score', 'count')
+        ) == {10: 2, 7: 1}, (
+            'Проверьте, что rebuild_ratings исправляет гистограммы оценок'
+        )